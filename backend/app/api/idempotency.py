@@ -0,0 +1,65 @@
+"""Run a controller body at most once per Idempotency-Key and replay its response."""
+
+from typing import Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.idempotency_service import (
+    claim_key,
+    release_key,
+    request_fingerprint,
+    save_response,
+)
+
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 200
+
+
+def _replay(stored: dict):
+    return JSONResponse(content=stored["body"], status_code=stored["status_code"], headers={REPLAY_HEADER: "true"})
+
+
+def idempotent_call(
+    key: str | None,
+    scope: str,
+    endpoint: str,
+    fingerprint,
+    handler: Callable[[], object],
+):
+    """Call ``handler`` once for (scope, key); repeats get the first response back.
+
+    ``handler`` returns a JSON-able body or raises HTTPException. Success and 4xx
+    outcomes are stored; 5xx and unexpected errors free the key so the client can
+    retry. A repeat that arrives while the first call is still running gets 409.
+    """
+    if not key:
+        return handler()
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+    outcome, claimed = claim_key(scope, key, endpoint, request_fingerprint(fingerprint))
+    if outcome == "replay":
+        return _replay(claimed)
+    if outcome == "mismatch":
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if outcome == "in_progress":
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+    record_id = claimed
+    try:
+        result = handler()
+    except HTTPException as exc:
+        if exc.status_code >= 500:
+            release_key(record_id)
+        else:
+            save_response(record_id, exc.status_code, body={"detail": exc.detail})
+        raise
+    except Exception:
+        release_key(record_id)
+        raise
+
+    save_response(record_id, 200, body=jsonable_encoder(result))
+    return result
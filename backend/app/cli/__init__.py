@@ -0,0 +1 @@
+"""Operational commands, run as ``python -m app.cli.<command>`` from the backend folder."""
@@ -0,0 +1,38 @@
+"""Move bookings and payment orders for old journeys into the archive tables.
+
+Usage (from backend/):
+    python -m app.cli.archive_bookings
+    python -m app.cli.archive_bookings --days 365 --batch-size 1000
+
+Safe to run from cron: each batch is its own short transaction and rerunning just
+picks up where the last run stopped. Bookings that have a review stay live.
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from app.config.database import init_db
+from app.services.archive_service import BOOKING_ARCHIVE_BATCH_SIZE, archive_cutoff, archive_old_bookings
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.archive_bookings", description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, help="archive journeys older than this many days (default BOOKING_ARCHIVE_AFTER_DAYS)")
+    parser.add_argument("--batch-size", type=int, default=BOOKING_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    args = parser.parse_args(argv)
+
+    cutoff = date.today() - timedelta(days=args.days) if args.days is not None else archive_cutoff()
+
+    init_db()
+    result = archive_old_bookings(cutoff=cutoff, batch_size=args.batch_size, max_batches=args.max_batches)
+    print(
+        f"Archived {result['bookings']} booking(s) and {result['payment_orders']} payment order(s) "
+        f"with journeys before {result['cutoff']} in {result['batches']} batch(es)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Drive full checkouts (order -> pay -> verify -> booking) against a running API.
+
+Usage (from backend/), with the API pointed at app.simulator.gateway:
+    python -m app.cli.checkout_benchmark --bus-id 1 --journey-date 2030-01-02 --checkouts 40 --concurrency 8
+    python -m app.cli.checkout_benchmark --gateway esewa --api http://127.0.0.1:8000
+
+Each checkout books one free seat: create-order, initiate, the customer's trip through
+the gateway (followed by hand, without a browser), the gateway callback, then polling
+the verification until the worker pool finishes it. Prints per-step latency
+percentiles, outcomes and throughput as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 1)
+
+
+class Checkout:
+    def __init__(self, client: httpx.AsyncClient, args, trip_id: int, fare: float, seat: str):
+        self.client = client
+        self.args = args
+        self.trip_id = trip_id
+        self.fare = fare
+        self.seat = seat
+        self.timings: dict[str, float] = {}
+
+    async def _timed(self, step: str, coro):
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.timings[step] = (time.perf_counter() - started) * 1000
+
+    async def _json(self, step: str, method: str, url: str, **kwargs) -> dict:
+        response = await self._timed(step, self.client.request(method, url, **kwargs))
+        if response.status_code >= 400:
+            raise RuntimeError(f"{step}:{response.status_code}")
+        return response.json()
+
+    async def run(self) -> str:
+        key = uuid.uuid4().hex
+        order = (
+            await self._json(
+                "create_order",
+                "POST",
+                "/api/payments/create-order",
+                headers={"Idempotency-Key": f"{key}:order"},
+                json={
+                    "user_id": self.args.user_id,
+                    "trip_id": self.trip_id,
+                    "journey_date": self.args.journey_date,
+                    "seat_labels": [self.seat],
+                    "amount": self.fare,
+                },
+            )
+        )["order"]
+        body = {"order_id": order["id"], "user_id": self.args.user_id}
+        if self.args.gateway == "khalti":
+            verification = await self._pay_khalti(order, body, key)
+        else:
+            verification = await self._pay_esewa(order, body, key)
+        if verification is None:
+            return "declined"
+
+        started = time.perf_counter()
+        while verification["state"] not in ("succeeded", "failed"):
+            if time.perf_counter() - started > self.args.verify_timeout:
+                self.timings["verify_wait"] = (time.perf_counter() - started) * 1000
+                return "verify_timeout"
+            await asyncio.sleep(self.args.poll_interval)
+            verification = (
+                await self._json(
+                    "poll", "GET", f"/api/payments/orders/{order['id']}/verification",
+                    params={"verification_id": verification["verification_id"]},
+                )
+            )["verification"]
+        self.timings["verify_wait"] = (time.perf_counter() - started) * 1000
+        return "booked" if verification["state"] == "succeeded" else f"failed:{verification['error_key']}"
+
+    async def _pay_khalti(self, order: dict, body: dict, key: str) -> dict | None:
+        payment = (
+            await self._json(
+                "initiate", "POST", "/api/payments/khalti/initiate", headers={"Idempotency-Key": f"{key}:khalti"}, json=body
+            )
+        )["payment"]
+        # Customer pays on the gateway page, which redirects to our return_url with the pidx.
+        redirect = await self._timed("gateway", self.client.get(payment["payment_url"]))
+        returned = parse_qs(urlsplit(redirect.headers.get("location", "")).query)
+        if returned.get("status", [""])[0] != "Completed":
+            return None
+        pidx = returned["pidx"][0]
+        return (await self._json("callback", "POST", "/api/payments/khalti/verify", json={"pidx": pidx}))["verification"]
+
+    async def _pay_esewa(self, order: dict, body: dict, key: str) -> dict | None:
+        payment = (
+            await self._json(
+                "initiate", "POST", "/api/payments/esewa/initiate", headers={"Idempotency-Key": f"{key}:esewa"}, json=body
+            )
+        )["payment"]
+        redirect = await self._timed("gateway", self.client.post(payment["form_action"], data=payment["form_fields"]))
+        location = redirect.headers.get("location", "")
+        if "status=failure" in location or "data=" not in location:
+            return None
+        callback = await self._timed("callback", self.client.get(location))
+        query = parse_qs(urlsplit(callback.headers.get("location", "")).query)
+        if query.get("status", [""])[0] == "failure":
+            raise RuntimeError(f"callback:{query.get('reason', ['unknown'])[0]}")
+        return {
+            "verification_id": query.get("verification_id", [None])[0],
+            "state": "succeeded" if query.get("status", [""])[0] == "success" else "queued",
+        }
+
+
+async def _free_seats(client: httpx.AsyncClient, args) -> tuple[int, float, list[str]]:
+    response = await client.get(
+        "/api/bookings/seat-availability", params={"bus_id": args.bus_id, "journey_date": args.journey_date}
+    )
+    response.raise_for_status()
+    availability = response.json()["availability"]
+    seats = [seat["seat_label"] for seat in availability["seats"] if seat.get("status") == "available"]
+    schedule = availability["schedule"]
+    return schedule["schedule_id"], float(schedule["fare"]), seats
+
+
+async def run_benchmark(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.api, timeout=args.timeout, limits=limits) as client:
+        trip_id, fare, seats = await _free_seats(client, args)
+        count = min(args.checkouts or len(seats), len(seats))
+        if count == 0:
+            return {"error": "no free seats on this bus/date"}
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        outcomes, timings = Counter(), defaultdict(list)
+
+        async def one(seat: str):
+            checkout = Checkout(client, args, trip_id, fare, seat)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    outcome = await checkout.run()
+                except (RuntimeError, httpx.HTTPError, KeyError) as exc:
+                    outcome = f"error:{exc.__class__.__name__}:{exc}"
+                checkout.timings["end_to_end"] = (time.perf_counter() - started) * 1000
+            outcomes[outcome.split(":")[0] if outcome.startswith("error") else outcome] += 1
+            if outcome.startswith("error"):
+                outcomes[outcome] += 1
+            for step, value in checkout.timings.items():
+                timings[step].append(value)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(seat) for seat in seats[:count]))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "gateway": args.gateway,
+        "checkouts": count,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": round(elapsed, 2),
+        "checkouts_per_second": round(count / elapsed, 2) if elapsed else None,
+        "outcomes": dict(outcomes),
+        "latency_ms": {
+            step: {"p50": _percentile(values, 50), "p95": _percentile(values, 95), "p99": _percentile(values, 99), "max": round(max(values), 1)}
+            for step, values in timings.items()
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.checkout_benchmark", description=__doc__.splitlines()[0])
+    parser.add_argument("--api", default="http://127.0.0.1:8000")
+    parser.add_argument("--gateway", choices=("khalti", "esewa"), default="khalti")
+    parser.add_argument("--bus-id", type=int, default=1)
+    parser.add_argument("--journey-date", required=True, help="YYYY-MM-DD; every checkout books one free seat on this date")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--checkouts", type=int, help="default: one per free seat")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per HTTP request")
+    parser.add_argument("--verify-timeout", type=float, default=60.0, help="give up waiting for a verification after this")
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(run_benchmark(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
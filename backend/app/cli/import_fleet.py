@@ -0,0 +1,50 @@
+"""Import a fleet file (CSV or JSON) straight into the database.
+
+Usage (from backend/):
+    python -m app.cli.import_fleet fleet.csv
+    python -m app.cli.import_fleet fleet.json --dry-run
+
+Columns / keys match POST /api/admin/buses: bus_name, bus_type, from_city, to_city,
+price, seat_capacity, vendor_id. Nothing is written unless every row is valid.
+Exit code 1 means the file was rejected.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.config.database import init_db
+from app.services.fleet_import_service import import_fleet, parse_fleet_file
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.import_fleet", description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="CSV or JSON fleet file")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args(argv)
+
+    rows, error = parse_fleet_file(args.path.read_bytes(), args.path.name)
+    if error:
+        print(error)
+        return 1
+
+    init_db()
+    report, error_key = import_fleet(rows, dry_run=args.dry_run)
+    if error_key == "rows":
+        for item in report["errors"]:
+            print(f"row {item['row']}: {'; '.join(item['errors'])}")
+        print(f"{len(report['errors'])} of {report['rows']} row(s) invalid; nothing imported.")
+        return 1
+
+    if args.dry_run:
+        print(f"{report['rows']} row(s) valid.")
+    else:
+        print(
+            f"Imported {report['buses']} bus(es), {report['schedules']} schedule(s), "
+            f"{report['seats']} seat(s); {report['routes_created']} new route(s)."
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
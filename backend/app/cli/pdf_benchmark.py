@@ -0,0 +1,82 @@
+"""Time ticket and refund receipt renders with and without the shared PDF resources.
+
+Usage (from backend/):
+    python -m app.cli.pdf_benchmark
+    python -m app.cli.pdf_benchmark --renders 200
+
+"rebuilt" clears the style and logo caches before every render, which is what each
+render used to pay: a fresh stylesheet and the logo decoded and re-encoded from the
+PNG. "shared" keeps them, as the service does now. Everything runs in this process,
+with no render pool and no database.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from app.services.pdf_service import _logo_xobject, _styles, render_document
+
+SAMPLES = {
+    "ticket_pdf": {
+        "passenger_name": "Sita Sharma",
+        "booking_reference": "BK-BENCH-1",
+        "journey_date": "2026-11-02",
+        "departure_time": "07:00",
+        "arrival_time": "14:30",
+        "bus_name": "BA 2 KHA 4521",
+        "route": "Kathmandu -> Pokhara",
+        "seats": ["A1", "A2"],
+        "total_amount": 2400,
+        "passenger_email": "sita@example.com",
+    },
+    "refund_receipt_pdf": {
+        "passenger_name": "Sita Sharma",
+        "booking_reference": "BK-BENCH-1",
+        "journey_date": "2026-11-02",
+        "bus_name": "BA 2 KHA 4521",
+        "route": "Kathmandu -> Pokhara",
+        "refunded_seats": ["A2"],
+        "refund_amount": 960,
+        "refund_percent": 80,
+        "refund_reason": "Change of plans",
+        "passenger_email": "sita@example.com",
+    },
+}
+
+
+def _time_renders(kind: str, renders: int, rebuilt: bool) -> list[float]:
+    render_document(kind, SAMPLES[kind])
+    timings = []
+    for _ in range(renders):
+        if rebuilt:
+            _styles.cache_clear()
+            _logo_xobject.cache_clear()
+        started = time.perf_counter()
+        render_document(kind, SAMPLES[kind])
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _percentile(timings: list[float], fraction: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.pdf_benchmark", description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=50, help="timed renders per document and mode (default 50)")
+    args = parser.parse_args(argv)
+
+    for kind in SAMPLES:
+        rebuilt = _time_renders(kind, args.renders, rebuilt=True)
+        shared = _time_renders(kind, args.renders, rebuilt=False)
+        print(
+            f"{kind:<20} rebuilt p50 {statistics.median(rebuilt):6.1f} ms  p95 {_percentile(rebuilt, 0.95):6.1f} ms"
+            f"   shared p50 {statistics.median(shared):6.1f} ms  p95 {_percentile(shared, 0.95):6.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
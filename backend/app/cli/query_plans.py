@@ -0,0 +1,99 @@
+"""EXPLAIN every hot-path query and fail if any of them needs a full table scan.
+
+Usage (from backend/):
+    python -m app.cli.query_plans
+
+Runs against DATABASE_URL after init_db(), so migrations and demo seed data are in place.
+On Postgres sequential scans are disabled for the check, so tiny seed tables still
+show whether a usable index exists. Exit code 1 means a regression.
+"""
+
+import sys
+from datetime import date, datetime, timezone
+
+from sqlalchemy import select
+
+from app.config.database import engine, init_db
+from app.model.models import Booking, Review, Route
+from app.services.archive_service import archive_cutoff
+from app.services.booking_service import _schedule_for_bus_query, _trip_bookings_query, _user_bookings_query
+from app.services.bus_service import _bus_seats_query
+from app.services.manifest_service import _manifest_query
+from app.services.payment_order_service import _expire_stale_orders_statement
+from app.services.reconciliation_service import _candidates_query
+
+
+def hot_queries() -> list[tuple[str, object]]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        ("seat map bookings by trip", _trip_bookings_query(1, date.today())),
+        ("bookings by user", _user_bookings_query(1)),
+        ("active schedule for bus", _schedule_for_bus_query(1)),
+        ("seat layout for bus", _bus_seats_query(1)),
+        ("passenger manifest for trips", _manifest_query(date.today(), schedule_ids=[1, 2])),
+        ("passenger manifest for a day", _manifest_query(date.today())),
+        (
+            "route by origin/destination",
+            select(Route).where(Route.origin == "Kathmandu", Route.destination == "Pokhara"),
+        ),
+        ("reviews by user", select(Review).where(Review.user_id == 1)),
+        ("stale payment order sweep", _expire_stale_orders_statement(now)),
+        ("pending orders to reconcile", _candidates_query(0, now, 100)),
+        ("bookings past archive horizon", select(Booking.booking_id).where(Booking.journey_date < archive_cutoff())),
+    ]
+
+
+def _driver_sql(connection, statement) -> tuple[str, object]:
+    # render_postcompile expands IN (...) lists into plain bind parameters.
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    if compiled.positiontup:
+        return str(compiled), tuple(params[name] for name in compiled.positiontup)
+    return str(compiled), params
+
+
+def explain(connection, statement) -> list[str]:
+    sql, params = _driver_sql(connection, statement)
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN {sql}", params).all()
+    return [row[0] for row in rows]
+
+
+def full_scans(plan: list[str], dialect_name: str) -> list[str]:
+    if dialect_name == "sqlite":
+        # "SEARCH t USING INDEX" is fine; "SCAN t" walks the whole table (or whole index).
+        return [line for line in plan if line.strip().startswith("SCAN ")]
+    return [line for line in plan if "Seq Scan" in line]
+
+
+def check_query_plans() -> list[tuple[str, list[str]]]:
+    failures: list[tuple[str, list[str]]] = []
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for name, statement in hot_queries():
+            plan = explain(connection, statement)
+            scans = full_scans(plan, connection.dialect.name)
+            print(f"[{'FAIL' if scans else 'ok'}] {name}")
+            for line in plan:
+                print(f"    {line}")
+            if scans:
+                failures.append((name, scans))
+        connection.rollback()
+    return failures
+
+
+def main() -> int:
+    init_db()
+    failures = check_query_plans()
+    if failures:
+        print(f"{len(failures)} hot query(s) fall back to a full scan: {', '.join(name for name, _ in failures)}")
+        return 1
+    print("All hot queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
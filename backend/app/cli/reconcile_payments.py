@@ -0,0 +1,64 @@
+"""Re-check pending payment orders with Khalti/eSewa and settle the ones that finished.
+
+Usage (from backend/):
+    python -m app.cli.reconcile_payments
+    python -m app.cli.reconcile_payments --dry-run --concurrency 16
+    KHALTI_VERIFY_BASE_URL=http://127.0.0.1:9000/api/v2 python -m app.cli.reconcile_payments
+
+Paid orders are queued for the verification workers (a running API process picks
+them up; pass --process-queue to drain them here). Declined or long-dead checkouts
+are marked failed. Prints the summary report as JSON.
+"""
+
+import argparse
+import json
+import sys
+
+from app.config.database import init_db
+from app.jobs.runner import WORKER_ID
+from app.services.payment_verification_service import claim_due_verifications, process_verification
+from app.services.reconciliation_service import (
+    PAYMENT_RECONCILE_BATCH_SIZE,
+    PAYMENT_RECONCILE_CONCURRENCY,
+    PAYMENT_RECONCILE_MIN_AGE_MINUTES,
+    reconcile_pending_orders,
+)
+
+
+def _drain_queue(limit: int) -> dict:
+    outcomes: dict[str, int] = {}
+    while True:
+        claimed = claim_due_verifications(WORKER_ID, limit)
+        if not claimed:
+            return outcomes
+        for verification_id in claimed:
+            state = process_verification(verification_id, WORKER_ID)
+            outcomes[state] = outcomes.get(state, 0) + 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.reconcile_payments", description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=PAYMENT_RECONCILE_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=PAYMENT_RECONCILE_CONCURRENCY, help="gateway lookups in flight")
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    parser.add_argument("--min-age-minutes", type=float, default=PAYMENT_RECONCILE_MIN_AGE_MINUTES, help="skip orders touched more recently")
+    parser.add_argument("--dry-run", action="store_true", help="look up and report, change nothing")
+    parser.add_argument("--process-queue", action="store_true", help="also run queued verifications in this process")
+    args = parser.parse_args(argv)
+
+    init_db()
+    report = reconcile_pending_orders(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_batches=args.max_batches,
+        min_age_minutes=args.min_age_minutes,
+        dry_run=args.dry_run,
+    )
+    if args.process_queue and not args.dry_run:
+        report["verifications"] = _drain_queue(args.concurrency)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,3 @@
-from .database import get_session, init_db
+from .database import get_db, get_session, init_db
 
-__all__ = ["get_session", "init_db"]
+__all__ = ["get_db", "get_session", "init_db"]
@@ -1,10 +1,31 @@
+import itertools
+import logging
 import os
+import threading
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import time
 from pathlib import Path
+from time import monotonic
+from time import time as wall_clock
 
-from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.orm import declarative_base, sessionmaker
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from app.config.query_stats import instrument_queries
+from app.config.slow_queries import instrument_slow_queries
+from app.config.pool_stats import InstrumentedQueuePool, PoolStats, describe_pool, instrument_pool
+from app.config.sqlite_tuning import (
+    READONLY_OPTION,
+    enable_sqlite_performance_mode,
+    enable_sqlite_pragmas,
+    writer_queue,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def _load_local_env() -> None:
@@ -47,52 +68,331 @@ def _build_database_url() -> str:
 
 DATABASE_URL = _build_database_url()
 
-engine_kwargs = {}
-if DATABASE_URL.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
 
-engine = create_engine(DATABASE_URL, **engine_kwargs)
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in {"sqlite:", "sqlite+pysqlite:"})
+
+
+# Pool sizing is per worker process: total connections = workers * (size + overflow).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+
+# Optional comma separated replica URLs; read-only sessions rotate across them.
+DATABASE_READ_URLS = [item.strip() for item in os.getenv("DATABASE_READ_URLS", "").split(",") if item.strip()]
+# How long a client's reads stay on the primary after it writes (covers replica lag).
+DB_READ_AFTER_WRITE_SECONDS = float(os.getenv("DB_READ_AFTER_WRITE_SECONDS", "15"))
+# How long a replica that failed to connect is skipped before it is tried again.
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+# WAL + pragmas + serialized writers for file-based sqlite deployments (opt-in).
+SQLITE_PERF_MODE = _env_flag("SQLITE_PERF_MODE", "false")
+
+
+def _use_sqlite_perf_mode(url: str) -> bool:
+    return SQLITE_PERF_MODE and url.startswith("sqlite") and not _is_memory_sqlite(url)
+
+
+def _pool_kwargs(url: str) -> dict:
+    if _is_memory_sqlite(url):
+        # In-memory sqlite must stay on its single-connection pool, otherwise each checkout sees an empty DB.
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def _create_sync_engine(url: str, stats: PoolStats):
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING, **_pool_kwargs(url)}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        kwargs["poolclass"] = InstrumentedQueuePool
+
+    created = create_engine(url, **kwargs)
+    instrument_pool(created, stats)
+    instrument_queries(created)
+    instrument_slow_queries(created)
+    if _use_sqlite_perf_mode(url):
+        enable_sqlite_performance_mode(created)
+    return created
+
+
+def _build_async_database_url(url: str) -> str:
+    # Same database, async driver: aiosqlite for sqlite, psycopg (v3) async mode for Postgres.
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if backend in {"postgresql", "postgres"}:
+        return f"postgresql+psycopg{sep}{rest}"
+    return url
+
+
+def _create_async_engine(url: str, stats: PoolStats):
+    created = create_async_engine(
+        _build_async_database_url(url),
+        pool_pre_ping=DB_POOL_PRE_PING,
+        **_pool_kwargs(url),
+    )
+    instrument_pool(created.sync_engine, stats)
+    instrument_queries(created.sync_engine)
+    instrument_slow_queries(created.sync_engine)
+    if _use_sqlite_perf_mode(url):
+        enable_sqlite_pragmas(created.sync_engine)
+    return created
+
+
+ASYNC_DATABASE_URL = _build_async_database_url(DATABASE_URL)
+
+pool_stats = PoolStats()
+engine = _create_sync_engine(DATABASE_URL, pool_stats)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+# Same pool as engine; marks primary reads so sqlite perf mode skips the writer queue.
+read_only_engine = engine.execution_options(**{READONLY_OPTION: True})
 
+async_pool_stats = PoolStats()
+async_engine = _create_async_engine(DATABASE_URL, async_pool_stats)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+read_pool_stats = [PoolStats() for _ in DATABASE_READ_URLS]
+read_engines = [_create_sync_engine(url, stats) for url, stats in zip(DATABASE_READ_URLS, read_pool_stats)]
+replica_read_binds = [read_engine.execution_options(**{READONLY_OPTION: True}) for read_engine in read_engines]
+async_read_pool_stats = [PoolStats() for _ in DATABASE_READ_URLS]
+async_read_engines = [
+    _create_async_engine(url, stats) for url, stats in zip(DATABASE_READ_URLS, async_read_pool_stats)
+]
+
+_read_cycle = itertools.cycle(range(len(read_engines)))
+_read_lock = threading.Lock()
+# Per replica: monotonic time until which it is skipped after failing to connect.
+_replica_down_until = [0.0] * len(read_engines)
+
+# Read-your-writes marker, carried by the client so it works across worker processes:
+# a response to a request that committed a write sets it (cookie for browsers, header
+# for API clients that echo it back) to the wall-clock time until which that client's
+# reads must go to the primary.
+READ_PRIMARY_COOKIE = "tn_read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
 
-def _ensure_bus_seat_columns() -> None:
-    inspector = inspect(engine)
-    if "bus_seats" not in inspector.get_table_names():
-        return
 
-    columns = {item["name"] for item in inspector.get_columns("bus_seats")}
-    statements: list[str] = []
+class ReadRouting:
+    """Replica routing state of one request; shared with its threadpool work via a ContextVar."""
 
-    if "is_blocked" not in columns:
-        if DATABASE_URL.startswith("sqlite"):
-            statements.append("ALTER TABLE bus_seats ADD COLUMN is_blocked BOOLEAN NOT NULL DEFAULT 0")
-        else:
-            statements.append("ALTER TABLE bus_seats ADD COLUMN is_blocked BOOLEAN NOT NULL DEFAULT FALSE")
+    def __init__(self, primary_until: float = 0.0):
+        self.primary_until = primary_until
+        self.wrote = False
+
+    def pinned(self) -> bool:
+        return self.wrote or self.primary_until > wall_clock()
+
+
+_read_routing: ContextVar[ReadRouting | None] = ContextVar("db_read_routing", default=None)
+
+
+def _parse_read_marker(raw: str | None) -> float:
+    try:
+        return float(raw) if raw else 0.0
+    except ValueError:
+        return 0.0
 
-    if "block_reason" not in columns:
-        statements.append("ALTER TABLE bus_seats ADD COLUMN block_reason VARCHAR(120)")
 
-    if not statements:
+def start_read_routing(request: Request) -> tuple[ReadRouting, object]:
+    marker = request.headers.get(READ_PRIMARY_HEADER) or request.cookies.get(READ_PRIMARY_COOKIE)
+    routing = ReadRouting(_parse_read_marker(marker))
+    return routing, _read_routing.set(routing)
+
+
+def finish_read_routing(token) -> None:
+    _read_routing.reset(token)
+
+
+def set_read_marker(routing: ReadRouting, response) -> None:
+    """After a request that wrote, tell the client to read from the primary for a while."""
+    if not routing.wrote or not read_engines:
         return
+    until = f"{wall_clock() + DB_READ_AFTER_WRITE_SECONDS:.3f}"
+    response.headers[READ_PRIMARY_HEADER] = until
+    response.set_cookie(
+        READ_PRIMARY_COOKIE, until, max_age=int(DB_READ_AFTER_WRITE_SECONDS) + 1, httponly=True, samesite="lax"
+    )
+
+
+def note_write() -> None:
+    """Send this request's later reads, and the client's reads for a while, to the primary."""
+    routing = _read_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def _next_replica_index() -> int | None:
+    """Pick the next healthy replica, or None when the read must (or can only) use the primary."""
+    if not read_engines:
+        return None
+    routing = _read_routing.get()
+    if routing is not None and routing.pinned():
+        return None
+    now = monotonic()
+    with _read_lock:
+        for _ in range(len(read_engines)):
+            index = next(_read_cycle)
+            if _replica_down_until[index] <= now:
+                return index
+    return None
+
+
+def _mark_replica_down(index: int, error: Exception) -> None:
+    logger.warning("Read replica %s unavailable, using the primary for %ss: %s", index, DB_REPLICA_RETRY_SECONDS, error)
+    with _read_lock:
+        _replica_down_until[index] = monotonic() + DB_REPLICA_RETRY_SECONDS
+
+
+def _connect_replica():
+    """Connection to the next reachable replica, or None to read from the primary."""
+    tried = set()
+    while (index := _next_replica_index()) is not None and index not in tried:
+        tried.add(index)
+        try:
+            return replica_read_binds[index].connect()
+        except DBAPIError as error:
+            _mark_replica_down(index, error)
+    return None
 
-    with engine.begin() as connection:
-        for statement in statements:
-            connection.execute(text(statement))
+
+async def _connect_async_replica():
+    tried = set()
+    while (index := _next_replica_index()) is not None and index not in tried:
+        tried.add(index)
+        try:
+            return await async_read_engines[index].connect()
+        except DBAPIError as error:
+            _mark_replica_down(index, error)
+    return None
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_write(session, flush_context):
+    if read_engines and (session.new or session.dirty or session.deleted):
+        session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _collect_bulk_write(orm_execute_state):
+    # Set-based UPDATE/DELETE never goes through flush.
+    if read_engines and (orm_execute_state.is_update or orm_execute_state.is_delete):
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_after_write(session):
+    if session.info.pop("wrote", False):
+        note_write()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_write(session):
+    session.info.pop("wrote", None)
+
+
+Base = declarative_base()
 
 
 @contextmanager
-def get_session():
-    db = SessionLocal()
+def get_session(db: Session | None = None, readonly: bool = False):
+    # A caller-owned session (e.g. the request-scoped one from get_db) is reused as-is,
+    # so nested service calls share one identity map instead of opening new sessions.
+    if db is not None:
+        yield db
+        return
+
+    replica = _connect_replica() if readonly else None
+    if replica is not None:
+        db = SessionLocal(bind=replica)
+    elif readonly:
+        db = SessionLocal(bind=read_only_engine)
+    else:
+        db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        if replica is not None:
+            replica.close()
+
+
+def get_pool_stats() -> dict:
+    settings = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    stats = describe_pool(engine, pool_stats, settings)
+    stats["async"] = describe_pool(async_engine.sync_engine, async_pool_stats, settings)
+    stats["replicas"] = [
+        {
+            "sync": describe_pool(read_engine, read_stats, settings),
+            "async": describe_pool(async_read_engine.sync_engine, async_read_stats, settings),
+        }
+        for read_engine, read_stats, async_read_engine, async_read_stats in zip(
+            read_engines, read_pool_stats, async_read_engines, async_read_pool_stats
+        )
+    ]
+    if _use_sqlite_perf_mode(DATABASE_URL):
+        stats["sqlite_writer_queue"] = writer_queue.snapshot()
+    return stats
+
+
+async def get_async_db():
+    """FastAPI dependency for async endpoints: one AsyncSession per request."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def get_async_read_db():
+    """Async read-only dependency; uses a replica unless the client wrote recently."""
+    replica = await _connect_async_replica()
+    try:
+        async with AsyncSessionLocal(bind=replica or async_engine) as db:
+            yield db
+    finally:
+        if replica is not None:
+            await replica.close()
+
+
+def get_read_db():
+    """Read-only dependency; uses a replica unless the client wrote recently."""
+    with get_session(readonly=True) as db:
+        yield db
+
+
+def get_db():
+    """FastAPI dependency: one session per HTTP request, shared by every service call."""
+    with get_session() as db:
+        try:
+            yield db
+        except Exception:
+            db.rollback()
+            raise
 
 
 def init_db():
     from sqlalchemy import select, text
 
+    from app.config.migrations import run_migrations
     from app.model.models import Bus, BusSchedule, PaymentOrder, Route, User, VendorDocument
 
     # Fail fast if the configured database is unreachable.
@@ -112,7 +412,7 @@ def init_db():
     if auto_create_enabled:
         Base.metadata.create_all(bind=engine)
 
-    _ensure_bus_seat_columns()
+    run_migrations(engine)
 
     seed_demo = os.getenv("DB_SEED_DEMO")
     if seed_demo is None:
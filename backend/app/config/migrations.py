@@ -0,0 +1,215 @@
+"""Versioned schema migrations.
+
+Each migration runs once and is recorded in ``schema_migrations``. Migrations must be
+idempotent on their own too, because databases created by ``create_all`` already have
+the latest tables and indexes before the runner first sees them.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+SCHEMA_MIGRATIONS_TABLE = "schema_migrations"
+
+# (name, table, columns). Frozen here instead of read from the models so old
+# migrations keep meaning the same thing when models change later.
+HOT_PATH_INDEXES = [
+    ("ix_bookings_schedule_journey", "bookings", ("schedule_id", "journey_date")),
+    ("ix_bookings_user_id", "bookings", ("user_id",)),
+    ("ix_bus_schedules_bus_active", "bus_schedules", ("bus_id", "is_active")),
+    ("ix_bus_seats_bus_position", "bus_seats", ("bus_id", "row_index", "col_index")),
+    ("ix_routes_origin_destination", "routes", ("origin", "destination")),
+    ("ix_reviews_user_id", "reviews", ("user_id",)),
+    ("ix_payment_orders_status_expires", "payment_orders", ("status", "expires_at")),
+]
+
+
+def _is_postgres(engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _add_bus_seat_block_columns(engine) -> None:
+    inspector = inspect(engine)
+    if "bus_seats" not in inspector.get_table_names():
+        return
+
+    columns = {item["name"] for item in inspector.get_columns("bus_seats")}
+    statements: list[str] = []
+
+    if "is_blocked" not in columns:
+        if _is_postgres(engine):
+            statements.append("ALTER TABLE bus_seats ADD COLUMN is_blocked BOOLEAN NOT NULL DEFAULT FALSE")
+        else:
+            statements.append("ALTER TABLE bus_seats ADD COLUMN is_blocked BOOLEAN NOT NULL DEFAULT 0")
+
+    if "block_reason" not in columns:
+        statements.append("ALTER TABLE bus_seats ADD COLUMN block_reason VARCHAR(120)")
+
+    if not statements:
+        return
+
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+
+
+def _add_bus_vendor_column(engine) -> None:
+    inspector = inspect(engine)
+    if "buses" not in inspector.get_table_names():
+        return
+
+    columns = {item["name"] for item in inspector.get_columns("buses")}
+    if "vendor_id" not in columns:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE buses ADD COLUMN vendor_id INTEGER REFERENCES users(user_id)"))
+    create_indexes(engine, [("ix_buses_vendor_id", "buses", ("vendor_id",))])
+
+
+def _create_archive_tables(engine) -> None:
+    # Snapshot tables with no foreign keys; checkfirst keeps this a no-op after create_all.
+    from app.model.archive import BookingArchive, PaymentOrderArchive
+
+    BookingArchive.__table__.create(bind=engine, checkfirst=True)
+    PaymentOrderArchive.__table__.create(bind=engine, checkfirst=True)
+    # The archiver selects by journey date alone.
+    create_indexes(
+        engine,
+        [
+            ("ix_bookings_journey_date", "bookings", ("journey_date",)),
+            ("ix_payment_orders_journey_date", "payment_orders", ("journey_date",)),
+        ],
+    )
+
+
+def _create_job_leases_table(engine) -> None:
+    from app.model.job_lease import JobLease
+
+    JobLease.__table__.create(bind=engine, checkfirst=True)
+
+
+def _create_booking_status_index(engine) -> None:
+    create_indexes(engine, [("ix_bookings_status_journey", "bookings", ("booking_status", "journey_date"))])
+
+
+def _create_idempotency_table(engine) -> None:
+    from app.model.idempotency_record import IdempotencyRecord
+
+    IdempotencyRecord.__table__.create(bind=engine, checkfirst=True)
+
+
+def _create_payment_verifications_table(engine) -> None:
+    from app.model.payment_verification import PaymentVerification
+
+    PaymentVerification.__table__.create(bind=engine, checkfirst=True)
+
+
+def _create_email_outbox_table(engine) -> None:
+    from app.model.email_outbox import EmailOutbox
+
+    EmailOutbox.__table__.create(bind=engine, checkfirst=True)
+
+
+def _add_inactive_reason_columns(engine) -> None:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as connection:
+        for table in ("buses", "bus_schedules"):
+            if table not in existing_tables:
+                continue
+            columns = {item["name"] for item in inspector.get_columns(table)}
+            if "inactive_reason" not in columns:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN inactive_reason VARCHAR(120)"))
+
+
+def create_indexes(engine, indexes: list[tuple[str, str, tuple[str, ...]]]) -> None:
+    """Create indexes without blocking writes (CONCURRENTLY) on Postgres."""
+    existing_tables = set(inspect(engine).get_table_names())
+
+    if not _is_postgres(engine):
+        with engine.begin() as connection:
+            for name, table, columns in indexes:
+                if table in existing_tables:
+                    connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for name, table, columns in indexes:
+            if table not in existing_tables:
+                continue
+            # A failed concurrent build leaves an INVALID index behind; IF NOT EXISTS would keep it.
+            invalid = connection.execute(
+                text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": name},
+            ).first()
+            if invalid is not None:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            connection.execute(
+                text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+            )
+
+
+def _create_hot_path_indexes(engine) -> None:
+    create_indexes(engine, HOT_PATH_INDEXES)
+
+
+MIGRATIONS = [
+    (1, "bus_seat_block_columns", _add_bus_seat_block_columns),
+    (2, "hot_path_indexes", _create_hot_path_indexes),
+    (3, "bus_vendor_column", _add_bus_vendor_column),
+    (4, "booking_archive_tables", _create_archive_tables),
+    (5, "job_leases_table", _create_job_leases_table),
+    (6, "booking_status_index", _create_booking_status_index),
+    (7, "idempotency_records_table", _create_idempotency_table),
+    (8, "payment_verifications_table", _create_payment_verifications_table),
+    (9, "email_outbox_table", _create_email_outbox_table),
+    (10, "inactive_reason_columns", _add_inactive_reason_columns),
+]
+
+
+def _ensure_migrations_table(engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {SCHEMA_MIGRATIONS_TABLE} ("
+                "version INTEGER PRIMARY KEY, "
+                "name VARCHAR(120) NOT NULL, "
+                "applied_at TIMESTAMP NOT NULL)"
+            )
+        )
+
+
+def applied_versions(engine) -> set[int]:
+    _ensure_migrations_table(engine)
+    with engine.connect() as connection:
+        rows = connection.execute(text(f"SELECT version FROM {SCHEMA_MIGRATIONS_TABLE}")).all()
+    return {row[0] for row in rows}
+
+
+def run_migrations(engine) -> list[int]:
+    """Apply pending migrations in version order and return the versions applied."""
+    done = applied_versions(engine)
+    applied: list[int] = []
+    for version, name, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        migrate(engine)
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    text(
+                        f"INSERT INTO {SCHEMA_MIGRATIONS_TABLE} (version, name, applied_at) "
+                        "VALUES (:version, :name, :applied_at)"
+                    ),
+                    {"version": version, "name": name, "applied_at": datetime.now(timezone.utc).replace(tzinfo=None)},
+                )
+        except IntegrityError:
+            # Another worker started at the same time and recorded it first.
+            continue
+        applied.append(version)
+    return applied
@@ -0,0 +1,124 @@
+"""Per-request SQL statement counting and N+1 detection.
+
+Engine events record every statement into the stats object of the current request
+(a ContextVar, so it follows the request into FastAPI's threadpool). The HTTP
+middleware in main.py turns the totals into response headers. A streamed body keeps
+querying after the headers are sent, so for those the totals are logged once the
+body is done instead.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Same statement shape more than this many times in one request is reported as a likely N+1.
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "10"))
+
+_START_KEY = "query_stats_started"
+_IN_LIST_PATTERN = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+)\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse whitespace and expanded IN lists so repeats of one query compare equal."""
+    shape = _WHITESPACE_PATTERN.sub(" ", statement).strip()
+    return _IN_LIST_PATTERN.sub("(?)", shape)
+
+
+class QueryStats:
+    def __init__(self, parent: "QueryStats | None" = None):
+        # Nested scopes (a request inside assert_max_queries) also count toward the outer one.
+        self.parent = parent
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+        if self.parent is not None:
+            self.parent.record(statement, elapsed_ms)
+
+    def repeated_shapes(self, threshold: int = DB_N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("db_query_stats", default=None)
+
+
+def instrument_queries(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info[_START_KEY].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_START_KEY):
+            conn.info[_START_KEY].pop()
+
+
+def start_request_stats() -> tuple[QueryStats, object]:
+    stats = QueryStats(parent=_current_stats.get())
+    return stats, _current_stats.set(stats)
+
+
+def finish_request_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+def warn_repeated_shapes(stats: QueryStats, label: str) -> None:
+    for shape, count in stats.repeated_shapes():
+        logger.warning("Possible N+1 in %s: statement ran %s times: %s", label, count, shape[:300])
+
+
+def response_headers(stats: QueryStats) -> dict[str, str]:
+    return {
+        "Server-Timing": f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"',
+        "X-DB-Queries": str(stats.count),
+    }
+
+
+async def log_stats_after_body(body_iterator, stats: QueryStats, label: str):
+    """Pass a streamed body through, then log the request's final query totals."""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        warn_repeated_shapes(stats, label)
+        logger.info("%s streamed: %s queries, db %.1f ms", label, stats.count, stats.total_ms)
+
+
+@contextmanager
+def assert_max_queries(max_count: int):
+    """Fail if the wrapped block runs more than ``max_count`` statements.
+
+    Example:
+        with assert_max_queries(5):
+            client.get("/api/admin/bookings")
+    """
+    stats, token = start_request_stats()
+    try:
+        yield stats
+    finally:
+        finish_request_stats(token)
+    if stats.count > max_count:
+        top = "\n".join(f"  {count}x {shape[:200]}" for shape, count in stats.shapes.most_common(5))
+        raise AssertionError(f"Expected at most {max_count} queries, ran {stats.count}:\n{top}")
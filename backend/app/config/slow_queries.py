@@ -0,0 +1,146 @@
+"""Slow-query log with automatic EXPLAIN capture.
+
+Statements slower than DB_SLOW_QUERY_MS are logged with redacted parameters and the
+service function that issued them, and kept in an in-memory ring buffer for the
+superadmin diagnostics endpoint. The first time a statement shape turns up slow its
+plan is captured on the same DBAPI connection.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import event
+
+from app.config.query_stats import statement_shape
+
+logger = logging.getLogger(__name__)
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "250"))
+DB_SLOW_QUERY_LOG_SIZE = int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", "200"))
+
+_START_KEY = "slow_query_started"
+_APP_DIR = str(Path(__file__).resolve().parents[1])
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_lock = threading.Lock()
+_entries: deque[dict] = deque(maxlen=DB_SLOW_QUERY_LOG_SIZE)
+_plans: dict[str, list[str] | None] = {}
+
+
+def _redact(value):
+    # Keep ids/amounts/dates readable; hide free text (names, emails, phones, tokens).
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<redacted {type(value).__name__}({len(value)})>"
+    if isinstance(value, dict):
+        return {key: _redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return str(value)
+
+
+def _calling_function() -> str | None:
+    """Innermost app frame outside app/config, preferring services over controllers."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        path = Path(frame.f_code.co_filename)
+        if str(path).startswith(_APP_DIR) and path.parent.name != "config":
+            location = f"{path.stem}.{frame.f_code.co_name}:{frame.f_lineno}"
+            if path.parent.name == "services":
+                return location
+            fallback = fallback or location
+        frame = frame.f_back
+    return fallback
+
+
+def _explain(conn, statement: str, parameters) -> list[str] | None:
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception:
+        logger.debug("EXPLAIN failed for slow statement", exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+    if dialect == "sqlite":
+        return [str(row[-1]) for row in rows]
+    return [str(row[0]) for row in rows]
+
+
+def instrument_slow_queries(engine) -> None:
+    if DB_SLOW_QUERY_MS <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info[_START_KEY].pop()) * 1000
+        if elapsed_ms < DB_SLOW_QUERY_MS:
+            return
+
+        shape = statement_shape(statement)
+        with _lock:
+            first_time = shape not in _plans
+            if first_time:
+                _plans[shape] = None
+        if first_time and not executemany:
+            plan = _explain(conn, statement, parameters)
+            with _lock:
+                _plans[shape] = plan
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed_ms, 2),
+            "caller": _calling_function(),
+            "statement": shape[:2000],
+            "shape": shape,
+            "params": _redact(parameters),
+            "executemany": executemany,
+        }
+        with _lock:
+            _entries.append(entry)
+        logger.warning(
+            "Slow query %.1f ms in %s: %s params=%s",
+            elapsed_ms,
+            entry["caller"],
+            entry["statement"][:500],
+            entry["params"],
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_START_KEY):
+            conn.info[_START_KEY].pop()
+
+
+def get_slow_queries(limit: int = 50) -> dict:
+    with _lock:
+        recent = list(_entries)[-limit:][::-1] if limit > 0 else []
+        plans = dict(_plans)
+    return {
+        "threshold_ms": DB_SLOW_QUERY_MS,
+        "entries": [
+            {**{key: value for key, value in item.items() if key != "shape"}, "plan": plans.get(item["shape"])}
+            for item in recent
+        ],
+    }
+
@@ -0,0 +1,188 @@
+"""SQLite performance mode for single-box deployments.
+
+Connections get WAL journaling and tuned pragmas. A session transaction is only
+opened when its first statement runs: plain reads before that run in autocommit (like
+pysqlite's own default), and the first write or ``SELECT ... FOR UPDATE`` takes the
+in-process FIFO writer queue and opens ``BEGIN IMMEDIATE``. A session that only
+reads never waits for, or blocks, writers; a writer never starts as a reader and
+later fails to upgrade its lock ("database is locked"). Read-modify-write code locks
+its first read with ``with_for_update()`` so the check and the write share one
+transaction. Read-only connections use a plain deferred ``BEGIN`` and keep reading
+concurrently while one writer is active (WAL).
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+
+READONLY_OPTION = "sqlite_readonly"
+_LOCK_INFO_KEY = "sqlite_writer_lock"
+_PENDING_INFO_KEY = "sqlite_begin_pending"
+_WRITE_STATEMENT = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+
+class WriterQueue:
+    """FIFO lock: writers get the database in the order they asked for it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: deque[tuple[threading.Event, int]] = deque()
+        self._held = False
+        self._owner: int | None = None
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def acquire(self, timeout: float) -> bool:
+        started = time.perf_counter()
+        thread_id = threading.get_ident()
+        with self._lock:
+            if self._held and self._owner == thread_id:
+                # A second write session on the thread that holds the lock would wait on itself.
+                raise RuntimeError("SQLite writer lock is already held by another session on this thread")
+            if not self._held and not self._waiters:
+                self._held = True
+                self._owner = thread_id
+                self._record(started)
+                return True
+            waiter = threading.Event()
+            self._waiters.append((waiter, thread_id))
+
+        if not waiter.wait(timeout):
+            with self._lock:
+                # release() may have handed the lock over right as the wait timed out.
+                if not waiter.is_set():
+                    self._waiters.remove((waiter, thread_id))
+                    self.timeouts += 1
+                    return False
+
+        with self._lock:
+            self._record(started)
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Hand over directly; the lock stays held by the next writer in line.
+                waiter, self._owner = self._waiters.popleft()
+                waiter.set()
+            else:
+                self._held = False
+                self._owner = None
+
+    def _record(self, started: float) -> None:
+        waited_ms = (time.perf_counter() - started) * 1000
+        self.acquired += 1
+        self.wait_total_ms += waited_ms
+        self.wait_max_ms = max(self.wait_max_ms, waited_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "held": self._held,
+                "queued": len(self._waiters),
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / self.acquired, 3) if self.acquired else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+            }
+
+
+writer_queue = WriterQueue()
+
+
+def _apply_pragmas(dbapi_connection) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _release_writer(info: dict) -> None:
+    info.pop(_PENDING_INFO_KEY, None)
+    if info.pop(_LOCK_INFO_KEY, False):
+        writer_queue.release()
+
+
+def _needs_writer(statement: str, context) -> bool:
+    if _WRITE_STATEMENT.match(statement):
+        return True
+    # SQLite drops FOR UPDATE from the SQL; the compiled select still carries it.
+    compiled = getattr(context, "compiled", None)
+    return getattr(getattr(compiled, "statement", None), "_for_update_arg", None) is not None
+
+
+def _begin_write(conn) -> None:
+    if not writer_queue.acquire(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000):
+        raise TimeoutError("Timed out waiting for the SQLite writer queue")
+    conn.info[_LOCK_INFO_KEY] = True
+    try:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    except Exception:
+        _release_writer(conn.info)
+        raise
+
+
+def enable_sqlite_performance_mode(engine) -> None:
+    """Install pragmas and the writer queue on a sync pysqlite engine."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Stop pysqlite from issuing its own deferred BEGIN; _on_begin decides the mode.
+        dbapi_connection.isolation_level = None
+        _apply_pragmas(dbapi_connection)
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        if conn.get_execution_options().get(READONLY_OPTION):
+            conn.exec_driver_sql("BEGIN")
+            return
+        # Nothing is sent yet; _on_before_execute opens the write transaction when needed.
+        conn.info[_PENDING_INFO_KEY] = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _on_before_execute(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_PENDING_INFO_KEY) and _needs_writer(statement, context):
+            del conn.info[_PENDING_INFO_KEY]
+            _begin_write(conn)
+
+    @event.listens_for(engine, "commit")
+    def _on_commit(conn):
+        _release_writer(conn.info)
+
+    @event.listens_for(engine, "rollback")
+    def _on_rollback(conn):
+        _release_writer(conn.info)
+
+    # Safety nets for connections returned or discarded mid-transaction.
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _release_writer(connection_record.info)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        _release_writer(connection_record.info)
+
+
+def enable_sqlite_pragmas(engine) -> None:
+    """Pragmas only, for the async (read-only) aiosqlite engine."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection)
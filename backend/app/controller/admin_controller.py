@@ -1,6 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date, time
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.api.response import API
+from app.config.database import get_async_read_db, get_read_db
 from app.model.schemas import (
     AdminCreateBusInput,
     AdminCreateRouteInput,
@@ -25,6 +32,9 @@ from app.services.bus_service import (
     set_bus_status,
     update_bus,
 )
+from app.services.fleet_import_service import import_fleet, parse_fleet_file
+from app.services.manifest_service import render_manifest_pdf, stream_manifest_csv
+from app.services.pdf_render_service import PdfRenderBusy
 from app.services.route_service import (
     create_route,
     delete_route,
@@ -52,30 +62,91 @@ router = APIRouter(
 )
 
 
-@router.get("/bookings", summary="List admin bookings", description="Return all bookings visible to admin dashboard.")
-def admin_list_bookings():
+@router.get(
+    "/bookings",
+    summary="List admin bookings",
+    description=(
+        "Return bookings visible to admin dashboard, optionally for a journey-date range. "
+        "Without journey_from only live (not yet archived) bookings are listed; ranges "
+        "starting before the archive horizon also include archived bookings."
+    ),
+)
+def admin_list_bookings(
+    journey_from: date | None = None,
+    journey_to: date | None = None,
+    db: Session = Depends(get_read_db),
+):
     return API.success_with_data(
         "Bookings loaded",
         "bookings",
-        list_admin_bookings(),
+        list_admin_bookings(db=db, journey_from=journey_from, journey_to=journey_to),
+    )
+
+
+@router.get(
+    "/manifests",
+    summary="Export passenger manifest",
+    description=(
+        "Every passenger and seat for one journey date, per trip, as CSV (streamed) or PDF "
+        "(one trip per page). Narrow it to trips with schedule_id (repeatable), or a depot's "
+        "departures with origin, vendor_id and a departure-time window."
+    ),
+    responses={
+        200: {"content": {"text/csv": {}, "application/pdf": {}}, "description": "Passenger manifest"},
+        503: {"description": "PDF rendering is busy, retry shortly"},
+    },
+)
+async def admin_export_manifest(
+    journey_date: date,
+    schedule_id: Annotated[list[int] | None, Query()] = None,
+    origin: str | None = None,
+    vendor_id: int | None = None,
+    departs_after: time | None = None,
+    departs_before: time | None = None,
+    export_format: Annotated[Literal["csv", "pdf"], Query(alias="format")] = "csv",
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    filters = {
+        "schedule_ids": schedule_id,
+        "origin": origin,
+        "vendor_id": vendor_id,
+        "departs_after": departs_after,
+        "departs_before": departs_before,
+    }
+    scope = f"_S{schedule_id[0]}" if schedule_id and len(schedule_id) == 1 else ""
+    filename = f"manifest_{journey_date}{scope}.{export_format}"
+    # Passenger contact details: never keep a copy in shared caches.
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "private, no-store"}
+
+    if export_format == "pdf":
+        try:
+            content = await render_manifest_pdf(db, journey_date, **filters)
+        except PdfRenderBusy:
+            raise HTTPException(status_code=503, detail="Manifest rendering is busy, retry shortly", headers={"Retry-After": "2"})
+        return Response(content=content, media_type="application/pdf", headers=headers)
+
+    return StreamingResponse(
+        stream_manifest_csv(db, journey_date, **filters),
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
     )
 
 
 @router.get("/analytics", summary="Get admin analytics", description="Return aggregated booking, route, and review analytics for admin dashboard.")
-def admin_analytics():
+def admin_analytics(db: Session = Depends(get_read_db)):
     return API.success_with_data(
         "Analytics loaded",
         "analytics",
-        get_admin_analytics(),
+        get_admin_analytics(db=db),
     )
 
 
 @router.get("/reviews", summary="List admin reviews", description="Return reviews for moderation and quality monitoring.")
-def admin_list_reviews():
+def admin_list_reviews(db: Session = Depends(get_read_db)):
     return API.success_with_data(
         "Reviews loaded",
         "reviews",
-        list_admin_reviews(),
+        list_admin_reviews(db=db),
     )
 
 
@@ -93,10 +164,31 @@ def admin_create_bus(payload: AdminCreateBusInput):
         to_city=payload.to_city,
         price=payload.price,
         seat_capacity=payload.seat_capacity,
+        vendor_id=payload.vendor_id,
     )
     return API.success_with_data("Bus created", "bus", bus)
 
 
+@router.post(
+    "/buses/import",
+    summary="Import fleet",
+    description=(
+        "Create many buses from a CSV or JSON file (same fields as Create bus). "
+        "All rows are validated first; the import is all-or-nothing."
+    ),
+    responses={400: {"description": "Unreadable file or invalid rows (per-row errors in detail)"}},
+)
+def admin_import_fleet(fleet_file: Annotated[UploadFile, File(...)], dry_run: bool = False):
+    rows, error = parse_fleet_file(fleet_file.file.read(), fleet_file.filename)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    report, error_key = import_fleet(rows, dry_run=dry_run)
+    if error_key == "rows":
+        raise HTTPException(status_code=400, detail={"message": "Fleet file has invalid rows", **report})
+    return API.success_with_data("Fleet validated" if dry_run else "Fleet imported", "import", report)
+
+
 @router.put(
     "/buses/{bus_id}",
     summary="Update bus",
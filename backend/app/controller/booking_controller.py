@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException, Response
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.api.response import API
+from app.config.database import get_async_read_db, get_db, get_read_db
 from app.model.schemas import (
     CancelBookingInput,
     ConfirmBookingPaymentInput,
@@ -15,17 +21,18 @@ from app.model.schemas import (
 from app.services.booking_service import cancel_booking as cancel_booking_record
 from app.services.booking_service import confirm_booking_payment
 from app.services.booking_service import create_booking as create_booking_record
-from app.services.booking_service import get_booking_ticket_pdf
+from app.services.booking_service import get_booking_ticket_pdf_async
 from app.services.booking_service import get_refund_estimate
-from app.services.booking_service import get_seat_availability
+from app.services.booking_service import get_seat_availability_async
 from app.services.booking_service import modify_booking_seats
 from app.services.booking_service import replace_booking_seats
 from app.services.booking_service import (
-    list_bookings as list_booking_records,
-    list_bookings_by_user,
+    list_bookings_async,
+    list_bookings_by_user_async,
 )
 from app.services.esewa_service import initiate_esewa_payment, verify_esewa_transaction
 from app.services.khalti_service import initiate_khalti_payment, verify_khalti_transaction
+from app.services.pdf_render_service import PdfRenderBusy
 
 router = APIRouter()
 
@@ -39,7 +46,7 @@ DETAIL_CANNOT_UPDATE_BOOKING = "You cannot update this booking"
     summary="List bookings",
     description="List all bookings or filter by user_id query parameter.",
 )
-def list_bookings(user_id: int | None = None):
+async def list_bookings(user_id: int | None = None, db: AsyncSession = Depends(get_async_read_db)):
     """List bookings.
 
     Example queries:
@@ -47,8 +54,8 @@ def list_bookings(user_id: int | None = None):
     - /api/bookings?user_id=12
     """
     if user_id is not None:
-        return list_bookings_by_user(user_id)
-    return list_booking_records()
+        return await list_bookings_by_user_async(user_id, db)
+    return await list_bookings_async(db)
 
 
 @router.post(
@@ -60,7 +67,7 @@ def list_bookings(user_id: int | None = None):
         404: {"description": "User or bus not found"},
     },
 )
-def create_booking(payload: CreateBookingInput):
+def create_booking(payload: CreateBookingInput, db: Session = Depends(get_db)):
     """Create booking.
 
     Example request body:
@@ -82,6 +89,7 @@ def create_booking(payload: CreateBookingInput):
         seat_labels=payload.seat_labels,
         payment_method=payload.payment_method,
         is_counter_booking=payload.is_counter_booking,
+        db=db,
     )
     if error_key == "user":
         raise HTTPException(status_code=404, detail="User not found")
@@ -109,20 +117,22 @@ def create_booking(payload: CreateBookingInput):
         404: {"description": "Bus or schedule not found"},
     },
 )
-def get_availability(
+async def get_availability(
     bus_id: int,
     journey_date: str,
     booking_id: int | None = None,
     user_id: int | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Load seat map.
 
     Example query:
     /api/bookings/seat-availability?bus_id=4&journey_date=2026-04-05&booking_id=44&user_id=12
     """
-    availability, error_key = get_seat_availability(
+    availability, error_key = await get_seat_availability_async(
         bus_id=bus_id,
         journey_date=journey_date,
+        db=db,
         booking_id=booking_id,
         user_id=user_id,
     )
@@ -148,6 +158,7 @@ def refund_estimate(
     booking_id: int,
     user_id: int,
     remove_seat_labels: str | None = None,
+    db: Session = Depends(get_read_db),
 ):
     """Refund estimate endpoint.
 
@@ -162,6 +173,7 @@ def refund_estimate(
         booking_id=booking_id,
         user_id=user_id,
         remove_seat_labels=labels,
+        db=db,
     )
     if error_key == "booking":
         raise HTTPException(status_code=404, detail=DETAIL_BOOKING_NOT_FOUND)
@@ -188,11 +200,12 @@ def refund_estimate(
         404: {"description": "Booking not found"},
     },
 )
-def cancel_booking(booking_id: int, payload: CancelBookingInput):
+def cancel_booking(booking_id: int, payload: CancelBookingInput, db: Session = Depends(get_db)):
     """Cancel full booking by booking owner."""
     booking, refund, error_key = cancel_booking_record(
         booking_id=booking_id,
         user_id=payload.user_id,
+        db=db,
     )
     if error_key == "booking":
         raise HTTPException(status_code=404, detail=DETAIL_BOOKING_NOT_FOUND)
@@ -214,12 +227,13 @@ def cancel_booking(booking_id: int, payload: CancelBookingInput):
         404: {"description": "Booking not found"},
     },
 )
-def modify_seats(booking_id: int, payload: ModifyBookingSeatsInput):
+def modify_seats(booking_id: int, payload: ModifyBookingSeatsInput, db: Session = Depends(get_db)):
     """Partially modify seat list by removing seats only."""
     booking, refund, error_key = modify_booking_seats(
         booking_id=booking_id,
         user_id=payload.user_id,
         remove_seat_labels=payload.remove_seat_labels,
+        db=db,
     )
     if error_key == "booking":
         raise HTTPException(status_code=404, detail=DETAIL_BOOKING_NOT_FOUND)
@@ -250,7 +264,7 @@ def modify_seats(booking_id: int, payload: ModifyBookingSeatsInput):
         409: {"description": "One or more selected seats are already booked"},
     },
 )
-def replace_seats(booking_id: int, payload: ReplaceBookingSeatsInput):
+def replace_seats(booking_id: int, payload: ReplaceBookingSeatsInput, db: Session = Depends(get_db)):
     """Replace all selected seats for a booking.
 
     Example request body:
@@ -263,6 +277,7 @@ def replace_seats(booking_id: int, payload: ReplaceBookingSeatsInput):
         booking_id=booking_id,
         user_id=payload.user_id,
         seat_labels=payload.seat_labels,
+        db=db,
     )
     if error_key == "booking":
         raise HTTPException(status_code=404, detail=DETAIL_BOOKING_NOT_FOUND)
@@ -299,13 +314,14 @@ def replace_seats(booking_id: int, payload: ReplaceBookingSeatsInput):
         404: {"description": "Booking not found"},
     },
 )
-def confirm_payment(booking_id: int, payload: ConfirmBookingPaymentInput):
+def confirm_payment(booking_id: int, payload: ConfirmBookingPaymentInput, db: Session = Depends(get_db)):
     """Update payment state for booking."""
     booking, error_key = confirm_booking_payment(
         booking_id=booking_id,
         user_id=payload.user_id,
         payment_method=payload.payment_method,
         pay_later=payload.pay_later,
+        db=db,
     )
     if error_key == "booking":
         raise HTTPException(status_code=404, detail=DETAIL_BOOKING_NOT_FOUND)
@@ -326,8 +342,8 @@ def confirm_payment(booking_id: int, payload: ConfirmBookingPaymentInput):
         404: {"description": "Booking not found"},
     },
 )
-def confirm_payment_legacy(booking_id: int, payload: ConfirmBookingPaymentInput):
-    return confirm_payment(booking_id, payload)
+def confirm_payment_legacy(booking_id: int, payload: ConfirmBookingPaymentInput, db: Session = Depends(get_db)):
+    return confirm_payment(booking_id, payload, db=db)
 
 
 @router.post(
@@ -541,20 +557,33 @@ def initiate_khalti_payment_endpoint(booking_id: int, payload: InitiateKhaltiPay
 @router.get(
     "/{booking_id}/ticket.pdf",
     summary="Download booking ticket PDF",
-    description="Generate and download ticket PDF for booking owner.",
+    description=(
+        "Download ticket PDF for booking owner. Served from the PDF cache with a content-based ETag; "
+        "supports If-None-Match (304) and Range/If-Range requests."
+    ),
     responses={
+        304: {"description": "Ticket unchanged since the ETag in If-None-Match"},
         403: {"description": "You cannot download this booking ticket"},
         404: {"description": "Booking not found"},
         500: {"description": "Ticket generation failed"},
+        503: {"description": "PDF render queue is full; retry after Retry-After seconds"},
     },
 )
-def download_ticket(booking_id: int, user_id: int):
+async def download_ticket(
+    booking_id: int,
+    user_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: Annotated[str | None, Header()] = None,
+):
     """Download ticket PDF.
 
     Example query:
     /api/bookings/44/ticket.pdf?user_id=12
     """
-    pdf_bytes, error_key = get_booking_ticket_pdf(booking_id=booking_id, user_id=user_id)
+    try:
+        ticket, error_key = await get_booking_ticket_pdf_async(booking_id=booking_id, user_id=user_id, db=db)
+    except PdfRenderBusy:
+        raise HTTPException(status_code=503, detail="Ticket rendering is busy, retry shortly", headers={"Retry-After": "2"})
     if error_key == "booking":
         raise HTTPException(status_code=404, detail=DETAIL_BOOKING_NOT_FOUND)
     if error_key == "forbidden":
@@ -562,8 +591,14 @@ def download_ticket(booking_id: int, user_id: int):
     if error_key == "schedule" or error_key == "bus":
         raise HTTPException(status_code=500, detail="Unable to generate ticket")
 
-    return Response(
-        content=pdf_bytes,
+    # Private: the URL is per user, but the same user may re-download often.
+    cache_headers = {"ETag": ticket.etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and ticket.etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=cache_headers)
+
+    return FileResponse(
+        ticket.path,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=ticket_BK{booking_id}.pdf"},
+        filename=f"ticket_BK{booking_id}.pdf",
+        headers=cache_headers,
     )
@@ -1,10 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.response import API
+from app.config.database import get_async_read_db
 from app.model.schemas import CreateBusInput
 from app.services.bus_service import create_bus as create_bus_record
-from app.services.bus_service import list_buses as list_bus_records
-from app.services.bus_service import list_search_locations as list_search_location_records
+from app.services.bus_service import list_buses_async
+from app.services.bus_service import list_search_locations_async
 
 router = APIRouter()
 
@@ -14,9 +16,9 @@ router = APIRouter()
     summary="List active buses",
     description="Return active buses with route and fare context for booking search.",
 )
-def list_buses():
+async def list_buses(db: AsyncSession = Depends(get_async_read_db)):
     """List available buses for customer search."""
-    return list_bus_records()
+    return await list_buses_async(db)
 
 
 @router.get(
@@ -24,12 +26,12 @@ def list_buses():
     summary="List searchable locations",
     description="Return origin/destination city combinations used in booking search form.",
 )
-def list_search_locations():
+async def list_search_locations(db: AsyncSession = Depends(get_async_read_db)):
     """Get route location pairs for search dropdowns."""
     return API.success_with_data(
         "Search locations loaded",
         "locations",
-        list_search_location_records(),
+        await list_search_locations_async(db),
     )
 
 
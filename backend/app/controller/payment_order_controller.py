@@ -1,9 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Header, HTTPException
 from fastapi.responses import RedirectResponse
 import os
 
+from app.api.idempotency import idempotent_call
+from app.jobs import wake_verification_workers
 from app.api.response import API
 from app.model.schemas import (
     PaymentOrderCreateInput,
@@ -16,9 +18,11 @@ from app.services.payment_order_service import (
     initiate_esewa_for_order,
     initiate_khalti_for_order,
     simulate_refund,
-    verify_khalti_by_pidx_and_create_booking,
-    verify_esewa_and_create_booking,
-    verify_khalti_and_create_booking,
+)
+from app.services.payment_verification_service import (
+    enqueue_khalti_verification_by_pidx,
+    enqueue_verification,
+    get_order_verification,
 )
 from app.services.khalti_demo_service import initiate_khalti_demo, verify_khalti_demo
 
@@ -26,6 +30,7 @@ router = APIRouter()
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
 DETAIL_PAYMENT_ORDER_NOT_FOUND = "Payment order not found"
 DETAIL_KHALTI_NETWORK = "Unable to connect to Khalti"
+IdempotencyKey = Annotated[str | None, Header(alias="Idempotency-Key")]
 
 
 def _raise_khalti_demo_initiate_error(error_key: str):
@@ -76,28 +81,27 @@ def _raise_khalti_demo_verify_error(error_key: str):
     raise HTTPException(status_code=500, detail=f"Khalti verify failed: {error_key}")
 
 
-def _raise_khalti_order_verify_error(error_key: str):
-    if error_key in {"pidx", "status", "expired", "failed", "not_complete", "amount", "trip", "seat_layout", "seat_invalid", "seat_inactive", "seat_blocked", "seat_booked"}:
-        raise HTTPException(status_code=400, detail=f"Khalti verification failed: {error_key}")
-    if error_key in {"gateway", "network", "invalid_response"}:
-        raise HTTPException(status_code=502, detail=f"Khalti verification failed: {error_key}")
-    if error_key == "auth":
-        raise HTTPException(status_code=503, detail="Khalti API key is invalid or unauthorized")
-    if error_key == "invalid_request":
-        raise HTTPException(status_code=400, detail="Invalid Khalti verify payload")
-    raise HTTPException(status_code=502, detail=f"Khalti verification failed: {error_key}")
-
-
 @router.post(
     "/create-order",
     summary="Create payment order",
     responses={
         400: {"description": "Invalid date, amount, or seat selection"},
         404: {"description": "Trip or bus not found"},
-        409: {"description": "Seat already booked"},
+        409: {"description": "Seat already booked, or the same Idempotency-Key is still in progress"},
+        422: {"description": "Idempotency-Key reused with a different request"},
     },
 )
-def create_order(payload: PaymentOrderCreateInput):
+def create_order(payload: PaymentOrderCreateInput, idempotency_key: IdempotencyKey = None):
+    return idempotent_call(
+        idempotency_key,
+        scope=f"user:{payload.user_id}",
+        endpoint="payment-orders.create",
+        fingerprint=payload.model_dump(mode="json"),
+        handler=lambda: _create_order(payload),
+    )
+
+
+def _create_order(payload: PaymentOrderCreateInput):
     order, error_key = create_payment_order(
         user_id=payload.user_id,
         trip_id=payload.trip_id,
@@ -141,7 +145,10 @@ def create_order(payload: PaymentOrderCreateInput):
         500: {"description": "Khalti API rejected request or returned invalid response"},
     },
 )
-def initiate_khalti(payload: Annotated[PaymentOrderInitiateInput | None, Body()] = None):
+def initiate_khalti(
+    payload: Annotated[PaymentOrderInitiateInput | None, Body()] = None,
+    idempotency_key: IdempotencyKey = None,
+):
     # Demo fallback: if body is missing, call Khalti sandbox initiate directly.
     if payload is None:
         demo, demo_err = initiate_khalti_demo(amount_paisa=1000)
@@ -149,6 +156,16 @@ def initiate_khalti(payload: Annotated[PaymentOrderInitiateInput | None, Body()]
             _raise_khalti_demo_initiate_error(demo_err)
         return demo
 
+    return idempotent_call(
+        idempotency_key,
+        scope=f"user:{payload.user_id}",
+        endpoint="payment-orders.khalti.initiate",
+        fingerprint=payload.model_dump(mode="json"),
+        handler=lambda: _initiate_khalti(payload),
+    )
+
+
+def _initiate_khalti(payload: PaymentOrderInitiateInput):
     payment, error_key = initiate_khalti_for_order(
         order_id=payload.order_id,
         user_id=payload.user_id,
@@ -162,29 +179,27 @@ def initiate_khalti(payload: Annotated[PaymentOrderInitiateInput | None, Body()]
 
 @router.post(
     "/khalti/verify",
-    summary="Verify Khalti payment by pidx and finalize booking",
+    summary="Queue Khalti verification by pidx",
+    description="Returns the queued verification; poll /orders/{order_id}/verification for the outcome.",
     responses={
-        400: {"description": "Invalid or incomplete payment"},
-        404: {"description": "Payment order not found"},
-        502: {"description": "Khalti verification failed"},
-        503: {"description": "Khalti service is not configured"},
-        500: {"description": "Khalti lookup API rejected request or returned invalid response"},
+        400: {"description": "Missing pidx"},
+        500: {"description": "Khalti lookup API rejected request or returned invalid response (demo fallback)"},
     },
 )
 def verify_khalti_post(payload: PaymentOrderKhaltiVerifyInput):
-    result, error_key = verify_khalti_by_pidx_and_create_booking(pidx=payload.pidx)
+    verification, error_key = enqueue_khalti_verification_by_pidx(payload.pidx)
 
-    if error_key == "config":
-        raise HTTPException(status_code=503, detail="Khalti configuration missing")
+    if error_key == "pidx":
+        raise HTTPException(status_code=400, detail="Khalti pidx is required")
     if error_key == "order":
         demo_result, demo_err = verify_khalti_demo(payload.pidx)
         if demo_err:
             _raise_khalti_demo_verify_error(demo_err)
         return demo_result
-    if error_key:
-        _raise_khalti_order_verify_error(error_key)
 
-    return API.success_with_data("Khalti payment verified", "payment", result)
+    if verification["state"] != "succeeded":
+        wake_verification_workers()
+    return API.success_with_data("Khalti verification accepted", "verification", verification)
 
 
 @router.post(
@@ -197,7 +212,17 @@ def verify_khalti_post(payload: PaymentOrderKhaltiVerifyInput):
         503: {"description": "eSewa not configured"},
     },
 )
-def initiate_esewa(payload: PaymentOrderInitiateInput):
+def initiate_esewa(payload: PaymentOrderInitiateInput, idempotency_key: IdempotencyKey = None):
+    return idempotent_call(
+        idempotency_key,
+        scope=f"user:{payload.user_id}",
+        endpoint="payment-orders.esewa.initiate",
+        fingerprint=payload.model_dump(mode="json"),
+        handler=lambda: _initiate_esewa(payload),
+    )
+
+
+def _initiate_esewa(payload: PaymentOrderInitiateInput):
     payment, error_key = initiate_esewa_for_order(
         order_id=payload.order_id,
         user_id=payload.user_id,
@@ -223,34 +248,51 @@ def initiate_esewa(payload: PaymentOrderInitiateInput):
     return API.success_with_data("eSewa initiated", "payment", payment)
 
 
-@router.get("/khalti/verify", summary="Verify Khalti payment and finalize booking")
-def verify_khalti(order_id: int, pidx: str | None = None, mock_status: str | None = None):
-    result, error_key = verify_khalti_and_create_booking(order_id=order_id, pidx=pidx, mock_status=mock_status)
-
+def _callback_redirect(order_id: int, verification: dict | None, error_key: str | None) -> RedirectResponse:
     if error_key:
-        failure_url = f"{FRONTEND_URL}/booking/callback?status=failure&order_id={order_id}&reason={error_key}"
-        return RedirectResponse(url=failure_url, status_code=303)
-
-    success_url = (
-        f"{FRONTEND_URL}/booking/callback?status=success&order_id={result['order_id']}"
-        f"&booking_id={result['booking_id']}&booking_reference={result['booking_reference']}"
-    )
-    return RedirectResponse(url=success_url, status_code=303)
+        url = f"{FRONTEND_URL}/booking/callback?status=failure&order_id={order_id}&reason={error_key}"
+    elif verification["state"] == "succeeded":
+        result = verification["result"]
+        url = (
+            f"{FRONTEND_URL}/booking/callback?status=success&order_id={result['order_id']}"
+            f"&booking_id={result['booking_id']}&booking_reference={result['booking_reference']}"
+        )
+    else:
+        wake_verification_workers()
+        url = (
+            f"{FRONTEND_URL}/booking/callback?status=pending&order_id={order_id}"
+            f"&verification_id={verification['verification_id']}"
+        )
+    return RedirectResponse(url=url, status_code=303)
+
+
+@router.get("/khalti/verify", summary="Accept Khalti callback and queue verification")
+def verify_khalti(order_id: int, pidx: str | None = None, mock_status: str | None = None):
+    # Sirf callback record garne; lookup/booking/email worker pool le garcha.
+    verification, error_key = enqueue_verification(order_id, "khalti", {"pidx": pidx, "mock_status": mock_status})
+    return _callback_redirect(order_id, verification, error_key)
 
 
-@router.get("/esewa/verify/{order_id}", summary="Verify eSewa payment and finalize booking")
+@router.get("/esewa/verify/{order_id}", summary="Accept eSewa callback and queue verification")
 def verify_esewa(order_id: int, data: str | None = None, status: str | None = None):
-    result, error_key = verify_esewa_and_create_booking(order_id=order_id, data=data, status=status)
-
+    verification, error_key = enqueue_verification(order_id, "esewa", {"data": data, "status": status})
+    return _callback_redirect(order_id, verification, error_key)
+
+
+@router.get(
+    "/orders/{order_id}/verification",
+    summary="Get payment verification status",
+    description=(
+        "Poll after a gateway callback; state is queued, processing, succeeded or failed. "
+        "user_id must own the order."
+    ),
+    responses={404: {"description": "No verification recorded for this user's order"}},
+)
+def get_verification(order_id: int, user_id: int, verification_id: int | None = None):
+    verification, error_key = get_order_verification(order_id, user_id, verification_id)
     if error_key:
-        failure_url = f"{FRONTEND_URL}/booking/callback?status=failure&order_id={order_id}&reason={error_key}"
-        return RedirectResponse(url=failure_url, status_code=303)
-
-    success_url = (
-        f"{FRONTEND_URL}/booking/callback?status=success&order_id={result['order_id']}"
-        f"&booking_id={result['booking_id']}&booking_reference={result['booking_reference']}"
-    )
-    return RedirectResponse(url=success_url, status_code=303)
+        raise HTTPException(status_code=404, detail="Payment verification not found")
+    return API.success_with_data("Payment verification loaded", "verification", verification)
 
 
 @router.get("/esewa/verify", summary="Legacy verify eSewa payment and finalize booking")
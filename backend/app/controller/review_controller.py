@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 
 from app.api.response import API
+from app.config.database import get_read_db
 from app.model.schemas import CreateReviewInput
 from app.services.review_service import create_review, list_reviews_by_user
 
@@ -19,13 +21,13 @@ router = APIRouter(
     summary="List user reviews",
     description="Return reviews submitted by a specific user.",
 )
-def list_reviews(user_id: int):
+def list_reviews(user_id: int, db: Session = Depends(get_read_db)):
     """List reviews by user id.
 
     Example query:
     /api/reviews?user_id=12
     """
-    return API.success_with_data("Reviews loaded", "reviews", list_reviews_by_user(user_id))
+    return API.success_with_data("Reviews loaded", "reviews", list_reviews_by_user(user_id, db=db))
 
 
 @router.post(
@@ -64,6 +66,6 @@ def submit_review(payload: CreateReviewInput):
     if error_key == "duplicate":
         raise HTTPException(status_code=409, detail="Review already submitted for this booking")
     if error_key == "too_early":
-        raise HTTPException(status_code=400, detail="Review is available 24 hours after journey start")
+        raise HTTPException(status_code=400, detail="Review is available once the journey is completed")
 
     return API.success_with_data("Review submitted", "review", review)
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException
 
 from app.api.response import API
+from app.config.database import get_pool_stats
+from app.config.slow_queries import get_slow_queries
+from app.jobs import get_email_worker_stats, get_job_stats, get_verification_worker_stats
 from app.model.schemas import (
     AdminCreateBusInput,
     AdminCreateRouteInput,
@@ -19,6 +22,8 @@ from app.services.bus_service import (
     set_bus_status,
     update_bus,
 )
+from app.services.gateway_client import get_gateway_stats
+from app.services.pdf_render_service import get_pdf_render_stats
 from app.services.route_service import (
     create_route,
     delete_route,
@@ -38,6 +43,7 @@ from app.services.superadmin_service import (
     delete_vendor,
     get_superadmin_analytics,
     list_vendors,
+    set_vendor_fleet_status,
     update_vendor,
     verify_vendor,
 )
@@ -60,6 +66,69 @@ def superadmin_analytics():
     return API.success_with_data("Superadmin analytics loaded", "analytics", get_superadmin_analytics())
 
 
+@router.get(
+    "/diagnostics/db-pool",
+    summary="Get DB pool stats",
+    description="Return pool settings, current usage and checkout/wait/overflow counters for this worker process.",
+)
+def superadmin_db_pool_stats():
+    return API.success_with_data("DB pool stats loaded", "pool", get_pool_stats())
+
+
+@router.get(
+    "/diagnostics/slow-queries",
+    summary="Get slow query log",
+    description="Return recent statements over DB_SLOW_QUERY_MS with redacted params, caller and captured EXPLAIN plan.",
+)
+def superadmin_slow_queries(limit: int = 50):
+    return API.success_with_data("Slow queries loaded", "slow_queries", get_slow_queries(limit))
+
+
+@router.get(
+    "/diagnostics/jobs",
+    summary="Get background job stats",
+    description="Return job runner state for this worker: leadership, registered jobs, run counts, durations and last errors.",
+)
+def superadmin_job_stats():
+    return API.success_with_data("Background jobs loaded", "jobs", get_job_stats())
+
+
+@router.get(
+    "/diagnostics/payment-verifications",
+    summary="Get payment verification worker stats",
+    description="Return verification pool size, in-flight work and outcome counters for this worker, plus queue depth.",
+)
+def superadmin_verification_worker_stats():
+    return API.success_with_data("Payment verification workers loaded", "verification", get_verification_worker_stats())
+
+
+@router.get(
+    "/diagnostics/email-outbox",
+    summary="Get email outbox worker stats",
+    description="Return outbox depth, oldest queued email age and this worker's send/retry/failure counters.",
+)
+def superadmin_email_worker_stats():
+    return API.success_with_data("Email outbox loaded", "email", get_email_worker_stats())
+
+
+@router.get(
+    "/diagnostics/pdf-render",
+    summary="Get PDF render pool stats",
+    description="Return PDF process pool size, queue occupancy, rejections, and queue-wait / render-time percentiles.",
+)
+def superadmin_pdf_render_stats():
+    return API.success_with_data("PDF render stats loaded", "pdf_render", get_pdf_render_stats())
+
+
+@router.get(
+    "/diagnostics/gateways",
+    summary="Get payment gateway client stats",
+    description="Return per-gateway call counts, latency, retries and circuit breaker state for this worker process.",
+)
+def superadmin_gateway_stats():
+    return API.success_with_data("Gateway stats loaded", "gateways", get_gateway_stats())
+
+
 @router.get("/vendors", summary="List vendors", description="Return vendor accounts with verification and activation state.")
 def superadmin_list_vendors():
     return API.success_with_data("Vendors loaded", "vendors", list_vendors())
@@ -135,6 +204,19 @@ def superadmin_delete_vendor(vendor_id: int):
     return API.success("Vendor deactivated")
 
 
+@router.patch(
+    "/vendors/{vendor_id}/fleet/status",
+    summary="Update vendor fleet status",
+    description="Activate/deactivate every bus, schedule and seat of a vendor in one transaction.",
+    responses={404: {"description": "Vendor not found"}},
+)
+def superadmin_vendor_fleet_status(vendor_id: int, payload: StatusInput):
+    fleet, error_key = set_vendor_fleet_status(vendor_id, payload.is_active)
+    if error_key == "vendor":
+        raise HTTPException(status_code=404, detail=NOT_FOUND_VENDOR)
+    return API.success_with_data("Vendor fleet status updated", "fleet", fleet)
+
+
 @router.get("/buses", summary="List buses", description="Return all buses for global management.")
 def superadmin_list_buses():
     return API.success_with_data("Buses loaded", "buses", list_all_buses())
@@ -149,6 +231,7 @@ def superadmin_create_bus(payload: AdminCreateBusInput):
         to_city=payload.to_city,
         price=payload.price,
         seat_capacity=payload.seat_capacity,
+        vendor_id=payload.vendor_id,
     )
     return API.success_with_data("Bus created", "bus", bus)
 
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 from app.api.response import API
+from app.config.database import get_read_db
 from app.model.schemas import UpdateUserProfileInput
 from app.services.user_service import get_user_output, list_users_output, update_user_profile
 
@@ -15,9 +17,9 @@ router = APIRouter(
     summary="List users",
     description="Return all users with lightweight profile fields.",
 )
-def list_users():
+def list_users(db: Session = Depends(get_read_db)):
     """List user accounts."""
-    return list_users_output()
+    return list_users_output(db=db)
 
 
 @router.get(
@@ -26,13 +28,13 @@ def list_users():
     description="Return one user profile by numeric user id.",
     responses={404: {"description": "User not found"}},
 )
-def get_user(user_id: int):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """Get user details.
 
     Example path:
     /api/users/12
     """
-    user = get_user_output(user_id)
+    user = get_user_output(user_id, db=db)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return API.success_with_data("User found", "user", user)
@@ -0,0 +1,28 @@
+"""Background jobs: a leader-elected runner with its maintenance jobs, plus the
+payment verification pool and the email outbox worker that run on every process."""
+
+from app.jobs import maintenance
+from app.jobs.email_worker import get_email_worker_stats, start_email_worker, stop_email_worker, wake_email_worker
+from app.jobs.runner import get_job_stats, register_job, start_jobs, stop_jobs
+from app.jobs.verification_workers import (
+    get_verification_worker_stats,
+    start_verification_workers,
+    stop_verification_workers,
+    wake_verification_workers,
+)
+
+__all__ = [
+    "get_email_worker_stats",
+    "get_job_stats",
+    "get_verification_worker_stats",
+    "maintenance",
+    "register_job",
+    "start_email_worker",
+    "start_jobs",
+    "start_verification_workers",
+    "stop_email_worker",
+    "stop_jobs",
+    "stop_verification_workers",
+    "wake_email_worker",
+    "wake_verification_workers",
+]
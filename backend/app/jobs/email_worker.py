@@ -0,0 +1,101 @@
+"""SMTP worker that drains the email outbox.
+
+Runs on every worker process, like the verification pool: one thread with one
+persistent SMTP connection (STARTTLS and login once, not per message) sends the
+outbox in batches of EMAIL_OUTBOX_BATCH_SIZE. A commit that queued mail wakes it
+right away; otherwise it polls every EMAIL_OUTBOX_POLL_SECONDS, which also picks up
+retries and rows left behind by a dead process. The connection is closed again
+after SMTP_IDLE_SECONDS without mail.
+"""
+
+import logging
+import os
+import threading
+from collections import Counter
+
+from app.jobs.runner import WORKER_ID
+from app.services.email_outbox_service import (
+    claim_due_emails,
+    email_outbox_depth,
+    outbox_signal,
+    send_claimed_emails,
+)
+from app.services.email_service import SmtpConnection
+
+logger = logging.getLogger(__name__)
+
+EMAIL_WORKER_ENABLED = os.getenv("EMAIL_WORKER_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+
+_stop = threading.Event()
+_stats_lock = threading.Lock()
+_thread: threading.Thread | None = None
+_connection: SmtpConnection | None = None
+_stats = Counter()
+
+
+def wake_email_worker() -> None:
+    outbox_signal.set()
+
+
+def _drain() -> None:
+    while not _stop.is_set():
+        outbox_signal.clear()
+        try:
+            claimed = claim_due_emails(WORKER_ID, EMAIL_OUTBOX_BATCH_SIZE)
+            if claimed:
+                counts = send_claimed_emails(claimed, WORKER_ID, _connection)
+                with _stats_lock:
+                    _stats.update(counts)
+                    _stats["batches"] += 1
+                if len(claimed) == EMAIL_OUTBOX_BATCH_SIZE:
+                    # Probably more waiting; go again without sleeping.
+                    continue
+            else:
+                _connection.close_if_idle()
+        except Exception:
+            logger.exception("Email outbox worker failed")
+            with _stats_lock:
+                _stats["errors"] += 1
+        outbox_signal.wait(EMAIL_OUTBOX_POLL_SECONDS)
+    _connection.close()
+
+
+def start_email_worker() -> None:
+    global _thread, _connection
+    if not EMAIL_WORKER_ENABLED or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _connection = SmtpConnection()
+    _thread = threading.Thread(target=_drain, name="email-outbox", daemon=True)
+    _thread.start()
+
+
+def stop_email_worker(timeout: float = 10.0) -> None:
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    outbox_signal.set()
+    # The batch in progress finishes; anything unclaimed stays queued for the next start.
+    _thread.join(timeout)
+    _thread = None
+
+
+def get_email_worker_stats() -> dict:
+    with _stats_lock:
+        stats = {
+            "enabled": EMAIL_WORKER_ENABLED,
+            "batch_size": EMAIL_OUTBOX_BATCH_SIZE,
+            "poll_seconds": EMAIL_OUTBOX_POLL_SECONDS,
+            "running": _thread is not None and _thread.is_alive(),
+            "smtp_connects": _connection.connects if _connection is not None else 0,
+            **{key: _stats[key] for key in ("batches", "sent", "retried", "failed", "skipped", "errors")},
+        }
+    try:
+        stats["queue"] = email_outbox_depth()
+    except Exception:
+        logger.exception("Could not read email outbox depth")
+        stats["queue"] = None
+    return stats
@@ -0,0 +1,70 @@
+"""Periodic maintenance jobs. Importing this module registers them with the runner."""
+
+import os
+
+from app.jobs.runner import register_job
+from app.jobs.verification_workers import wake_verification_workers
+from app.services.archive_service import archive_old_bookings
+from app.services.booking_service import complete_finished_bookings
+from app.services.email_outbox_service import purge_finished_emails
+from app.services.idempotency_service import purge_expired_records
+from app.services.payment_order_service import expire_stale_payment_orders
+from app.services.pdf_cache_service import prune_pdf_cache
+from app.services.payment_verification_service import purge_finished_verifications
+from app.services.reconciliation_service import PAYMENT_RECONCILE_CONCURRENCY, reconcile_pending_orders
+
+BOOKING_ARCHIVE_INTERVAL_SECONDS = float(os.getenv("BOOKING_ARCHIVE_INTERVAL_SECONDS", "21600"))
+# Bounded per run so the job stays well inside the scheduler lease; the next run continues.
+BOOKING_ARCHIVE_MAX_BATCHES = int(os.getenv("BOOKING_ARCHIVE_MAX_BATCHES", "20"))
+PAYMENT_ORDER_SWEEP_INTERVAL_SECONDS = float(os.getenv("PAYMENT_ORDER_SWEEP_INTERVAL_SECONDS", "60"))
+BOOKING_COMPLETION_INTERVAL_SECONDS = float(os.getenv("BOOKING_COMPLETION_INTERVAL_SECONDS", "600"))
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "3600"))
+PAYMENT_RECONCILE_INTERVAL_SECONDS = float(os.getenv("PAYMENT_RECONCILE_INTERVAL_SECONDS", "300"))
+# Small batches under a time budget: each lookup can take a full gateway latency budget.
+PAYMENT_RECONCILE_JOB_SECONDS = float(os.getenv("PAYMENT_RECONCILE_JOB_SECONDS", "30"))
+
+
+@register_job("archive_old_bookings", interval_seconds=BOOKING_ARCHIVE_INTERVAL_SECONDS, jitter_seconds=600)
+def archive_old_bookings_job():
+    return archive_old_bookings(max_batches=BOOKING_ARCHIVE_MAX_BATCHES)
+
+
+@register_job("expire_stale_payment_orders", interval_seconds=PAYMENT_ORDER_SWEEP_INTERVAL_SECONDS, jitter_seconds=10)
+def expire_stale_payment_orders_job():
+    return {"expired": expire_stale_payment_orders()}
+
+
+@register_job("complete_finished_bookings", interval_seconds=BOOKING_COMPLETION_INTERVAL_SECONDS, jitter_seconds=60)
+def complete_finished_bookings_job():
+    return {"completed": complete_finished_bookings()}
+
+
+@register_job("purge_idempotency_records", interval_seconds=IDEMPOTENCY_PURGE_INTERVAL_SECONDS, jitter_seconds=300)
+def purge_idempotency_records_job():
+    return {"purged": purge_expired_records()}
+
+
+@register_job("purge_payment_verifications", interval_seconds=IDEMPOTENCY_PURGE_INTERVAL_SECONDS, jitter_seconds=300)
+def purge_payment_verifications_job():
+    return {"purged": purge_finished_verifications()}
+
+
+@register_job("purge_email_outbox", interval_seconds=IDEMPOTENCY_PURGE_INTERVAL_SECONDS, jitter_seconds=300)
+def purge_email_outbox_job():
+    return {"purged": purge_finished_emails()}
+
+
+@register_job("prune_pdf_cache", interval_seconds=IDEMPOTENCY_PURGE_INTERVAL_SECONDS, jitter_seconds=300)
+def prune_pdf_cache_job():
+    return {"removed": prune_pdf_cache()}
+
+
+@register_job("reconcile_pending_payments", interval_seconds=PAYMENT_RECONCILE_INTERVAL_SECONDS, jitter_seconds=30)
+def reconcile_pending_payments_job():
+    report = reconcile_pending_orders(
+        batch_size=PAYMENT_RECONCILE_CONCURRENCY * 4,
+        time_budget_seconds=PAYMENT_RECONCILE_JOB_SECONDS,
+    )
+    if report["queued_for_verification"]:
+        wake_verification_workers()
+    return report
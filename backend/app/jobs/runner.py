@@ -0,0 +1,243 @@
+"""In-process periodic jobs that run on exactly one worker.
+
+Every worker starts a runner thread from the FastAPI startup hook, but only the one
+holding the ``scheduler`` row in ``job_leases`` runs jobs. The lease is a plain
+UPDATE with an expiry, so it works the same on SQLite and Postgres; a worker that
+dies simply stops renewing and another one takes over after JOB_LEASE_SECONDS.
+
+Jobs run one after another on the runner thread and renew the lease between runs,
+so each run should stay well under JOB_LEASE_SECONDS (do big work in batches).
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config.database import _env_flag, get_session
+from app.model.models import JobLease
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_JOBS_ENABLED = _env_flag("BACKGROUND_JOBS_ENABLED", "true")
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_TICK_SECONDS = float(os.getenv("JOB_TICK_SECONDS", "5"))
+
+LEASE_NAME = "scheduler"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], object]
+    interval_seconds: float
+    jitter_seconds: float = 0.0
+    next_run: float = 0.0
+    runs: int = 0
+    failures: int = 0
+    running: bool = False
+    last_started_at: datetime | None = None
+    last_duration_ms: float | None = None
+    last_result: object = None
+    last_error: str | None = None
+    total_duration_ms: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def schedule_next(self, now: float) -> None:
+        self.next_run = now + self.interval_seconds + random.uniform(0, self.jitter_seconds)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "name": self.name,
+                "interval_seconds": self.interval_seconds,
+                "jitter_seconds": self.jitter_seconds,
+                "running": self.running,
+                "runs": self.runs,
+                "failures": self.failures,
+                "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+                "last_duration_ms": self.last_duration_ms,
+                "avg_duration_ms": round(self.total_duration_ms / self.runs, 3) if self.runs else None,
+                "last_result": self.last_result,
+                "last_error": self.last_error,
+                "next_run_in_seconds": round(max(0.0, self.next_run - time.monotonic()), 1),
+            }
+
+
+_jobs: dict[str, Job] = {}
+_state_lock = threading.Lock()
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+_is_leader = False
+
+
+def register_job(name: str, interval_seconds: float, jitter_seconds: float = 0.0):
+    """Decorator: run ``func`` every ``interval_seconds`` (+ up to ``jitter_seconds``) on the leader.
+
+    The return value of each run is kept in the job metrics, so return a small dict of counts.
+    """
+
+    def decorator(func):
+        job = Job(name=name, func=func, interval_seconds=interval_seconds, jitter_seconds=jitter_seconds)
+        # First run lands inside the first interval, so restarts don't stampede the database.
+        job.next_run = time.monotonic() + random.uniform(0, min(interval_seconds, jitter_seconds or interval_seconds))
+        with _state_lock:
+            _jobs[name] = job
+        return func
+
+    return decorator
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def try_acquire_lease(name: str = LEASE_NAME, owner: str = WORKER_ID, ttl_seconds: float = JOB_LEASE_SECONDS) -> bool:
+    """Take or renew a lease. True if ``owner`` holds it afterwards."""
+    now = _utcnow()
+    values = {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds), "updated_at": now}
+    with get_session() as db:
+        taken = db.execute(
+            update(JobLease)
+            .where(
+                JobLease.name == name,
+                or_(JobLease.owner == owner, JobLease.expires_at.is_(None), JobLease.expires_at < now),
+            )
+            .values(**values)
+        ).rowcount
+        if taken:
+            db.commit()
+            return True
+        try:
+            db.execute(insert(JobLease).values(name=name, **values))
+            db.commit()
+            return True
+        except IntegrityError:
+            # Row exists and someone else holds it.
+            db.rollback()
+            return False
+
+
+def release_lease(name: str = LEASE_NAME, owner: str = WORKER_ID) -> None:
+    with get_session() as db:
+        db.execute(
+            update(JobLease)
+            .where(JobLease.name == name, JobLease.owner == owner)
+            .values(owner=None, expires_at=None, updated_at=_utcnow())
+        )
+        db.commit()
+
+
+def _run_job(job: Job) -> None:
+    with job.lock:
+        job.running = True
+        job.last_started_at = _utcnow()
+    started = time.perf_counter()
+    result, error = None, None
+    try:
+        result = job.func()
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        logger.exception("Background job %s failed", job.name)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    with job.lock:
+        job.running = False
+        job.runs += 1
+        job.total_duration_ms += elapsed_ms
+        job.last_duration_ms = elapsed_ms
+        job.last_error = error
+        if error is None:
+            job.last_result = result
+        else:
+            job.failures += 1
+        job.schedule_next(time.monotonic())
+
+
+def _renew_leadership() -> bool:
+    global _is_leader
+    try:
+        leader = try_acquire_lease()
+    except Exception:
+        logger.exception("Could not renew job lease")
+        leader = False
+    if leader != _is_leader:
+        logger.info("Worker %s %s background job leadership", WORKER_ID, "took" if leader else "lost")
+    _is_leader = leader
+    return leader
+
+
+def run_due_jobs() -> None:
+    with _state_lock:
+        jobs = list(_jobs.values())
+    for job in sorted(jobs, key=lambda item: item.next_run):
+        if _stop.is_set() or job.next_run > time.monotonic():
+            continue
+        # Renew before each run so a long queue of jobs never outlives the lease.
+        if not _renew_leadership():
+            return
+        _run_job(job)
+
+
+def _loop() -> None:
+    global _is_leader
+    try:
+        while not _stop.is_set():
+            if _renew_leadership():
+                run_due_jobs()
+            _stop.wait(JOB_TICK_SECONDS)
+    finally:
+        if _is_leader:
+            # Hand over right away instead of making the next worker wait for expiry.
+            # Only here, once no job can still be running on this thread.
+            try:
+                release_lease()
+            except Exception:
+                logger.exception("Could not release job lease")
+            _is_leader = False
+
+
+def start_jobs() -> None:
+    global _thread
+    if not BACKGROUND_JOBS_ENABLED or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="background-jobs", daemon=True)
+    _thread.start()
+
+
+def stop_jobs(timeout: float = 10.0) -> None:
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join(timeout)
+    if _thread.is_alive():
+        # A job is still running: keep the lease so no other worker starts jobs next to it.
+        # The thread releases it when the job returns, or it lapses if the process exits first.
+        logger.warning("Background job still running after %.1fs; job lease kept until it finishes", timeout)
+        return
+    _thread = None
+
+
+def get_job_stats() -> dict:
+    with _state_lock:
+        jobs = list(_jobs.values())
+    return {
+        "enabled": BACKGROUND_JOBS_ENABLED,
+        "worker_id": WORKER_ID,
+        "is_leader": _is_leader,
+        "running": _thread is not None and _thread.is_alive(),
+        "lease_seconds": JOB_LEASE_SECONDS,
+        "tick_seconds": JOB_TICK_SECONDS,
+        "jobs": [job.snapshot() for job in jobs],
+    }
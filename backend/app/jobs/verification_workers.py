@@ -0,0 +1,122 @@
+"""Worker pool that drains the payment verification queue.
+
+Unlike the leader-elected jobs in runner.py this runs on every worker process: a
+dispatcher thread claims due rows for as many pool threads as are free, so a slow
+gateway ties up a pool thread instead of a request. Callbacks wake
+the dispatcher right away; otherwise it polls every PAYMENT_VERIFY_POLL_SECONDS,
+which also picks up retries and rows left behind by a dead process.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.jobs.runner import WORKER_ID
+from app.services.payment_verification_service import (
+    claim_due_verifications,
+    process_verification,
+    verification_queue_depth,
+)
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the pool in this process (rows then wait for another process).
+PAYMENT_VERIFY_WORKERS = int(os.getenv("PAYMENT_VERIFY_WORKERS", "4"))
+PAYMENT_VERIFY_POLL_SECONDS = float(os.getenv("PAYMENT_VERIFY_POLL_SECONDS", "2"))
+
+_stop = threading.Event()
+_wake = threading.Event()
+_state_lock = threading.Lock()
+_thread: threading.Thread | None = None
+_executor: ThreadPoolExecutor | None = None
+_in_flight = 0
+_stats = {"processed": 0, "succeeded": 0, "failed": 0, "retried": 0, "errors": 0}
+
+
+def wake_verification_workers() -> None:
+    _wake.set()
+
+
+def _free_slots() -> int:
+    with _state_lock:
+        return PAYMENT_VERIFY_WORKERS - _in_flight
+
+
+def _work(verification_id: int) -> None:
+    global _in_flight
+    try:
+        state = process_verification(verification_id, WORKER_ID)
+        with _state_lock:
+            _stats["processed"] += 1
+            if state == "succeeded":
+                _stats["succeeded"] += 1
+            elif state == "failed":
+                _stats["failed"] += 1
+            elif state == "queued":
+                _stats["retried"] += 1
+    except Exception:
+        logger.exception("Payment verification worker failed on %s", verification_id)
+        with _state_lock:
+            _stats["errors"] += 1
+    finally:
+        with _state_lock:
+            _in_flight -= 1
+        # A slot opened up; there may be more work waiting.
+        _wake.set()
+
+
+def _dispatch() -> None:
+    global _in_flight
+    while not _stop.is_set():
+        _wake.clear()
+        try:
+            claimed = claim_due_verifications(WORKER_ID, _free_slots())
+        except Exception:
+            logger.exception("Could not claim payment verifications")
+            claimed = []
+        for verification_id in claimed:
+            with _state_lock:
+                _in_flight += 1
+            _executor.submit(_work, verification_id)
+        _wake.wait(PAYMENT_VERIFY_POLL_SECONDS)
+
+
+def start_verification_workers() -> None:
+    global _thread, _executor
+    if PAYMENT_VERIFY_WORKERS <= 0 or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _executor = ThreadPoolExecutor(max_workers=PAYMENT_VERIFY_WORKERS, thread_name_prefix="payment-verify")
+    _thread = threading.Thread(target=_dispatch, name="payment-verify-dispatch", daemon=True)
+    _thread.start()
+
+
+def stop_verification_workers(timeout: float = 10.0) -> None:
+    global _thread, _executor
+    if _thread is None:
+        return
+    _stop.set()
+    _wake.set()
+    _thread.join(timeout)
+    _thread = None
+    # Rows still running finish here; anything unclaimed stays queued for the next start.
+    _executor.shutdown(wait=True)
+    _executor = None
+
+
+def get_verification_worker_stats() -> dict:
+    with _state_lock:
+        stats = {
+            "workers": PAYMENT_VERIFY_WORKERS,
+            "poll_seconds": PAYMENT_VERIFY_POLL_SECONDS,
+            "running": _thread is not None and _thread.is_alive(),
+            "in_flight": _in_flight,
+            **_stats,
+        }
+    try:
+        stats["queue"] = verification_queue_depth()
+    except Exception:
+        logger.exception("Could not read payment verification queue depth")
+        stats["queue"] = None
+    return stats
@@ -1,11 +1,24 @@
 from pathlib import Path
 import os
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.config.database import init_db
+from app.config.database import (
+    READ_PRIMARY_HEADER,
+    finish_read_routing,
+    init_db,
+    set_read_marker,
+    start_read_routing,
+)
+from app.config.query_stats import (
+    finish_request_stats,
+    log_stats_after_body,
+    response_headers,
+    start_request_stats,
+    warn_repeated_shapes,
+)
 from app.controller import (
     admin_controller,
     auth_controller,
@@ -16,6 +29,16 @@ from app.controller import (
     superadmin_controller,
     user_controller,
 )
+from app.jobs import (
+    start_email_worker,
+    start_jobs,
+    start_verification_workers,
+    stop_email_worker,
+    stop_jobs,
+    stop_verification_workers,
+)
+from app.services.gateway_client import close_gateway_clients
+from app.services.pdf_render_service import shutdown_pdf_render_pool
 
 openapi_tags = [
     {"name": "Auth", "description": "Authentication: register, login, forgot/reset password, Google login."},
@@ -59,8 +82,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-DB-Queries", READ_PRIMARY_HEADER],
 )
 
+
+@app.middleware("http")
+async def db_query_stats_middleware(request: Request, call_next):
+    # Har request ko SQL count/time header ma pathaucha, N+1 pattern log ma warning.
+    stats, token = start_request_stats()
+    try:
+        response = await call_next(request)
+    finally:
+        finish_request_stats(token)
+    label = f"{request.method} {request.url.path}"
+    if "content-length" not in response.headers:
+        # Streaming response: body pathauda pani query chalchha, header ma count adhuro hunchha.
+        response.body_iterator = log_stats_after_body(response.body_iterator, stats, label)
+        return response
+    warn_repeated_shapes(stats, label)
+    response.headers.update(response_headers(stats))
+    return response
+
+
+@app.middleware("http")
+async def read_your_writes_middleware(request: Request, call_next):
+    # Write gareko client ko read haru kehi samaya primary ma janchha, jun worker ma pugos.
+    routing, token = start_read_routing(request)
+    try:
+        response = await call_next(request)
+    finally:
+        finish_read_routing(token)
+    set_read_marker(routing, response)
+    return response
+
+
 uploads_dir = Path(__file__).resolve().parents[1] / "uploads"
 uploads_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
@@ -96,6 +151,19 @@ app.include_router(
 @app.on_event("startup")
 def startup_event():
     init_db()
+    # Sabai worker ma chalcha, tara job haru lease paune euta worker ma matra run huncha.
+    start_jobs()
+    start_verification_workers()
+    start_email_worker()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    stop_jobs()
+    stop_verification_workers()
+    stop_email_worker()
+    shutdown_pdf_render_pool()
+    close_gateway_clients()
 
 
 @app.get("/health")
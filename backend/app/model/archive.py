@@ -0,0 +1,64 @@
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.config.database import Base
+
+
+class BookingArchive(Base):
+    """Cold copy of bookings for past journeys. Same columns as ``bookings`` plus archived_at."""
+
+    __tablename__ = "bookings_archive"
+    __table_args__ = (
+        Index("ix_bookings_archive_journey_date", "journey_date"),
+        Index("ix_bookings_archive_user_id", "user_id"),
+    )
+
+    # Ids are kept from the live table, so no autoincrement and no foreign keys here.
+    booking_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    vendor_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    schedule_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    booking_reference: Mapped[str] = mapped_column(String(50), nullable=False)
+    journey_date: Mapped[date] = mapped_column(Date, nullable=False)
+    number_of_seats: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    booking_status: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    payment_status: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    payment_method: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    is_counter_booking: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    passenger_name: Mapped[str] = mapped_column(String(120), nullable=False)
+    passenger_phone: Mapped[str] = mapped_column(String(30), nullable=False)
+    passenger_email: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    pickup_point: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    drop_point: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    special_requests: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class PaymentOrderArchive(Base):
+    """Cold copy of payment orders for past journeys."""
+
+    __tablename__ = "payment_orders_archive"
+    __table_args__ = (
+        Index("ix_payment_orders_archive_journey_date", "journey_date"),
+        Index("ix_payment_orders_archive_booking_id", "booking_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    trip_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    journey_date: Mapped[date] = mapped_column(Date, nullable=False)
+    seats: Mapped[str] = mapped_column(Text, nullable=False)
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    status: Mapped[str] = mapped_column(String(30), nullable=False)
+    pidx: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    booking_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    failure_reason: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -8,6 +8,12 @@ from app.config.database import Base
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_schedule_journey", "schedule_id", "journey_date"),
+        Index("ix_bookings_user_id", "user_id"),
+        Index("ix_bookings_journey_date", "journey_date"),
+        Index("ix_bookings_status_journey", "booking_status", "journey_date"),
+    )
 
     booking_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.user_id"), nullable=True)
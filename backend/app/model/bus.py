@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, ForeignKey, Integer, String
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -14,10 +14,14 @@ class Bus(Base):
     seat_layout_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=40)
     seat_layout_cols: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
     is_active: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    # Set when a cascade (vendor deactivation) turned the bus off, so reactivation only undoes that.
+    inactive_reason: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    vendor_id: Mapped[int | None] = mapped_column(ForeignKey("users.user_id"), nullable=True, index=True)
 
 
 class BusSeat(Base):
     __tablename__ = "bus_seats"
+    __table_args__ = (Index("ix_bus_seats_bus_position", "bus_id", "row_index", "col_index"),)
 
     bus_seat_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     bus_id: Mapped[int | None] = mapped_column(ForeignKey("buses.bus_id"), nullable=True)
@@ -1,6 +1,6 @@
 from datetime import time
 
-from sqlalchemy import Boolean, Float, ForeignKey, Integer
+from sqlalchemy import Boolean, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -8,6 +8,7 @@ from app.config.database import Base
 
 class BusSchedule(Base):
     __tablename__ = "bus_schedules"
+    __table_args__ = (Index("ix_bus_schedules_bus_active", "bus_id", "is_active"),)
 
     schedule_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     bus_id: Mapped[int | None] = mapped_column(ForeignKey("buses.bus_id"), nullable=True)
@@ -15,4 +16,5 @@ class BusSchedule(Base):
     departure_time: Mapped[time] = mapped_column(nullable=False)
     arrival_time: Mapped[time] = mapped_column(nullable=False)
     price: Mapped[float] = mapped_column(Float, nullable=False)
-    is_active: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
\ No newline at end of file
+    is_active: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    inactive_reason: Mapped[str | None] = mapped_column(String(120), nullable=True)
\ No newline at end of file
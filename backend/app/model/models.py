@@ -8,12 +8,22 @@ Model classes are now organized per file:
 - bus_schedule.py
 - booking.py
 - review.py
+- archive.py
+- job_lease.py
+- idempotency_record.py
+- payment_verification.py
+- email_outbox.py
 """
 
+from app.model.archive import BookingArchive, PaymentOrderArchive
 from app.model.booking import Booking
 from app.model.bus import Bus, BusSeat
 from app.model.bus_schedule import BusSchedule
+from app.model.email_outbox import EmailOutbox
+from app.model.idempotency_record import IdempotencyRecord
+from app.model.job_lease import JobLease
 from app.model.payment_order import PaymentOrder
+from app.model.payment_verification import PaymentVerification
 from app.model.review import Review
 from app.model.route import Route
 from app.model.user import User
@@ -29,4 +39,10 @@ __all__ = [
     "PaymentOrder",
     "Booking",
     "Review",
+    "BookingArchive",
+    "PaymentOrderArchive",
+    "JobLease",
+    "IdempotencyRecord",
+    "PaymentVerification",
+    "EmailOutbox",
 ]
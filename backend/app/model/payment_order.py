@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -8,6 +8,10 @@ from app.config.database import Base
 
 class PaymentOrder(Base):
     __tablename__ = "payment_orders"
+    __table_args__ = (
+        Index("ix_payment_orders_status_expires", "status", "expires_at"),
+        Index("ix_payment_orders_journey_date", "journey_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False, index=True)
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.config.database import Base
+
+
+class PaymentVerification(Base):
+    """A gateway callback waiting to be verified by the worker pool.
+
+    No FK to payment_orders so archiving old orders never trips over queue rows.
+    """
+
+    __tablename__ = "payment_verifications"
+    __table_args__ = (
+        UniqueConstraint("order_id", "callback_key", name="uq_payment_verifications_callback"),
+        Index("ix_payment_verifications_state_next", "state", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    gateway: Mapped[str] = mapped_column(String(20), nullable=False)
+    # pidx for Khalti, hash of data/status for eSewa; one row per distinct callback.
+    callback_key: Mapped[str] = mapped_column(String(120), nullable=False)
+    params: Mapped[str] = mapped_column(Text, nullable=False)
+    state: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    locked_by: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    error_key: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    result: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -8,6 +8,7 @@ from app.config.database import Base
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (Index("ix_reviews_user_id", "user_id"),)
 
     review_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     booking_id: Mapped[int | None] = mapped_column(ForeignKey("bookings.booking_id"), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Float, Integer, String
+from sqlalchemy import Boolean, Float, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -6,6 +6,7 @@ from app.config.database import Base
 
 class Route(Base):
     __tablename__ = "routes"
+    __table_args__ = (Index("ix_routes_origin_destination", "origin", "destination"),)
 
     route_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     origin: Mapped[str] = mapped_column(String(120), nullable=False)
@@ -122,6 +122,7 @@ class AdminCreateBusInput(BaseModel):
     to_city: str = Field(description=DESC_ROUTE_TO)
     price: float = Field(description="Default fare for generated schedule")
     seat_capacity: int = Field(default=80, ge=1, description="Total active seats intended for this bus (standard: 4 columns × 20 rows = 80 seats)")
+    vendor_id: int | None = Field(default=None, description="Vendor (operator) user id that owns this bus")
 
 
 class AdminUpdateBusInput(BaseModel):
@@ -1,51 +1,57 @@
+from datetime import date
+
 from sqlalchemy import select
 
 from app.config.database import get_session
 from app.model.models import Booking, Bus, BusSchedule, Review, Route
-from app.services.booking_service import list_bookings
+from app.services.booking_service import booking_totals, list_bookings
 from app.services.bus_service import find_bus, list_buses
 from app.services.route_service import list_routes
 from app.services.schedule_service import list_schedules
 from app.services.user_service import find_user
 
 
-def list_admin_bookings():
-    bookings = list_bookings()
-    result = []
-    for booking in bookings:
-        user = find_user(booking["user_id"])
-        bus = find_bus(booking["bus_id"])
-        result.append(
-            {
-                **booking,
-                "user_name": user["name"] if user else "Unknown",
-                "bus_name": bus["bus_name"] if bus else "Unknown",
-            }
-        )
-    return result
-
-
-def get_admin_analytics():
-    bookings = list_bookings()
-    all_buses = list_buses()
-    all_routes = list_routes()
-    all_schedules = list_schedules()
+def list_admin_bookings(db=None, journey_from: date | None = None, journey_to: date | None = None):
+    # Live bookings only unless journey_from reaches past the archive horizon.
+    with get_session(db, readonly=True) as db:
+        bookings = list_bookings(db=db, journey_from=journey_from, journey_to=journey_to)
+        result = []
+        for booking in bookings:
+            # Shared session: repeated users/buses resolve from the identity map.
+            user = find_user(booking["user_id"], db=db) if booking["user_id"] is not None else None
+            bus = find_bus(booking["bus_id"], db=db) if booking["bus_id"] is not None else None
+            result.append(
+                {
+                    **booking,
+                    "user_name": user["name"] if user else "Unknown",
+                    "bus_name": bus["bus_name"] if bus else "Unknown",
+                }
+            )
+        return result
+
+
+def get_admin_analytics(db=None):
+    with get_session(db, readonly=True) as db:
+        # Totals cover archived bookings too, so they don't drop when the archive job runs.
+        totals = booking_totals(db=db)
+        all_buses = list_buses(db=db)
+        all_routes = list_routes(db=db)
+        all_schedules = list_schedules(db=db)
 
     active_buses = [bus for bus in all_buses if bus.get("is_active", True)]
     active_routes = [route for route in all_routes if route.get("is_active", True)]
     active_schedules = [s for s in all_schedules if s.get("is_active", True)]
 
-    total_bookings = len(bookings)
-    total_revenue = sum(item.get("total_amount", 0) for item in bookings)
-    booked_seats = sum(item.get("seats", 0) for item in bookings)
+    booked_seats = totals["booked_seats"]
     total_capacity = sum(bus.get("seat_capacity", 0) for bus in active_buses)
     occupancy_rate = 0.0
     if total_capacity > 0:
         occupancy_rate = round((booked_seats / total_capacity) * 100, 2)
 
     return {
-        "total_bookings": total_bookings,
-        "total_revenue": total_revenue,
+        "total_bookings": totals["total_bookings"],
+        "completed_bookings": totals["completed_bookings"],
+        "total_revenue": totals["total_revenue"],
         "booked_seats": booked_seats,
         "occupancy_rate": occupancy_rate,
         "active_buses": len(active_buses),
@@ -106,8 +112,8 @@ def _to_admin_review_output(item: Review, booking: Booking | None, bus: Bus | No
     }
 
 
-def list_admin_reviews():
-    with get_session() as db:
+def list_admin_reviews(db=None):
+    with get_session(db, readonly=True) as db:
         reviews = db.execute(select(Review).order_by(Review.created_at.desc(), Review.review_id.desc())).scalars().all()
 
         bookings, schedules, routes, buses = _load_review_context_maps(db, reviews)
@@ -0,0 +1,114 @@
+"""Move bookings and payment orders for old journeys into cold archive tables.
+
+Hot paths (seat maps, user booking lists, the order sweeper) only ever read the live
+tables, which stay as small as the archive horizon. Admin history reads union the
+archive back in when the requested journey range reaches past the horizon.
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, insert, literal, select, union_all
+from sqlalchemy.orm import aliased
+
+from app.config.database import get_session
+from app.model.models import Booking, BookingArchive, PaymentOrder, PaymentOrderArchive, Review
+
+# Journeys older than this many days are archived.
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.getenv("BOOKING_ARCHIVE_AFTER_DAYS", "180"))
+# Rows moved per transaction; keeps each write lock short.
+BOOKING_ARCHIVE_BATCH_SIZE = int(os.getenv("BOOKING_ARCHIVE_BATCH_SIZE", "500"))
+
+
+def archive_cutoff(today: date | None = None) -> date:
+    return (today or date.today()) - timedelta(days=BOOKING_ARCHIVE_AFTER_DAYS)
+
+
+def _copy_columns(table) -> list[str]:
+    return [column.name for column in table.columns]
+
+
+def _archived_copy(source, target, where, now: datetime):
+    columns = _copy_columns(source.__table__)
+    archived_at = literal(now, type_=target.__table__.c.archived_at.type)
+    return insert(target).from_select(
+        [*columns, "archived_at"],
+        select(*[source.__table__.c[name] for name in columns], archived_at).where(where),
+    )
+
+
+def _archive_booking_batch(db, cutoff: date, batch_size: int, now: datetime) -> tuple[int, int]:
+    # Reviewed bookings stay live: reviews.booking_id still points at them.
+    booking_ids = db.execute(
+        select(Booking.booking_id)
+        .where(
+            Booking.journey_date < cutoff,
+            ~exists().where(Review.booking_id == Booking.booking_id),
+        )
+        .order_by(Booking.booking_id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not booking_ids:
+        return 0, 0
+
+    db.execute(_archived_copy(PaymentOrder, PaymentOrderArchive, PaymentOrder.booking_id.in_(booking_ids), now))
+    orders = db.execute(delete(PaymentOrder).where(PaymentOrder.booking_id.in_(booking_ids))).rowcount
+    db.execute(_archived_copy(Booking, BookingArchive, Booking.booking_id.in_(booking_ids), now))
+    db.execute(delete(Booking).where(Booking.booking_id.in_(booking_ids)))
+    return len(booking_ids), orders
+
+
+def _archive_orphan_order_batch(db, cutoff: date, batch_size: int, now: datetime) -> tuple[int, int]:
+    # Orders that never became a booking (failed, expired, abandoned).
+    order_ids = db.execute(
+        select(PaymentOrder.id)
+        .where(PaymentOrder.booking_id.is_(None), PaymentOrder.journey_date < cutoff)
+        .order_by(PaymentOrder.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not order_ids:
+        return 0, 0
+
+    db.execute(_archived_copy(PaymentOrder, PaymentOrderArchive, PaymentOrder.id.in_(order_ids), now))
+    db.execute(delete(PaymentOrder).where(PaymentOrder.id.in_(order_ids)))
+    return 0, len(order_ids)
+
+
+def archive_old_bookings(
+    cutoff: date | None = None,
+    batch_size: int = BOOKING_ARCHIVE_BATCH_SIZE,
+    max_batches: int | None = None,
+) -> dict:
+    """Archive everything with a journey date before ``cutoff``, one committed batch at a time."""
+    cutoff = cutoff or archive_cutoff()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    result = {"cutoff": str(cutoff), "bookings": 0, "payment_orders": 0, "batches": 0}
+
+    for step in (_archive_booking_batch, _archive_orphan_order_batch):
+        while max_batches is None or result["batches"] < max_batches:
+            with get_session() as db:
+                bookings, orders = step(db, cutoff, batch_size, now)
+                db.commit()
+            if not bookings and not orders:
+                break
+            result["bookings"] += bookings
+            result["payment_orders"] += orders
+            result["batches"] += 1
+    return result
+
+
+def booking_history_entity(journey_from: date | None = None):
+    """Entity to read booking history from.
+
+    Plain ``Booking`` unless the range starts before the archive horizon; then Booking
+    mapped over live UNION ALL archive, so callers keep using Booking columns as usual.
+    """
+    if journey_from is None or journey_from >= archive_cutoff():
+        return Booking
+
+    columns = _copy_columns(Booking.__table__)
+    history = union_all(
+        select(*[Booking.__table__.c[name] for name in columns]),
+        select(*[BookingArchive.__table__.c[name] for name in columns]),
+    ).subquery("booking_history")
+    return aliased(Booking, history)
@@ -12,7 +12,7 @@ from sqlalchemy.exc import IntegrityError
 
 from app.config.database import get_session
 from app.model.models import User, VendorDocument
-from app.services.email_service import send_email
+from app.services.email_outbox_service import queue_email
 from app.services.password_service import hash_password, is_password_hash, verify_password
 
 
@@ -226,10 +226,11 @@ def _verification_email_html(name: str, verify_url: str) -> str:
     """
 
 
-def _send_verification_email(user: User) -> bool:
+def _queue_verification_email(db, user: User) -> None:
     token = _verification_token(user.email)
     verify_url = f"{FRONTEND_URL}/verify-email?token={token}"
-    return send_email(
+    queue_email(
+        db,
         recipient=user.email,
         subject="Verify your Ticket Nepal account",
         html_content=_verification_email_html(user.name, verify_url),
@@ -280,9 +281,9 @@ def register_user(name: str, email: str, password: str, role: str | None = None)
             is_active=is_active,
         )
         db.add(new_user)
+        _queue_verification_email(db, new_user)
         db.commit()
         db.refresh(new_user)
-        _send_verification_email(new_user)
         return _public_user(new_user)
 
 
@@ -360,9 +361,9 @@ def register_vendor_with_document(name: str, email: str, password: str, document
                 uploaded_at=datetime.now(timezone.utc).replace(tzinfo=None),
             )
             db.add(vendor_document)
+            _queue_verification_email(db, new_vendor)
             db.commit()
             db.refresh(new_vendor)
-            _send_verification_email(new_vendor)
             return _public_user(new_vendor), None
         except IntegrityError:
             db.rollback()
@@ -425,7 +426,9 @@ def resend_email_verification(email: str) -> bool:
             return True
         if user.auth_provider and user.auth_provider.startswith("firebase"):
             return True
-        return _send_verification_email(user)
+        _queue_verification_email(db, user)
+        db.commit()
+        return True
 
 
 def request_password_reset(email: str):
@@ -1,15 +1,26 @@
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import case, func, select, update
 
 from app.config.database import get_session
+from app.constants import BOOKING_STATUS_COMPLETED, BOOKING_STATUS_CONFIRMED
 from app.model.models import Booking, Bus, BusSchedule, Route, User
-from app.services.bus_service import find_bus, get_bus_seat_layout
-from app.services.email_service import format_refund_email, format_ticket_email, send_email
-from app.services.pdf_service import generate_refund_receipt_pdf, generate_ticket_pdf
+from app.services.archive_service import booking_history_entity
+from app.services.bus_service import find_bus, get_bus_seat_layout, get_bus_seat_layout_async
+from app.services.email_outbox_service import queue_email
+from app.services.email_service import format_refund_email, format_ticket_email
+from app.services.pdf_cache_service import (
+    CachedPdf,
+    get_or_render_pdf,
+    get_or_render_pdf_async,
+    prerender_after_commit,
+)
 from app.services.user_service import find_user
 
 SEAT_PREFIX = "SEATS:"
+# Travelled bookings in these states become completed once the trip has arrived.
+COMPLETABLE_BOOKING_STATES = (BOOKING_STATUS_CONFIRMED, "modified")
+BOOKING_COMPLETION_BATCH_SIZE = 500
 
 
 def _normalize_seat_labels(seat_labels: list[str] | None) -> list[str]:
@@ -47,20 +58,25 @@ def _parse_seat_labels(note: str | None) -> list[str]:
     return [item.strip().upper() for item in raw.split(",") if item.strip()]
 
 
-def _find_schedule_for_bus(db, bus_id: int):
-    return db.execute(
+def _schedule_for_bus_query(bus_id: int):
+    return (
         select(BusSchedule)
         .where(BusSchedule.bus_id == bus_id, BusSchedule.is_active.is_(True))
         .order_by(BusSchedule.schedule_id)
-    ).scalars().first()
+    )
+
+
+def _find_schedule_for_bus(db, bus_id: int, for_update: bool = False):
+    query = _schedule_for_bus_query(bus_id)
+    if for_update:
+        query = query.with_for_update()
+    return db.execute(query).scalars().first()
 
 
 def _find_schedule_for_booking(db, booking: Booking):
     if booking.schedule_id is None:
         return None
-    return db.execute(
-        select(BusSchedule).where(BusSchedule.schedule_id == booking.schedule_id)
-    ).scalar_one_or_none()
+    return db.get(BusSchedule, booking.schedule_id)
 
 
 def _hours_before_departure(schedule: BusSchedule | None, journey_date: date) -> float:
@@ -122,13 +138,18 @@ def _occupied_seat_statuses(db, bus_id: int, journey_date: date) -> dict[str, st
     if schedule is None:
         return {}
 
-    bookings = db.execute(
-        select(Booking).where(
-            Booking.schedule_id == schedule.schedule_id,
-            Booking.journey_date == journey_date,
-        )
-    ).scalars().all()
+    bookings = db.execute(_trip_bookings_query(schedule.schedule_id, journey_date)).scalars().all()
+    return _occupied_from_bookings(bookings)
+
+
+def _trip_bookings_query(schedule_id: int, journey_date: date):
+    return select(Booking).where(
+        Booking.schedule_id == schedule_id,
+        Booking.journey_date == journey_date,
+    )
+
 
+def _occupied_from_bookings(bookings: list[Booking]) -> dict[str, str]:
     occupied: dict[str, str] = {}
     for booking in bookings:
         occupancy = _seat_occupancy_status(booking)
@@ -165,19 +186,33 @@ def _refund_context(db, booking: Booking) -> tuple[float, int, float, int, float
 
 
 def _to_booking_output(db, booking: Booking) -> dict:
+    schedule = None
+    if booking.schedule_id is not None:
+        schedule = db.get(BusSchedule, booking.schedule_id)
+    return _booking_output(booking, schedule)
+
+
+async def _to_booking_outputs_async(db, bookings: list[Booking]) -> list[dict]:
+    schedule_ids = {item.schedule_id for item in bookings if item.schedule_id is not None}
+    schedules: dict[int, BusSchedule] = {}
+    if schedule_ids:
+        rows = (
+            await db.execute(select(BusSchedule).where(BusSchedule.schedule_id.in_(schedule_ids)))
+        ).scalars().all()
+        schedules = {item.schedule_id: item for item in rows}
+    return [_booking_output(booking, schedules.get(booking.schedule_id)) for booking in bookings]
+
+
+def _booking_output(booking: Booking, schedule: BusSchedule | None) -> dict:
     bus_id = None
     schedule_id = booking.schedule_id
     departure_time = None
     arrival_time = None
     seat_labels = _parse_seat_labels(booking.special_requests)
-    if booking.schedule_id is not None:
-        schedule = db.execute(
-            select(BusSchedule).where(BusSchedule.schedule_id == booking.schedule_id)
-        ).scalar_one_or_none()
-        if schedule is not None:
-            bus_id = schedule.bus_id
-            departure_time = schedule.departure_time.strftime("%H:%M")
-            arrival_time = schedule.arrival_time.strftime("%H:%M")
+    if schedule is not None:
+        bus_id = schedule.bus_id
+        departure_time = schedule.departure_time.strftime("%H:%M")
+        arrival_time = schedule.arrival_time.strftime("%H:%M")
 
     return {
         "booking_id": booking.booking_id,
@@ -205,12 +240,12 @@ def _booking_ref(user_id: int) -> str:
     return f"BK{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}{user_id}"
 
 
-def _validate_booking_user_and_bus(user_id: int, bus_id: int):
-    user = find_user(user_id)
+def _validate_booking_user_and_bus(db, user_id: int, bus_id: int):
+    user = find_user(user_id, db=db)
     if user is None:
         return None, None, "user"
 
-    bus = find_bus(bus_id)
+    bus = find_bus(bus_id, db=db)
     if bus is None:
         return None, None, "bus"
 
@@ -235,7 +270,7 @@ def _validate_requested_seat_labels(db, bus_id: int, journey_date: date, normali
     if not normalized_seat_labels:
         return None
 
-    layout = get_bus_seat_layout(bus_id)
+    layout = get_bus_seat_layout(bus_id, db=db)
     if layout is None:
         return "bus"
 
@@ -281,16 +316,18 @@ def _seat_status(
     return "disabled"
 
 
+def _own_booking_query(booking_id: int, user_id: int):
+    return select(Booking).where(
+        Booking.booking_id == booking_id,
+        Booking.user_id == user_id,
+    )
+
+
 def _find_own_booking_labels(db, booking_id: int | None, user_id: int | None) -> set[str]:
     if booking_id is None or user_id is None:
         return set()
 
-    own_booking = db.execute(
-        select(Booking).where(
-            Booking.booking_id == booking_id,
-            Booking.user_id == user_id,
-        )
-    ).scalar_one_or_none()
+    own_booking = db.execute(_own_booking_query(booking_id, user_id)).scalar_one_or_none()
     if own_booking is None:
         return set()
 
@@ -313,7 +350,7 @@ def _load_schedule_and_bus_for_replace(db, booking: Booking):
     if schedule is None:
         return None, None, "schedule"
 
-    bus = db.execute(select(Bus).where(Bus.bus_id == schedule.bus_id)).scalar_one_or_none()
+    bus = db.get(Bus, schedule.bus_id)
     if bus is None:
         return None, None, "bus"
 
@@ -325,7 +362,7 @@ def _validate_new_replacement_labels(db, bus: Bus, booking: Booking, current_lab
     if len(new_labels) > max_seats:
         return None, "seat_limit"
 
-    layout = get_bus_seat_layout(bus.bus_id)
+    layout = get_bus_seat_layout(bus.bus_id, db=db)
     if layout is None:
         return None, "bus"
 
@@ -355,22 +392,67 @@ def _validate_new_replacement_labels(db, bus: Bus, booking: Booking, current_lab
     return max_seats, None
 
 
-def list_bookings():
-    with get_session() as db:
-        bookings = db.execute(select(Booking).order_by(Booking.booking_id)).scalars().all()
+def _booking_history_query(journey_from: date | None = None, journey_to: date | None = None):
+    entity = booking_history_entity(journey_from)
+    query = select(entity).order_by(entity.booking_id)
+    if journey_from is not None:
+        query = query.where(entity.journey_date >= journey_from)
+    if journey_to is not None:
+        query = query.where(entity.journey_date <= journey_to)
+    return query
+
+
+def list_bookings(db=None, journey_from: date | None = None, journey_to: date | None = None):
+    """All bookings, or a journey-date range. Ranges older than the archive horizon include archived rows."""
+    with get_session(db, readonly=True) as db:
+        bookings = db.execute(_booking_history_query(journey_from, journey_to)).scalars().all()
         return [_to_booking_output(db, booking) for booking in bookings]
 
 
-def list_bookings_by_user(user_id: int):
-    with get_session() as db:
-        bookings = db.execute(
-            select(Booking)
-            .where(Booking.user_id == user_id)
-            .order_by(Booking.booking_id.desc())
-        ).scalars().all()
+def booking_totals(db=None) -> dict:
+    """Count, seats and revenue over every booking ever made, archived ones included."""
+    entity = booking_history_entity(date.min)
+    with get_session(db, readonly=True) as db:
+        row = db.execute(
+            select(
+                func.count(entity.booking_id),
+                func.count(case((entity.booking_status == BOOKING_STATUS_COMPLETED, 1))),
+                func.coalesce(func.sum(entity.number_of_seats), 0),
+                func.coalesce(func.sum(entity.total_amount), 0),
+            )
+        ).one()
+    return {
+        "total_bookings": row[0],
+        "completed_bookings": row[1],
+        "booked_seats": int(row[2]),
+        "total_revenue": float(row[3]),
+    }
+
+
+def list_bookings_by_user(user_id: int, db=None):
+    with get_session(db, readonly=True) as db:
+        bookings = db.execute(_user_bookings_query(user_id)).scalars().all()
         return [_to_booking_output(db, booking) for booking in bookings]
 
 
+def _user_bookings_query(user_id: int):
+    return (
+        select(Booking)
+        .where(Booking.user_id == user_id)
+        .order_by(Booking.booking_id.desc())
+    )
+
+
+async def list_bookings_async(db):
+    bookings = (await db.execute(select(Booking).order_by(Booking.booking_id))).scalars().all()
+    return await _to_booking_outputs_async(db, bookings)
+
+
+async def list_bookings_by_user_async(user_id: int, db):
+    bookings = (await db.execute(_user_bookings_query(user_id))).scalars().all()
+    return await _to_booking_outputs_async(db, bookings)
+
+
 def create_booking(
     user_id: int,
     bus_id: int,
@@ -379,8 +461,46 @@ def create_booking(
     seat_labels: list[str] | None = None,
     payment_method: str | None = None,
     is_counter_booking: bool = False,
+    db=None,
+):
+    with get_session(db) as db:
+        new_booking, error_key = _new_booking(
+            db, user_id, bus_id, journey_date, seats, seat_labels, payment_method, is_counter_booking
+        )
+        if error_key:
+            return None, error_key
+        db.commit()
+        db.refresh(new_booking)
+        return _to_booking_output(db, new_booking), None
+
+
+def create_paid_booking(db, user_id: int, bus_id: int, journey_date: date, seat_labels: list[str], payment_method: str):
+    """Add a confirmed, paid booking and its ticket email to the caller's transaction.
+
+    Flushed, not committed: payment finalization commits it together with the order.
+    """
+    booking, error_key = _new_booking(
+        db, user_id, bus_id, str(journey_date), len(seat_labels), seat_labels, payment_method, False
+    )
+    if error_key:
+        return None, error_key
+    _mark_booking_paid(booking, payment_method)
+    _queue_booking_confirmation_email(db, booking)
+    db.flush()
+    return booking, None
+
+
+def _new_booking(
+    db,
+    user_id: int,
+    bus_id: int,
+    journey_date: str,
+    seats: int,
+    seat_labels: list[str] | None,
+    payment_method: str | None,
+    is_counter_booking: bool,
 ):
-    user, bus, error_key = _validate_booking_user_and_bus(user_id, bus_id)
+    user, bus, error_key = _validate_booking_user_and_bus(db, user_id, bus_id)
     if error_key:
         return None, error_key
 
@@ -395,43 +515,41 @@ def create_booking(
 
     total_amount = seats * bus["price"]
 
-    with get_session() as db:
-        # Schedule bus ko real bridge ho; booking direct bus table ma chaina.
-        schedule = _find_schedule_for_bus(db, bus_id)
-        if schedule is None:
-            return None, "bus"
+    # Schedule bus ko real bridge ho; booking direct bus table ma chaina.
+    # Locked so the seat check below and the insert happen in one transaction per trip.
+    schedule = _find_schedule_for_bus(db, bus_id, for_update=True)
+    if schedule is None:
+        return None, "bus"
 
-        error_key = _validate_requested_seat_labels(db, bus_id, parsed_journey_date, normalized_seat_labels)
-        if error_key:
-            return None, error_key
+    error_key = _validate_requested_seat_labels(db, bus_id, parsed_journey_date, normalized_seat_labels)
+    if error_key:
+        return None, error_key
 
-        user_row = db.execute(select(User).where(User.user_id == user_id)).scalar_one_or_none()
-        passenger_name = user_row.name if user_row is not None else "Passenger"
-
-        # Total amount seat count * bus price bata nikalincha.
-        new_booking = Booking(
-            user_id=user_id,
-            vendor_id=None,
-            schedule_id=schedule.schedule_id,
-            booking_reference=_booking_ref(user_id),
-            journey_date=parsed_journey_date,
-            number_of_seats=seats,
-            total_amount=total_amount,
-            booking_status="pending",
-            payment_status="unpaid",
-            payment_method=payment_method,
-            is_counter_booking=is_counter_booking,
-            passenger_name=passenger_name,
-            passenger_phone="N/A",
-            passenger_email=user["email"],
-            special_requests=_seat_note(normalized_seat_labels),
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
-        db.add(new_booking)
-        db.commit()
-        db.refresh(new_booking)
-        return _to_booking_output(db, new_booking), None
+    user_row = db.get(User, user_id)
+    passenger_name = user_row.name if user_row is not None else "Passenger"
+
+    # Total amount seat count * bus price bata nikalincha.
+    new_booking = Booking(
+        user_id=user_id,
+        vendor_id=None,
+        schedule_id=schedule.schedule_id,
+        booking_reference=_booking_ref(user_id),
+        journey_date=parsed_journey_date,
+        number_of_seats=seats,
+        total_amount=total_amount,
+        booking_status="pending",
+        payment_status="unpaid",
+        payment_method=payment_method,
+        is_counter_booking=is_counter_booking,
+        passenger_name=passenger_name,
+        passenger_phone="N/A",
+        passenger_email=user["email"],
+        special_requests=_seat_note(normalized_seat_labels),
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    db.add(new_booking)
+    return new_booking, None
 
 
 def get_seat_availability(
@@ -439,11 +557,12 @@ def get_seat_availability(
     journey_date: str,
     booking_id: int | None = None,
     user_id: int | None = None,
+    db=None,
 ):
     parsed_journey_date = _parse_date(journey_date)
 
-    with get_session() as db:
-        bus = db.execute(select(Bus).where(Bus.bus_id == bus_id)).scalar_one_or_none()
+    with get_session(db, readonly=True) as db:
+        bus = db.get(Bus, bus_id)
         if bus is None:
             return None, "bus"
 
@@ -453,58 +572,108 @@ def get_seat_availability(
 
         route = None
         if schedule.route_id is not None:
-            route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
+            route = db.get(Route, schedule.route_id)
 
-        layout = get_bus_seat_layout(bus_id)
+        layout = get_bus_seat_layout(bus_id, db=db)
         if layout is None:
             return None, "bus"
 
         occupied_labels = _occupied_seat_statuses(db, bus_id, parsed_journey_date)
         own_labels = _find_own_booking_labels(db, booking_id, user_id)
-        if own_labels:
-            occupied_labels = {
-                label: status
-                for label, status in occupied_labels.items()
-                if label not in own_labels
-            }
+        return _availability_output(bus, route, schedule, layout, parsed_journey_date, own_labels, occupied_labels), None
 
-        seats = _build_availability_seats(layout, own_labels, occupied_labels)
-
-        max_seats = _max_seats_per_transaction(bus.total_seats)
-
-        return {
-            "bus": {
-                "bus_id": bus.bus_id,
-                "bus_registration_number": bus.bus_number,
-                "bus_type": bus.bus_type,
-                "vendor_name": f"{bus.bus_type} Operator",
-                "vendor_contact": "+977-9800000000",
-            },
-            "route": {
-                "from_city": route.origin if route else "N/A",
-                "to_city": route.destination if route else "N/A",
-            },
-            "schedule": {
-                "schedule_id": schedule.schedule_id,
-                "departure_time": schedule.departure_time.strftime("%H:%M"),
-                "arrival_time": schedule.arrival_time.strftime("%H:%M"),
-                "fare": float(schedule.price),
-            },
-            "journey_date": str(parsed_journey_date),
-            "max_selectable_seats": max_seats,
-            "seat_layout_rows": layout["seat_layout_rows"],
-            "seat_layout_cols": layout["seat_layout_cols"],
-            "seats": seats,
-        }, None
+
+async def get_seat_availability_async(
+    bus_id: int,
+    journey_date: str,
+    db,
+    booking_id: int | None = None,
+    user_id: int | None = None,
+):
+    parsed_journey_date = _parse_date(journey_date)
+
+    bus = await db.get(Bus, bus_id)
+    if bus is None:
+        return None, "bus"
+
+    schedule = (await db.execute(_schedule_for_bus_query(bus_id))).scalars().first()
+    if schedule is None:
+        return None, "schedule"
+
+    route = None
+    if schedule.route_id is not None:
+        route = await db.get(Route, schedule.route_id)
+
+    layout = await get_bus_seat_layout_async(bus_id, db)
+    if layout is None:
+        return None, "bus"
+
+    bookings = (await db.execute(_trip_bookings_query(schedule.schedule_id, parsed_journey_date))).scalars().all()
+    occupied_labels = _occupied_from_bookings(bookings)
+
+    own_labels: set[str] = set()
+    if booking_id is not None and user_id is not None:
+        own_booking = (await db.execute(_own_booking_query(booking_id, user_id))).scalar_one_or_none()
+        if own_booking is not None:
+            own_labels = set(_parse_seat_labels(own_booking.special_requests))
+
+    return _availability_output(bus, route, schedule, layout, parsed_journey_date, own_labels, occupied_labels), None
+
+
+def _availability_output(
+    bus: Bus,
+    route: Route | None,
+    schedule: BusSchedule,
+    layout: dict,
+    parsed_journey_date: date,
+    own_labels: set[str],
+    occupied_labels: dict[str, str],
+) -> dict:
+    if own_labels:
+        occupied_labels = {
+            label: status
+            for label, status in occupied_labels.items()
+            if label not in own_labels
+        }
+
+    seats = _build_availability_seats(layout, own_labels, occupied_labels)
+
+    max_seats = _max_seats_per_transaction(bus.total_seats)
+
+    return {
+        "bus": {
+            "bus_id": bus.bus_id,
+            "bus_registration_number": bus.bus_number,
+            "bus_type": bus.bus_type,
+            "vendor_name": f"{bus.bus_type} Operator",
+            "vendor_contact": "+977-9800000000",
+        },
+        "route": {
+            "from_city": route.origin if route else "N/A",
+            "to_city": route.destination if route else "N/A",
+        },
+        "schedule": {
+            "schedule_id": schedule.schedule_id,
+            "departure_time": schedule.departure_time.strftime("%H:%M"),
+            "arrival_time": schedule.arrival_time.strftime("%H:%M"),
+            "fare": float(schedule.price),
+        },
+        "journey_date": str(parsed_journey_date),
+        "max_selectable_seats": max_seats,
+        "seat_layout_rows": layout["seat_layout_rows"],
+        "seat_layout_cols": layout["seat_layout_cols"],
+        "seats": seats,
+    }
 
 
 def get_refund_estimate(
     booking_id: int,
     user_id: int,
     remove_seat_labels: list[str] | None = None,
+    db=None,
 ):
-    with get_session() as db:
-        booking = db.execute(select(Booking).where(Booking.booking_id == booking_id)).scalar_one_or_none()
+    with get_session(db) as db:
+        booking = db.get(Booking, booking_id)
         if booking is None:
             return None, "booking"
         if booking.user_id != user_id:
@@ -538,11 +707,9 @@ def get_refund_estimate(
         return refund, None
 
 
-def cancel_booking(booking_id: int, user_id: int):
-    with get_session() as db:
-        booking = db.execute(
-            select(Booking).where(Booking.booking_id == booking_id)
-        ).scalar_one_or_none()
+def cancel_booking(booking_id: int, user_id: int, db=None):
+    with get_session(db) as db:
+        booking = db.get(Booking, booking_id)
         if booking is None:
             return None, None, "booking"
 
@@ -579,23 +746,21 @@ def cancel_booking(booking_id: int, user_id: int):
         )
         refund["hours_before_departure"] = round(hours_before, 2)
 
-        db.commit()
-        db.refresh(booking)
-        _send_refund_confirmation_email(
+        _queue_refund_confirmation_email(
             db,
             booking,
             refund,
             removed_labels,
             "Full booking cancellation",
         )
+        db.commit()
+        db.refresh(booking)
         return _to_booking_output(db, booking), refund, None
 
 
-def modify_booking_seats(booking_id: int, user_id: int, remove_seat_labels: list[str]):
-    with get_session() as db:
-        booking = db.execute(
-            select(Booking).where(Booking.booking_id == booking_id)
-        ).scalar_one_or_none()
+def modify_booking_seats(booking_id: int, user_id: int, remove_seat_labels: list[str], db=None):
+    with get_session(db) as db:
+        booking = db.get(Booking, booking_id)
         if booking is None:
             return None, None, "booking"
 
@@ -644,21 +809,21 @@ def modify_booking_seats(booking_id: int, user_id: int, remove_seat_labels: list
         )
         refund["hours_before_departure"] = round(hours_before, 2)
 
-        db.commit()
-        db.refresh(booking)
-        _send_refund_confirmation_email(
+        _queue_refund_confirmation_email(
             db,
             booking,
             refund,
             to_remove,
             "Seat modification refund",
         )
+        db.commit()
+        db.refresh(booking)
         return _to_booking_output(db, booking), refund, None
 
 
-def replace_booking_seats(booking_id: int, user_id: int, seat_labels: list[str]):
-    with get_session() as db:
-        booking = db.execute(select(Booking).where(Booking.booking_id == booking_id)).scalar_one_or_none()
+def replace_booking_seats(booking_id: int, user_id: int, seat_labels: list[str], db=None):
+    with get_session(db) as db:
+        booking = db.get(Booking, booking_id)
         if booking is None:
             return None, None, "booking"
 
@@ -729,76 +894,106 @@ def replace_booking_seats(booking_id: int, user_id: int, seat_labels: list[str])
             "max_selectable_seats": max_seats,
         }
 
-        db.commit()
-        db.refresh(booking)
-        _send_refund_confirmation_email(
+        _queue_refund_confirmation_email(
             db,
             booking,
             refund,
             removed,
             "Seat replacement settlement",
         )
+        db.commit()
+        db.refresh(booking)
         return _to_booking_output(db, booking), settlement, None
 
 
-def _send_booking_confirmation_email(db, booking: Booking) -> None:
-    """Send formatted ticket confirmation email to passenger."""
+def _ticket_document(db, booking: Booking):
+    """Render params and cache key fields for a booking's ticket PDF; (None, error_key) if unavailable."""
     schedule = _find_schedule_for_booking(db, booking)
-    if schedule is None or booking.passenger_email is None:
-        return
+    if schedule is None:
+        return None, "schedule"
 
-    bus = db.execute(select(Bus).where(Bus.bus_id == schedule.bus_id)).scalar_one_or_none()
-    route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
+    bus = db.get(Bus, schedule.bus_id)
+    route = db.get(Route, schedule.route_id)
 
     if bus is None or route is None:
-        return
+        return None, "bus"
 
+    return _ticket_params(booking, schedule, bus, route), None
+
+
+async def _ticket_document_async(db, booking: Booking):
+    if booking.schedule_id is None:
+        return None, "schedule"
+    schedule = await db.get(BusSchedule, booking.schedule_id)
+    if schedule is None:
+        return None, "schedule"
+
+    bus = await db.get(Bus, schedule.bus_id)
+    route = await db.get(Route, schedule.route_id)
+
+    if bus is None or route is None:
+        return None, "bus"
+
+    return _ticket_params(booking, schedule, bus, route), None
+
+
+def _ticket_params(booking: Booking, schedule: BusSchedule, bus: Bus, route: Route):
     seat_labels = _parse_seat_labels(booking.special_requests)
     bus_name = bus.bus_number if hasattr(bus, 'bus_number') else "Bus"
     route_str = f"{route.origin} - {route.destination}" if hasattr(route, 'origin') else "Route"
 
-    email_html = format_ticket_email(
-        passenger_name=booking.passenger_name or "Passenger",
-        booking_reference=booking.booking_reference,
-        journey_date=str(booking.journey_date),
-        departure_time=schedule.departure_time.strftime("%H:%M"),
-        arrival_time=schedule.arrival_time.strftime("%H:%M"),
-        bus_name=bus_name,
-        route=route_str,
-        seats=seat_labels,
-        total_amount=float(booking.total_amount or 0),
-        passenger_email=booking.passenger_email,
-    )
+    params = {
+        "passenger_name": booking.passenger_name or "Passenger",
+        "booking_reference": booking.booking_reference,
+        "journey_date": str(booking.journey_date),
+        "departure_time": schedule.departure_time.strftime("%H:%M"),
+        "arrival_time": schedule.arrival_time.strftime("%H:%M"),
+        "bus_name": bus_name,
+        "route": route_str,
+        "seats": seat_labels,
+        "total_amount": float(booking.total_amount or 0),
+        "passenger_email": booking.passenger_email or "N/A",
+    }
+    # Not printed on the ticket, but a status change must not keep serving the old file.
+    key_fields = {"booking_status": booking.booking_status, "payment_status": booking.payment_status}
+    return params, key_fields
 
-    ticket_pdf = generate_ticket_pdf(
-        passenger_name=booking.passenger_name or "Passenger",
-        booking_reference=booking.booking_reference,
-        journey_date=str(booking.journey_date),
-        departure_time=schedule.departure_time.strftime("%H:%M"),
-        arrival_time=schedule.arrival_time.strftime("%H:%M"),
-        bus_name=bus_name,
-        route=route_str,
-        seats=seat_labels,
-        total_amount=float(booking.total_amount or 0),
-        passenger_email=booking.passenger_email,
-    )
 
-    send_email(
+def _queue_booking_confirmation_email(db, booking: Booking) -> None:
+    """Queue the ticket confirmation email in the caller's transaction and pre-render its PDF after commit."""
+    if booking.passenger_email is None:
+        return
+    document, error_key = _ticket_document(db, booking)
+    if error_key:
+        return
+    params, key_fields = document
+
+    email_html = format_ticket_email(**params)
+    queue_email(
+        db,
         recipient=booking.passenger_email,
         subject=f"Ticket Confirmation - {booking.booking_reference}",
         html_content=email_html,
-        attachments=[(f"ticket_{booking.booking_reference}.pdf", ticket_pdf, "pdf")],
+        attachments=[
+            {
+                "filename": f"ticket_{booking.booking_reference}.pdf",
+                "renderer": "ticket_pdf",
+                "params": params,
+                "key_fields": key_fields,
+            }
+        ],
     )
+    prerender_after_commit(db, "ticket_pdf", params, key_fields)
 
 
-def _send_refund_confirmation_email(
+def _queue_refund_confirmation_email(
     db,
     booking: Booking,
     refund: dict,
     refunded_seat_labels: list[str],
     refund_reason: str,
 ) -> None:
-    """Send refund confirmation email with attached refund receipt PDF."""
+    """Queue the refund confirmation email (receipt PDF attached) in the caller's transaction."""
     refund_amount = float(refund.get("refund_amount") or 0)
     if refund_amount <= 0 or not booking.passenger_email:
         return
@@ -807,8 +1002,8 @@ def _send_refund_confirmation_email(
     if schedule is None:
         return
 
-    bus = db.execute(select(Bus).where(Bus.bus_id == schedule.bus_id)).scalar_one_or_none()
-    route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
+    bus = db.get(Bus, schedule.bus_id)
+    route = db.get(Route, schedule.route_id)
     if bus is None or route is None:
         return
 
@@ -823,24 +1018,31 @@ def _send_refund_confirmation_email(
         refunded_seats=refunded_seat_labels,
         refund_reason=refund_reason,
     )
-    refund_pdf = generate_refund_receipt_pdf(
-        passenger_name=booking.passenger_name or "Passenger",
-        booking_reference=booking.booking_reference,
-        journey_date=str(booking.journey_date),
-        bus_name=bus_name,
-        route=route_str,
-        refunded_seats=refunded_seat_labels,
-        refund_amount=refund_amount,
-        refund_percent=int(refund.get("refund_percent") or 0),
-        refund_reason=refund_reason,
-        passenger_email=booking.passenger_email,
-    )
+    receipt_params = {
+        "passenger_name": booking.passenger_name or "Passenger",
+        "booking_reference": booking.booking_reference,
+        "journey_date": str(booking.journey_date),
+        "bus_name": bus_name,
+        "route": route_str,
+        "refunded_seats": refunded_seat_labels,
+        "refund_amount": refund_amount,
+        "refund_percent": int(refund.get("refund_percent") or 0),
+        "refund_reason": refund_reason,
+        "passenger_email": booking.passenger_email,
+    }
 
-    send_email(
+    queue_email(
+        db,
         recipient=booking.passenger_email,
         subject=f"Refund Receipt - {booking.booking_reference}",
         html_content=refund_html,
-        attachments=[(f"refund_{booking.booking_reference}.pdf", refund_pdf, "pdf")],
+        attachments=[
+            {
+                "filename": f"refund_{booking.booking_reference}.pdf",
+                "renderer": "refund_receipt_pdf",
+                "params": receipt_params,
+            }
+        ],
     )
 
 
@@ -849,71 +1051,127 @@ def confirm_booking_payment(
     user_id: int,
     payment_method: str,
     pay_later: bool = False,
+    db=None,
 ):
-    with get_session() as db:
-        booking = db.execute(select(Booking).where(Booking.booking_id == booking_id)).scalar_one_or_none()
+    with get_session(db) as db:
+        booking = db.get(Booking, booking_id)
         if booking is None:
             return None, "booking"
 
         if booking.user_id != user_id:
             return None, "forbidden"
 
-        user = db.execute(select(User).where(User.user_id == user_id)).scalar_one_or_none()
+        user = db.get(User, user_id)
         role = (user.role if user and user.role else "customer").lower()
 
         if pay_later and role not in {"vendor", "admin"}:
             return None, "pay_later_forbidden"
 
-        booking.payment_method = payment_method.strip().lower()
-        booking.payment_status = "pay_later" if pay_later else "paid"
-        booking.booking_status = "confirmed"
-        booking.updated_at = datetime.now(timezone.utc)
+        _mark_booking_paid(booking, payment_method, pay_later)
+        _queue_booking_confirmation_email(db, booking)
 
         db.commit()
         db.refresh(booking)
 
-        _send_booking_confirmation_email(db, booking)
-
         return _to_booking_output(db, booking), None
 
 
-def get_booking_ticket_pdf(booking_id: int, user_id: int) -> tuple[bytes | None, str | None]:
-    """Generate ticket PDF for booking. Returns (pdf_bytes, error_key)."""
-    with get_session() as db:
-        booking = db.execute(
-            select(Booking).where(Booking.booking_id == booking_id)
-        ).scalar_one_or_none()
+def _mark_booking_paid(booking: Booking, payment_method: str, pay_later: bool = False) -> None:
+    booking.payment_method = payment_method.strip().lower()
+    booking.payment_status = "pay_later" if pay_later else "paid"
+    booking.booking_status = "confirmed"
+    booking.updated_at = datetime.now(timezone.utc)
+
+
+def get_booking_ticket_pdf(booking_id: int, user_id: int, db=None) -> tuple[CachedPdf | None, str | None]:
+    """Ticket PDF for booking from the PDF cache (rendered on a miss). Returns (cached_pdf, error_key)."""
+    with get_session(db) as db:
+        booking = db.get(Booking, booking_id)
         if booking is None:
             return None, "booking"
 
         if booking.user_id != user_id:
             return None, "forbidden"
 
-        schedule = _find_schedule_for_booking(db, booking)
-        if schedule is None:
-            return None, "schedule"
+        document, error_key = _ticket_document(db, booking)
+        if error_key:
+            return None, error_key
 
-        bus = db.execute(select(Bus).where(Bus.bus_id == schedule.bus_id)).scalar_one_or_none()
-        route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
+    params, key_fields = document
+    return get_or_render_pdf("ticket_pdf", params, key_fields), None
 
-        if bus is None or route is None:
-            return None, "bus"
 
-        seat_labels = _parse_seat_labels(booking.special_requests)
-        bus_name = bus.bus_number if hasattr(bus, 'bus_number') else "Bus"
-        route_str = f"{route.origin} - {route.destination}" if hasattr(route, 'origin') else "Route"
-
-        pdf_bytes = generate_ticket_pdf(
-            passenger_name=booking.passenger_name or "Passenger",
-            booking_reference=booking.booking_reference,
-            journey_date=str(booking.journey_date),
-            departure_time=schedule.departure_time.strftime("%H:%M"),
-            arrival_time=schedule.arrival_time.strftime("%H:%M"),
-            bus_name=bus_name,
-            route=route_str,
-            seats=seat_labels,
-            total_amount=float(booking.total_amount or 0),
-            passenger_email=booking.passenger_email or "N/A",
+async def get_booking_ticket_pdf_async(booking_id: int, user_id: int, db) -> tuple[CachedPdf | None, str | None]:
+    """Async get_booking_ticket_pdf: a cache miss awaits the PDF process pool instead of a thread."""
+    booking = await db.get(Booking, booking_id)
+    if booking is None:
+        return None, "booking"
+
+    if booking.user_id != user_id:
+        return None, "forbidden"
+
+    document, error_key = await _ticket_document_async(db, booking)
+    if error_key:
+        return None, error_key
+
+    params, key_fields = document
+    return await get_or_render_pdf_async("ticket_pdf", params, key_fields), None
+
+
+def _arrived_schedule_ids(db, journey_date: date, now: datetime) -> list[int]:
+    # Schedule times are local wall-clock times; an arrival before departure means next day.
+    arrived: list[int] = []
+    for schedule_id, departure_time, arrival_time in db.execute(
+        select(BusSchedule.schedule_id, BusSchedule.departure_time, BusSchedule.arrival_time)
+    ).all():
+        arrival = datetime.combine(journey_date, arrival_time)
+        if arrival_time < departure_time:
+            arrival += timedelta(days=1)
+        if arrival <= now:
+            arrived.append(schedule_id)
+    return arrived
+
+
+def _complete_bookings_where(db, condition, updated_at: datetime, batch_size: int) -> int:
+    completed = 0
+    while True:
+        booking_ids = db.execute(
+            select(Booking.booking_id)
+            .where(Booking.booking_status.in_(COMPLETABLE_BOOKING_STATES), condition)
+            .limit(batch_size)
+        ).scalars().all()
+        if not booking_ids:
+            return completed
+        db.execute(
+            update(Booking)
+            .where(Booking.booking_id.in_(booking_ids))
+            .values(booking_status=BOOKING_STATUS_COMPLETED, updated_at=updated_at)
         )
+        db.commit()
+        completed += len(booking_ids)
+
+
+def complete_finished_bookings(now: datetime | None = None, batch_size: int = BOOKING_COMPLETION_BATCH_SIZE) -> int:
+    """Mark confirmed bookings completed once journey_date + schedule arrival has passed.
 
-        return pdf_bytes, None
+    Journeys from before yesterday have arrived whatever the schedule says, so they go in
+    plain date batches; only yesterday/today need the per-schedule arrival times.
+    """
+    # Arrival check local wall-clock ma; updated_at chai aru writer jastai UTC ma.
+    now = now or datetime.now()
+    updated_at = datetime.now(timezone.utc)
+    today = now.date()
+    with get_session() as db:
+        completed = _complete_bookings_where(
+            db, Booking.journey_date < today - timedelta(days=1), updated_at, batch_size
+        )
+        for journey_date in (today - timedelta(days=1), today):
+            schedule_ids = _arrived_schedule_ids(db, journey_date, now)
+            if schedule_ids:
+                completed += _complete_bookings_where(
+                    db,
+                    (Booking.journey_date == journey_date) & Booking.schedule_id.in_(schedule_ids),
+                    updated_at,
+                    batch_size,
+                )
+        return completed
@@ -1,11 +1,13 @@
 from datetime import time
 import math
 
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
 
 from app.config.database import get_session
 from app.model.models import Bus, BusSchedule, BusSeat, Route
 
+VENDOR_INACTIVE_BLOCK_REASON = "vendor_inactive"
+
 
 def _bus_context(db, bus_id: int):
     schedule = db.execute(
@@ -14,7 +16,7 @@ def _bus_context(db, bus_id: int):
 
     route = None
     if schedule is not None and schedule.route_id is not None:
-        route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
+        route = db.get(Route, schedule.route_id)
 
     return schedule, route
 
@@ -175,9 +177,40 @@ def _sync_bus_seats(db, bus_id: int, seat_cells: list[dict]):
             seat.block_reason = None
 
 
+async def _bus_contexts_async(db, bus_ids: list[int]) -> dict[int, tuple]:
+    # Async path loads every bus context in two queries instead of two per bus.
+    if not bus_ids:
+        return {}
+
+    schedule_rows = (
+        await db.execute(
+            select(BusSchedule).where(BusSchedule.bus_id.in_(bus_ids)).order_by(BusSchedule.schedule_id)
+        )
+    ).scalars().all()
+    schedules: dict[int, BusSchedule] = {}
+    for schedule in schedule_rows:
+        schedules.setdefault(schedule.bus_id, schedule)
+
+    route_ids = {item.route_id for item in schedules.values() if item.route_id is not None}
+    routes: dict[int, Route] = {}
+    if route_ids:
+        route_rows = (await db.execute(select(Route).where(Route.route_id.in_(route_ids)))).scalars().all()
+        routes = {item.route_id: item for item in route_rows}
+
+    contexts = {}
+    for bus_id in bus_ids:
+        schedule = schedules.get(bus_id)
+        route = routes.get(schedule.route_id) if schedule is not None else None
+        contexts[bus_id] = (schedule, route)
+    return contexts
+
+
 def _to_bus_output(db, bus: Bus) -> dict:
     schedule, route = _bus_context(db, bus.bus_id)
+    return _bus_output(bus, schedule, route)
+
 
+def _bus_output(bus: Bus, schedule: BusSchedule | None, route: Route | None) -> dict:
     from_city = route.origin if route is not None else "N/A"
     to_city = route.destination if route is not None else "N/A"
     price = 0
@@ -197,6 +230,7 @@ def _to_bus_output(db, bus: Bus) -> dict:
         "seat_layout_rows": bus.seat_layout_rows,
         "seat_layout_cols": bus.seat_layout_cols,
         "is_active": bool(bus.is_active),
+        "vendor_id": bus.vendor_id,
     }
 
 
@@ -222,47 +256,67 @@ def _resolve_route(db, from_city: str, to_city: str, price: float) -> Route:
     return route
 
 
-def list_buses():
-    with get_session() as db:
+def list_buses(db=None):
+    with get_session(db, readonly=True) as db:
         buses = db.execute(
             select(Bus).where(Bus.is_active.is_(True)).order_by(Bus.bus_id)
         ).scalars().all()
         return [_to_bus_output(db, bus) for bus in buses]
 
 
-def list_all_buses():
-    with get_session() as db:
+def list_all_buses(db=None):
+    with get_session(db, readonly=True) as db:
         buses = db.execute(
             select(Bus).order_by(Bus.bus_id)
         ).scalars().all()
         return [_to_bus_output(db, bus) for bus in buses]
 
 
-def list_search_locations():
-    with get_session() as db:
-        rows = db.execute(
-            select(Route.origin, Route.destination)
-            .where(
-                Route.is_active.is_(True),
-                Route.origin.is_not(None),
-                Route.destination.is_not(None),
-            )
-            .order_by(Route.origin, Route.destination)
-        ).all()
+async def list_buses_async(db):
+    buses = (
+        await db.execute(select(Bus).where(Bus.is_active.is_(True)).order_by(Bus.bus_id))
+    ).scalars().all()
+    contexts = await _bus_contexts_async(db, [bus.bus_id for bus in buses])
+    return [_bus_output(bus, *contexts[bus.bus_id]) for bus in buses]
+
 
-        return [
-            {
-                "from_city": origin,
-                "to_city": destination,
-            }
-            for origin, destination in rows
-            if origin and destination
-        ]
+def _search_locations_query():
+    return (
+        select(Route.origin, Route.destination)
+        .where(
+            Route.is_active.is_(True),
+            Route.origin.is_not(None),
+            Route.destination.is_not(None),
+        )
+        .order_by(Route.origin, Route.destination)
+    )
 
 
-def find_bus(bus_id: int):
-    with get_session() as db:
-        bus = db.execute(select(Bus).where(Bus.bus_id == bus_id)).scalar_one_or_none()
+def _search_locations_output(rows) -> list[dict]:
+    return [
+        {
+            "from_city": origin,
+            "to_city": destination,
+        }
+        for origin, destination in rows
+        if origin and destination
+    ]
+
+
+def list_search_locations(db=None):
+    with get_session(db, readonly=True) as db:
+        rows = db.execute(_search_locations_query()).all()
+        return _search_locations_output(rows)
+
+
+async def list_search_locations_async(db):
+    rows = (await db.execute(_search_locations_query())).all()
+    return _search_locations_output(rows)
+
+
+def find_bus(bus_id: int, db=None):
+    with get_session(db) as db:
+        bus = db.get(Bus, bus_id)
         if bus is None:
             return None
         return _to_bus_output(db, bus)
@@ -286,6 +340,7 @@ def create_bus_admin(
     to_city: str,
     price: float,
     seat_capacity: int,
+    vendor_id: int | None = None,
 ):
     seat_layout_cols = _default_layout_cols(bus_type)
     seat_layout_rows = max(1, math.ceil(seat_capacity / seat_layout_cols))
@@ -298,6 +353,7 @@ def create_bus_admin(
             seat_layout_rows=seat_layout_rows,
             seat_layout_cols=seat_layout_cols,
             is_active=True,
+            vendor_id=vendor_id,
         )
         db.add(new_bus)
         db.flush()
@@ -416,14 +472,16 @@ def update_bus(
 
 def set_bus_status(bus_id: int, is_active: bool):
     with get_session() as db:
-        bus = db.execute(select(Bus).where(Bus.bus_id == bus_id)).scalar_one_or_none()
+        bus = db.get(Bus, bus_id)
         if bus is None:
             return None
 
+        # An explicit admin choice replaces any cascade marker.
         bus.is_active = is_active
-        schedules = db.execute(select(BusSchedule).where(BusSchedule.bus_id == bus_id)).scalars().all()
-        for schedule in schedules:
-            schedule.is_active = is_active
+        bus.inactive_reason = None
+        db.execute(
+            update(BusSchedule).where(BusSchedule.bus_id == bus_id).values(is_active=is_active, inactive_reason=None)
+        )
 
         db.commit()
         db.refresh(bus)
@@ -432,62 +490,142 @@ def set_bus_status(bus_id: int, is_active: bool):
 
 def delete_bus(bus_id: int):
     with get_session() as db:
-        bus = db.execute(select(Bus).where(Bus.bus_id == bus_id)).scalar_one_or_none()
+        bus = db.get(Bus, bus_id)
         if bus is None:
             return False
 
         bus.is_active = False
-        schedules = db.execute(select(BusSchedule).where(BusSchedule.bus_id == bus_id)).scalars().all()
-        for schedule in schedules:
-            schedule.is_active = False
-
-        seats = db.execute(select(BusSeat).where(BusSeat.bus_id == bus_id)).scalars().all()
-        for seat in seats:
-            seat.is_active = False
+        bus.inactive_reason = None
+        db.execute(
+            update(BusSchedule).where(BusSchedule.bus_id == bus_id).values(is_active=False, inactive_reason=None)
+        )
+        db.execute(update(BusSeat).where(BusSeat.bus_id == bus_id).values(is_active=False))
 
         db.commit()
         return True
 
 
-def get_bus_seat_layout(bus_id: int):
-    with get_session() as db:
-        bus = db.execute(select(Bus).where(Bus.bus_id == bus_id)).scalar_one_or_none()
-        if bus is None:
-            return None
+def apply_vendor_fleet_status(db, vendor_id: int, is_active: bool) -> dict:
+    """Flip a vendor's buses, schedules and seats with set-based UPDATEs (no commit).
 
-        rows = max(1, bus.seat_layout_rows)
-        cols = max(1, bus.seat_layout_cols)
-        seats = db.execute(
-            select(BusSeat)
-            .where(BusSeat.bus_id == bus_id)
-            .order_by(BusSeat.row_index, BusSeat.col_index)
-        ).scalars().all()
+    Deactivation only touches rows that are active and tags them with
+    VENDOR_INACTIVE_BLOCK_REASON (``inactive_reason`` on buses and schedules,
+    ``block_reason`` on seats, which are blocked instead of disabled so the seat
+    layout survives). Reactivation restores exactly the tagged rows, so buses,
+    schedules and seats an admin had turned off stay off.
+    """
+    fleet_bus_ids = select(Bus.bus_id).where(Bus.vendor_id == vendor_id).scalar_subquery()
 
-        if seats:
-            # Normalize older/incomplete datasets so every grid position is represented.
-            seat_cells = _build_layout_seats(
-                seat_layout_rows=rows,
-                seat_layout_cols=cols,
-                seats=[
-                    {
-                        "row_index": seat.row_index,
-                        "col_index": seat.col_index,
-                        "seat_label": seat.seat_label,
-                        "is_active": bool(seat.is_active),
-                        "is_blocked": bool(getattr(seat, "is_blocked", False)),
-                        "block_reason": getattr(seat, "block_reason", None),
-                    }
-                    for seat in seats
-                ],
+    if is_active:
+        buses = db.execute(
+            update(Bus)
+            .where(Bus.vendor_id == vendor_id, Bus.inactive_reason == VENDOR_INACTIVE_BLOCK_REASON)
+            .values(is_active=True, inactive_reason=None)
+        ).rowcount
+        schedules = db.execute(
+            update(BusSchedule)
+            .where(
+                BusSchedule.bus_id.in_(fleet_bus_ids),
+                BusSchedule.inactive_reason == VENDOR_INACTIVE_BLOCK_REASON,
             )
-        else:
-            seat_cells = _build_layout_seats(
-                seat_layout_rows=rows,
-                seat_layout_cols=cols,
-                active_limit=bus.total_seats,
+            .values(is_active=True, inactive_reason=None)
+        ).rowcount
+    else:
+        buses = db.execute(
+            update(Bus)
+            .where(Bus.vendor_id == vendor_id, Bus.is_active.is_(True))
+            .values(is_active=False, inactive_reason=VENDOR_INACTIVE_BLOCK_REASON)
+        ).rowcount
+        schedules = db.execute(
+            update(BusSchedule)
+            .where(BusSchedule.bus_id.in_(fleet_bus_ids), BusSchedule.is_active.is_(True))
+            .values(is_active=False, inactive_reason=VENDOR_INACTIVE_BLOCK_REASON)
+        ).rowcount
+
+    if is_active:
+        seats = db.execute(
+            update(BusSeat)
+            .where(
+                BusSeat.bus_id.in_(fleet_bus_ids),
+                BusSeat.block_reason == VENDOR_INACTIVE_BLOCK_REASON,
             )
+            .values(is_blocked=False, block_reason=None)
+        ).rowcount
+    else:
+        seats = db.execute(
+            update(BusSeat)
+            .where(
+                BusSeat.bus_id.in_(fleet_bus_ids),
+                BusSeat.is_active.is_(True),
+                or_(BusSeat.is_blocked.is_(False), BusSeat.is_blocked.is_(None)),
+            )
+            .values(is_blocked=True, block_reason=VENDOR_INACTIVE_BLOCK_REASON)
+        ).rowcount
 
-        return _layout_output(bus, seat_cells)
+    return {
+        "vendor_id": vendor_id,
+        "is_active": is_active,
+        "buses": buses,
+        "schedules": schedules,
+        "seats": seats,
+    }
+
+
+def get_bus_seat_layout(bus_id: int, db=None):
+    with get_session(db) as db:
+        bus = db.get(Bus, bus_id)
+        if bus is None:
+            return None
+
+        seats = db.execute(_bus_seats_query(bus_id)).scalars().all()
+        return _layout_from_seat_rows(bus, seats)
+
+
+async def get_bus_seat_layout_async(bus_id: int, db):
+    bus = await db.get(Bus, bus_id)
+    if bus is None:
+        return None
+
+    seats = (await db.execute(_bus_seats_query(bus_id))).scalars().all()
+    return _layout_from_seat_rows(bus, seats)
+
+
+def _bus_seats_query(bus_id: int):
+    return (
+        select(BusSeat)
+        .where(BusSeat.bus_id == bus_id)
+        .order_by(BusSeat.row_index, BusSeat.col_index)
+    )
+
+
+def _layout_from_seat_rows(bus: Bus, seats: list[BusSeat]) -> dict:
+    rows = max(1, bus.seat_layout_rows)
+    cols = max(1, bus.seat_layout_cols)
+    if seats:
+        # Normalize older/incomplete datasets so every grid position is represented.
+        seat_cells = _build_layout_seats(
+            seat_layout_rows=rows,
+            seat_layout_cols=cols,
+            seats=[
+                {
+                    "row_index": seat.row_index,
+                    "col_index": seat.col_index,
+                    "seat_label": seat.seat_label,
+                    "is_active": bool(seat.is_active),
+                    "is_blocked": bool(getattr(seat, "is_blocked", False)),
+                    "block_reason": getattr(seat, "block_reason", None),
+                }
+                for seat in seats
+            ],
+        )
+    else:
+        seat_cells = _build_layout_seats(
+            seat_layout_rows=rows,
+            seat_layout_cols=cols,
+            active_limit=bus.total_seats,
+        )
+
+    return _layout_output(bus, seat_cells)
 
 
 def save_bus_seat_layout(
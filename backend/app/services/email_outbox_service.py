@@ -0,0 +1,231 @@
+"""Transactional email outbox.
+
+Services add an email to the same session as the change it reports (``queue_email``)
+and commit both together, so a rolled-back booking never mails a ticket and a slow
+SMTP server never sits inside a checkout. The SMTP worker (app.jobs.email_worker)
+claims due rows in batches, renders their attachments, sends them over one
+persistent connection and retries failures with backoff.
+
+Rows are claimed with the same compare-and-set UPDATE plus lock expiry as the
+payment verification queue, so several processes can share the outbox.
+"""
+
+import json
+import logging
+import os
+import smtplib
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event, func, or_, select, update
+
+from app.config.database import SessionLocal, get_session
+from app.model.email_outbox import EmailOutbox
+from app.services.email_service import SmtpConnection, build_message, smtp_configured
+from app.services.pdf_cache_service import get_or_render_pdf_bytes, get_or_render_pdfs
+
+logger = logging.getLogger(__name__)
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", "3600"))
+EMAIL_OUTBOX_LOCK_SECONDS = float(os.getenv("EMAIL_OUTBOX_LOCK_SECONDS", "300"))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "14"))
+
+FINISHED_STATES = ("sent", "failed", "skipped")
+
+_QUEUED_KEY = "email_outbox_queued"
+# Set after a commit that queued mail; the worker waits on it between polls.
+outbox_signal = threading.Event()
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def queue_email(db, recipient: str | None, subject: str, html_content: str, attachments: list[dict] | None = None):
+    """Add an email to the caller's transaction; it goes out once that transaction commits."""
+    if not recipient:
+        return None
+    now = _now_utc()
+    row = EmailOutbox(
+        recipient=recipient,
+        subject=subject[:255],
+        html_content=html_content,
+        attachments=json.dumps(attachments, default=str) if attachments else None,
+        state="queued",
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(row)
+    db.info[_QUEUED_KEY] = True
+    return row
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _signal_after_commit(session):
+    if session.info.pop(_QUEUED_KEY, False):
+        outbox_signal.set()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop(_QUEUED_KEY, None)
+
+
+def claim_due_emails(worker_id: str, limit: int) -> list[int]:
+    """Lock up to ``limit`` due rows for ``worker_id``, oldest first; returns their ids."""
+    if limit <= 0:
+        return []
+    now = _now_utc()
+    due = or_(
+        (EmailOutbox.state == "queued") & (EmailOutbox.next_attempt_at <= now),
+        (EmailOutbox.state == "sending") & (EmailOutbox.locked_until < now),
+    )
+    claimed = []
+    with get_session() as db:
+        candidates = db.execute(
+            select(EmailOutbox.id).where(due).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(limit)
+        ).scalars().all()
+        for email_id in candidates:
+            taken = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == email_id, due)
+                .values(
+                    state="sending",
+                    locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=EMAIL_OUTBOX_LOCK_SECONDS),
+                    attempts=EmailOutbox.attempts + 1,
+                    updated_at=now,
+                )
+            ).rowcount
+            if taken:
+                claimed.append(email_id)
+        db.commit()
+    return claimed
+
+
+def _render_attachments(raw: str | None) -> list[tuple[str, bytes, str]]:
+    # Specs are {"filename", "renderer", "params", "key_fields"?}; renders come from the PDF cache.
+    rendered = []
+    for spec in json.loads(raw) if raw else []:
+        content = get_or_render_pdf_bytes(spec["renderer"], spec["params"], spec.get("key_fields"))
+        rendered.append((spec["filename"], content, "pdf"))
+    return rendered
+
+
+def _prerender_batch(rows: list[EmailOutbox]) -> None:
+    # One concurrent render across the PDF pool for the whole batch; the sends then hit the cache.
+    documents = [
+        (spec["renderer"], spec["params"], spec.get("key_fields"))
+        for row in rows
+        for spec in (json.loads(row.attachments) if row.attachments else [])
+    ]
+    if not documents:
+        return
+    try:
+        get_or_render_pdfs(documents)
+    except Exception:
+        # Each send renders its own attachments again and fails/retries on its own.
+        logger.exception("Batch attachment render failed")
+
+
+def _is_permanent(exc: Exception) -> bool:
+    # 5xx is the server saying "never"; 4xx and connection trouble are worth another try.
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and 500 <= exc.smtp_code < 600
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(EMAIL_OUTBOX_MAX_BACKOFF_SECONDS, EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** max(0, attempts - 1)))
+
+
+def _finish(db, worker_id: str, email_ids: list[int], **values) -> None:
+    if email_ids:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(email_ids), EmailOutbox.locked_by == worker_id)
+            .values(locked_by=None, locked_until=None, **values)
+        )
+
+
+def send_claimed_emails(email_ids: list[int], worker_id: str, connection: SmtpConnection) -> Counter:
+    """Send a claimed batch over ``connection`` and record every outcome; returns counts per state."""
+    with get_session(readonly=True) as db:
+        rows = db.execute(
+            select(EmailOutbox).where(EmailOutbox.id.in_(email_ids), EmailOutbox.locked_by == worker_id)
+        ).scalars().all()
+        db.expunge_all()
+
+    if not smtp_configured():
+        # No SMTP credentials: nothing to send with, so drop quietly.
+        with get_session() as db:
+            _finish(
+                db, worker_id, [row.id for row in rows], state="skipped", last_error="smtp_not_configured", updated_at=_now_utc()
+            )
+            db.commit()
+        return Counter(skipped=len(rows))
+
+    _prerender_batch(rows)
+    sent, retries, failed = [], [], {}
+    for row in rows:
+        try:
+            message = build_message(row.recipient, row.subject, row.html_content, _render_attachments(row.attachments))
+            connection.send(message)
+        except Exception as exc:
+            error = f"{exc.__class__.__name__}: {exc}"[:255]
+            if _is_permanent(exc) or row.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+                failed[row.id] = error
+                logger.error("Email %s to %s failed for good: %s", row.id, row.recipient, error)
+            else:
+                retries.append((row, error))
+                logger.warning("Email %s attempt %s failed (%s); retrying", row.id, row.attempts, error)
+            continue
+        sent.append(row.id)
+
+    now = _now_utc()
+    with get_session() as db:
+        _finish(db, worker_id, sent, state="sent", sent_at=now, updated_at=now, last_error=None)
+        for email_id, error in failed.items():
+            _finish(db, worker_id, [email_id], state="failed", last_error=error, updated_at=now)
+        for row, error in retries:
+            _finish(
+                db,
+                worker_id,
+                [row.id],
+                state="queued",
+                last_error=error,
+                next_attempt_at=now + timedelta(seconds=_retry_delay(row.attempts)),
+                updated_at=now,
+            )
+        db.commit()
+    return Counter(sent=len(sent), failed=len(failed), retried=len(retries))
+
+
+def email_outbox_depth() -> dict:
+    with get_session(readonly=True) as db:
+        rows = db.execute(
+            select(EmailOutbox.state, func.count(), func.min(EmailOutbox.created_at))
+            .where(EmailOutbox.state.in_(("queued", "sending")))
+            .group_by(EmailOutbox.state)
+        ).all()
+    depth = {"queued": 0, "sending": 0, "oldest_queued_seconds": None}
+    for state, count, oldest in rows:
+        depth[state] = count
+        if state == "queued" and oldest is not None:
+            depth["oldest_queued_seconds"] = round((_now_utc() - oldest).total_seconds(), 1)
+    return depth
+
+
+def purge_finished_emails() -> int:
+    cutoff = _now_utc() - timedelta(days=EMAIL_OUTBOX_RETENTION_DAYS)
+    with get_session() as db:
+        purged = db.execute(
+            delete(EmailOutbox).where(EmailOutbox.state.in_(FINISHED_STATES), EmailOutbox.updated_at < cutoff)
+        ).rowcount
+        db.commit()
+        return purged
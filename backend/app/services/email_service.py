@@ -1,5 +1,6 @@
 import os
 import smtplib
+import time
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -9,43 +10,98 @@ SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SENDER_EMAIL = os.getenv("SENDER_EMAIL", "noreply@ticketnepal.com")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD", "")
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+# Most servers drop an idle session after a minute or so; close ours before that.
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "45"))
 
 
-def send_email(
+def build_message(
     recipient: str,
     subject: str,
     html_content: str,
     attachments: list[tuple[str, bytes, str]] | None = None,
-) -> bool:
-    """Send HTML email to recipient. Returns True if successful."""
-    if not recipient or not SENDER_PASSWORD:
-        return False
-
-    try:
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = SENDER_EMAIL
-        message["To"] = recipient
-
-        part = MIMEText(html_content, "html")
-        message.attach(part)
-
-        if attachments:
-            for filename, content, mime_subtype in attachments:
-                if not content:
-                    continue
-                pdf_part = MIMEApplication(content, _subtype=mime_subtype)
-                pdf_part.add_header("Content-Disposition", "attachment", filename=filename)
-                message.attach(pdf_part)
-
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+) -> MIMEMultipart:
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = SENDER_EMAIL
+    message["To"] = recipient
+
+    part = MIMEText(html_content, "html")
+    message.attach(part)
+
+    if attachments:
+        for filename, content, mime_subtype in attachments:
+            if not content:
+                continue
+            pdf_part = MIMEApplication(content, _subtype=mime_subtype)
+            pdf_part.add_header("Content-Disposition", "attachment", filename=filename)
+            message.attach(pdf_part)
+    return message
+
+
+def smtp_configured() -> bool:
+    return bool(SENDER_PASSWORD)
+
+
+class SmtpConnection:
+    """One logged-in SMTP session reused across messages (not thread-safe).
+
+    Connects on first send, reconnects once if the server dropped us, and closes
+    itself after SMTP_IDLE_SECONDS without traffic so the server never has to.
+    """
+
+    def __init__(self):
+        self._server: smtplib.SMTP | None = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
             server.starttls()
             server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, recipient, message.as_string())
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        return server
+
+    def send(self, message: MIMEMultipart) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()
+        for attempt in range(2):
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.sendmail(SENDER_EMAIL, message["To"], message.as_string())
+            except smtplib.SMTPException as exc:
+                if not isinstance(exc, smtplib.SMTPServerDisconnected):
+                    # A live server refused this message (recipient, size...); the session is fine.
+                    raise
+                self.close()
+                if attempt:
+                    raise
+            except OSError:
+                # The socket died under an idle session; reconnect once.
+                self.close()
+                if attempt:
+                    raise
+            else:
+                self._last_used = time.monotonic()
+                return
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()
 
-        return True
-    except Exception:
-        return False
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
 
 
 def format_ticket_email(
@@ -1,13 +1,12 @@
-import json
 import os
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
+from requests import RequestException
 from sqlalchemy import select
 
 from app.config.database import get_session
 from app.model.models import Booking
+from app.services.gateway_client import esewa_client
 
 
 def _esewa_config() -> tuple[str, str, str] | tuple[None, None, None]:
@@ -36,29 +35,24 @@ def _build_verify_query(ref_id: str, amount: float | None, product_id: str | Non
 
 
 def _fetch_verify_payload(url: str, merchant_id: str, merchant_secret: str) -> tuple[dict | list | None, str | None]:
-    request = Request(
-        url,
-        method="GET",
-        headers={
-            "merchantId": merchant_id,
-            "merchantSecret": merchant_secret,
-            "Content-Type": "application/json",
-        },
-    )
-
     try:
-        with urlopen(request, timeout=15) as response:
-            raw_body = response.read().decode("utf-8")
-    except HTTPError:
-        return None, "verification_failed"
-    except URLError:
+        response = esewa_client.get(
+            url,
+            headers={
+                "merchantId": merchant_id,
+                "merchantSecret": merchant_secret,
+                "Content-Type": "application/json",
+            },
+            idempotent=True,
+        )
+    except RequestException:
         return None, "network"
-    except Exception:
+    if response.status_code >= 400:
         return None, "verification_failed"
 
     try:
-        return json.loads(raw_body), None
-    except json.JSONDecodeError:
+        return response.json(), None
+    except ValueError:
         return None, "invalid_response"
 
 
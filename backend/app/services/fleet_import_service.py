@@ -0,0 +1,213 @@
+"""Bulk fleet import from a CSV or JSON file.
+
+Every row is validated before anything is written. Routes are resolved with one
+query, and buses, schedules and seat grids are inserted with batched executemany
+statements in a single transaction, so an import either lands completely or not at all.
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import time
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+
+from app.config.database import get_session
+from app.model.models import Bus, BusSchedule, BusSeat, Route, User
+from app.model.schemas import AdminCreateBusInput
+from app.services.bus_service import _build_layout_seats, _default_layout_cols
+
+# Keep a single import bounded; larger fleets can be split into several files.
+MAX_IMPORT_ROWS = 5000
+
+
+def parse_fleet_file(content: bytes | str, filename: str | None = None) -> tuple[list[dict] | None, str | None]:
+    """Turn CSV or JSON content into raw row dicts. JSON may be a list or {"buses": [...]}."""
+    text = content.decode("utf-8-sig") if isinstance(content, bytes) else content
+    stripped = text.lstrip()
+    is_json = (filename or "").lower().endswith(".json") or stripped.startswith(("[", "{"))
+
+    if is_json:
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as error:
+            return None, f"Invalid JSON: {error.msg} (line {error.lineno})"
+        if isinstance(payload, dict):
+            payload = payload.get("buses")
+        if not isinstance(payload, list) or not all(isinstance(item, dict) for item in payload):
+            return None, "JSON fleet file must be a list of bus objects or {\"buses\": [...]}"
+        rows = payload
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            return None, "CSV fleet file needs a header row"
+        # Empty CSV cells fall back to field defaults instead of failing validation.
+        rows = [
+            {key.strip(): value.strip() for key, value in row.items() if key and value not in (None, "")}
+            for row in reader
+        ]
+
+    if not rows:
+        return None, "Fleet file has no rows"
+    if len(rows) > MAX_IMPORT_ROWS:
+        return None, f"Fleet file has {len(rows)} rows; the limit is {MAX_IMPORT_ROWS}"
+    return rows, None
+
+
+def _validate_rows(rows: list[dict]) -> tuple[list[AdminCreateBusInput], list[dict]]:
+    valid: list[AdminCreateBusInput] = []
+    errors: list[dict] = []
+    for index, row in enumerate(rows, start=1):
+        try:
+            valid.append(AdminCreateBusInput.model_validate(row))
+        except ValidationError as error:
+            errors.append(
+                {
+                    "row": index,
+                    "errors": [
+                        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+                        for item in error.errors()
+                    ],
+                }
+            )
+    return valid, errors
+
+
+def _check_references(db, items: list[AdminCreateBusInput]) -> list[dict]:
+    vendor_ids = {item.vendor_id for item in items if item.vendor_id is not None}
+    if not vendor_ids:
+        return []
+
+    known = set(
+        db.execute(
+            select(User.user_id).where(User.user_id.in_(vendor_ids), User.role == "vendor")
+        ).scalars()
+    )
+    return [
+        {"row": index, "errors": [f"vendor_id: vendor {item.vendor_id} not found"]}
+        for index, item in enumerate(items, start=1)
+        if item.vendor_id is not None and item.vendor_id not in known
+    ]
+
+
+def _resolve_routes(db, items: list[AdminCreateBusInput]) -> tuple[dict[tuple[str, str], int], int]:
+    # First fare seen for a new city pair becomes its base price, same as create_bus_admin.
+    wanted: dict[tuple[str, str], float] = {}
+    for item in items:
+        wanted.setdefault((item.from_city, item.to_city), item.price)
+
+    existing = db.execute(
+        select(Route).where(
+            or_(*[(Route.origin == origin) & (Route.destination == destination) for origin, destination in wanted])
+        )
+    ).scalars().all()
+
+    route_ids: dict[tuple[str, str], int] = {}
+    for route in existing:
+        key = (route.origin, route.destination)
+        route_ids.setdefault(key, route.route_id)
+        if route.base_price in (None, 0):
+            route.base_price = wanted[key]
+
+    missing = [key for key in wanted if key not in route_ids]
+    if missing:
+        new_ids = db.scalars(
+            insert(Route).returning(Route.route_id, sort_by_parameter_order=True),
+            [
+                {
+                    "origin": origin,
+                    "destination": destination,
+                    "distance_km": 0,
+                    "estimated_duration_minutes": 0,
+                    "base_price": wanted[(origin, destination)],
+                    "is_active": True,
+                }
+                for origin, destination in missing
+            ],
+        ).all()
+        route_ids.update(zip(missing, new_ids))
+    return route_ids, len(missing)
+
+
+def import_fleet(rows: list[dict], dry_run: bool = False) -> tuple[dict, str | None]:
+    """Validate and insert a fleet. Returns (report, error_key); error_key "rows" means nothing was written."""
+    items, errors = _validate_rows(rows)
+    report = {"rows": len(rows), "buses": 0, "schedules": 0, "seats": 0, "routes_created": 0, "errors": errors}
+    if errors:
+        return report, "rows"
+
+    with get_session() as db:
+        errors = _check_references(db, items)
+        if errors:
+            report["errors"] = errors
+            return report, "rows"
+        if dry_run:
+            return report, None
+
+        route_ids, routes_created = _resolve_routes(db, items)
+
+        layouts = []
+        for item in items:
+            cols = _default_layout_cols(item.bus_type)
+            layouts.append((cols, max(1, math.ceil(item.seat_capacity / cols))))
+
+        bus_ids = db.scalars(
+            insert(Bus).returning(Bus.bus_id, sort_by_parameter_order=True),
+            [
+                {
+                    "bus_number": item.bus_name,
+                    "bus_type": item.bus_type,
+                    "total_seats": item.seat_capacity,
+                    "seat_layout_rows": rows_count,
+                    "seat_layout_cols": cols,
+                    "is_active": True,
+                    "vendor_id": item.vendor_id,
+                }
+                for item, (cols, rows_count) in zip(items, layouts)
+            ],
+        ).all()
+
+        schedule_rows = [
+            {
+                "bus_id": bus_id,
+                "route_id": route_ids[(item.from_city, item.to_city)],
+                "departure_time": time(0, 0),
+                "arrival_time": time(0, 0),
+                "price": item.price,
+                "is_active": True,
+            }
+            for item, bus_id in zip(items, bus_ids)
+        ]
+        db.execute(insert(BusSchedule), schedule_rows)
+
+        seat_rows = [
+            {
+                "bus_id": bus_id,
+                "seat_label": seat["seat_label"],
+                "row_index": seat["row_index"],
+                "col_index": seat["col_index"],
+                "is_active": seat["is_active"],
+                "is_blocked": bool(seat.get("is_blocked", False)),
+                "block_reason": seat.get("block_reason"),
+            }
+            for item, bus_id, (cols, rows_count) in zip(items, bus_ids, layouts)
+            for seat in _build_layout_seats(
+                seat_layout_rows=rows_count,
+                seat_layout_cols=cols,
+                active_limit=item.seat_capacity,
+            )
+        ]
+        db.execute(insert(BusSeat), seat_rows)
+
+        db.commit()
+
+        report.update(
+            buses=len(bus_ids),
+            schedules=len(schedule_rows),
+            seats=len(seat_rows),
+            routes_created=routes_created,
+            bus_ids=list(bus_ids),
+        )
+        return report, None
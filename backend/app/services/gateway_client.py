@@ -0,0 +1,248 @@
+"""Shared HTTP client for payment gateways (Khalti, eSewa).
+
+One keep-alive connection pool per gateway instead of a fresh connection per call,
+a per-gateway latency budget that caps the total time of a call including retries,
+retry with exponential backoff, and a circuit breaker. After
+GATEWAY_BREAKER_FAILURES consecutive failures the breaker opens and calls fail
+immediately for GATEWAY_BREAKER_COOLDOWN_SECONDS, then one trial call decides
+whether it closes again. A gateway outage therefore costs milliseconds per request
+instead of a blocked worker thread.
+
+Errors subclass ``requests.RequestException`` so existing ``except RequestException``
+handlers keep mapping them to "network".
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GATEWAY_CONNECT_TIMEOUT_SECONDS", "3"))
+GATEWAY_RETRIES = int(os.getenv("GATEWAY_RETRIES", "2"))
+GATEWAY_BACKOFF_SECONDS = float(os.getenv("GATEWAY_BACKOFF_SECONDS", "0.25"))
+GATEWAY_BREAKER_FAILURES = int(os.getenv("GATEWAY_BREAKER_FAILURES", "5"))
+GATEWAY_BREAKER_COOLDOWN_SECONDS = float(os.getenv("GATEWAY_BREAKER_COOLDOWN_SECONDS", "30"))
+GATEWAY_POOL_SIZE = int(os.getenv("GATEWAY_POOL_SIZE", "20"))
+
+RETRYABLE_STATUS = {502, 503, 504}
+# Failures where the request never reached the gateway.
+NOT_SENT_ERRORS = (requests.ConnectionError,)
+
+
+class GatewayUnavailable(RequestException):
+    """Circuit breaker is open; the gateway was not called."""
+
+
+class GatewayTimeout(RequestException):
+    """The call used up its latency budget."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, cooldown_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Gateway %s recovered; circuit closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            reopen = self._trial_in_flight
+            self._trial_in_flight = False
+            if reopen or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                logger.warning("Gateway %s degraded after %s failure(s); circuit open", self.name, self._failures)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class GatewayClient:
+    def __init__(self, name: str, budget_seconds: float):
+        self.name = name
+        self.budget_seconds = budget_seconds
+        self.breaker = CircuitBreaker(name, GATEWAY_BREAKER_FAILURES, GATEWAY_BREAKER_COOLDOWN_SECONDS)
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                # Retries are ours (budget-aware); the adapter only pools connections.
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GATEWAY_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _attempt_timeout(self, deadline: float) -> tuple[float, float] | None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0.05:
+            return None
+        return min(GATEWAY_CONNECT_TIMEOUT_SECONDS, remaining), remaining
+
+    def _backoff(self, attempt: int, deadline: float) -> float | None:
+        delay = GATEWAY_BACKOFF_SECONDS * (2**attempt) * random.uniform(0.5, 1.0)
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _should_retry(self, error: Exception | None, status_code: int | None, idempotent: bool) -> bool:
+        if isinstance(error, NOT_SENT_ERRORS):
+            # Safe to resend even for initiate calls.
+            return True
+        if not idempotent:
+            return False
+        return error is not None or status_code in RETRYABLE_STATUS
+
+    def _record(self, started: float, ok: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.calls += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            if not ok:
+                self.failures += 1
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _count_retry(self) -> None:
+        with self._stats_lock:
+            self.retries += 1
+
+    def _send(self, method: str, url: str, idempotent: bool, kwargs: dict) -> requests.Response:
+        deadline = time.monotonic() + self.budget_seconds
+        attempt = 0
+        while True:
+            timeout = self._attempt_timeout(deadline)
+            if timeout is None:
+                raise GatewayTimeout(f"{self.name} latency budget of {self.budget_seconds}s used up")
+            error, response = None, None
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except RequestException as exc:
+                error = exc
+
+            status_code = response.status_code if response is not None else None
+            failed = error is not None or (status_code is not None and status_code >= 500)
+            delay = self._backoff(attempt, deadline) if attempt < GATEWAY_RETRIES else None
+            if failed and delay is not None and self._should_retry(error, status_code, idempotent):
+                attempt += 1
+                self._count_retry()
+                time.sleep(delay)
+                continue
+
+            if error is not None:
+                raise error
+            return response
+
+    def request(self, method: str, url: str, *, idempotent: bool = False, **kwargs) -> requests.Response:
+        """Send a request within the latency budget. ``idempotent`` also retries timeouts and 502/503/504."""
+        if not self.breaker.allow():
+            raise GatewayUnavailable(f"{self.name} circuit open")
+
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = self._send(method, url, idempotent, kwargs)
+            ok = response.status_code < 500
+            return response
+        finally:
+            # Any way out that is not a good response counts as a failure, so a
+            # half-open trial always settles the breaker one way or the other.
+            self._record(started, ok=ok)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            return {
+                "budget_seconds": self.budget_seconds,
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "breaker": self.breaker.snapshot(),
+            }
+
+
+khalti_client = GatewayClient("khalti", float(os.getenv("KHALTI_TIMEOUT_SECONDS", "8")))
+esewa_client = GatewayClient("esewa", float(os.getenv("ESEWA_TIMEOUT_SECONDS", "8")))
+
+_clients = (khalti_client, esewa_client)
+
+
+def get_gateway_stats() -> dict:
+    return {client.name: client.snapshot() for client in _clients}
+
+
+def close_gateway_clients() -> None:
+    for client in _clients:
+        client.close()
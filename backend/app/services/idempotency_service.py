@@ -0,0 +1,124 @@
+"""Storage for Idempotency-Key requests.
+
+A key is claimed by inserting an ``in_progress`` row (unique on scope + key), so of
+two concurrent duplicates only one runs the handler. The finished response is saved
+on the same row and replayed until it expires.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config.database import get_session
+from app.model.models import IdempotencyRecord
+
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+# An in_progress row older than this is treated as abandoned (worker died mid-request).
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def request_fingerprint(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _stored_response(record: IdempotencyRecord) -> dict:
+    return {
+        "status_code": record.response_status,
+        "body": json.loads(record.response_body) if record.response_body else None,
+    }
+
+
+def claim_key(scope: str, key: str, endpoint: str, request_hash: str) -> tuple[str, int | dict | None]:
+    """Claim ``key`` for this request.
+
+    Returns ("claimed", record_id), ("replay", stored_response), ("in_progress", None)
+    or ("mismatch", None) when the key was used for a different request.
+    """
+    now = _now_utc()
+    with get_session() as db:
+        record = IdempotencyRecord(
+            scope=scope,
+            idempotency_key=key,
+            endpoint=endpoint,
+            request_hash=request_hash,
+            state="in_progress",
+            locked_at=now,
+            created_at=now,
+            expires_at=now + timedelta(hours=IDEMPOTENCY_TTL_HOURS),
+        )
+        db.add(record)
+        try:
+            db.commit()
+            return "claimed", record.id
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.execute(
+            select(IdempotencyRecord).where(
+                IdempotencyRecord.scope == scope,
+                IdempotencyRecord.idempotency_key == key,
+            )
+        ).scalar_one_or_none()
+        if existing is None:
+            # Deleted between our insert and select; let the caller try again.
+            return "in_progress", None
+
+        if existing.expires_at < now:
+            db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id == existing.id))
+            db.commit()
+            return claim_key(scope, key, endpoint, request_hash)
+        if existing.endpoint != endpoint or existing.request_hash != request_hash:
+            return "mismatch", None
+        if existing.state == "completed":
+            return "replay", _stored_response(existing)
+
+        stale_before = now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+        taken_over = db.execute(
+            update(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.id == existing.id,
+                IdempotencyRecord.state == "in_progress",
+                IdempotencyRecord.locked_at < stale_before,
+            )
+            .values(locked_at=now)
+        ).rowcount
+        db.commit()
+        if taken_over:
+            return "claimed", existing.id
+        return "in_progress", None
+
+
+def save_response(record_id: int, status_code: int, body=None) -> None:
+    with get_session() as db:
+        db.execute(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.id == record_id)
+            .values(
+                state="completed",
+                response_status=status_code,
+                response_body=json.dumps(body) if body is not None else None,
+            )
+        )
+        db.commit()
+
+
+def release_key(record_id: int) -> None:
+    """Forget a claim whose request failed transiently, so a retry runs again."""
+    with get_session() as db:
+        db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id == record_id))
+        db.commit()
+
+
+def purge_expired_records() -> int:
+    with get_session() as db:
+        purged = db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < _now_utc())).rowcount
+        db.commit()
+        return purged
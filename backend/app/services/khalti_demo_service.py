@@ -2,9 +2,10 @@ import logging
 import os
 import uuid
 
-import requests
 from requests import RequestException
 
+from app.services.gateway_client import khalti_client
+
 logger = logging.getLogger(__name__)
 
 KHALTI_INITIATE_URL = "https://dev.khalti.com/api/v2/epayment/initiate/"
@@ -38,7 +39,7 @@ def initiate_khalti_demo(amount_paisa: int = 1000):
     }
 
     try:
-        response = requests.post(KHALTI_INITIATE_URL, json=payload, headers=_headers(), timeout=20)
+        response = khalti_client.post(KHALTI_INITIATE_URL, json=payload, headers=_headers())
         logger.info("Khalti initiate status=%s body=%s", response.status_code, response.text)
     except RequestException:
         logger.exception("Khalti initiate request failed")
@@ -80,11 +81,11 @@ def verify_khalti_demo(pidx: str):
         return None, "config"
 
     try:
-        response = requests.post(
+        response = khalti_client.post(
             KHALTI_LOOKUP_URL,
             json={"pidx": pidx_value},
             headers=_headers(),
-            timeout=20,
+            idempotent=True,
         )
         logger.info("Khalti lookup status=%s body=%s", response.status_code, response.text)
     except RequestException:
@@ -1,12 +1,11 @@
-import json
 import os
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
+from requests import RequestException
 from sqlalchemy import select
 
 from app.config.database import get_session
 from app.model.models import Booking
+from app.services.gateway_client import khalti_client
 
 
 def _khalti_config() -> tuple[str, str] | tuple[None, None]:
@@ -20,29 +19,24 @@ def _khalti_config() -> tuple[str, str] | tuple[None, None]:
 
 
 def _fetch_lookup_payload(url: str, pidx: str, secret_key: str) -> tuple[dict | None, str | None]:
-    request = Request(
-        url,
-        method="POST",
-        headers={
-            "Authorization": f"Key {secret_key}",
-            "Content-Type": "application/json",
-        },
-        data=json.dumps({"pidx": pidx}).encode("utf-8"),
-    )
-
     try:
-        with urlopen(request, timeout=15) as response:
-            raw_body = response.read().decode("utf-8")
-    except HTTPError:
-        return None, "verification_failed"
-    except URLError:
+        response = khalti_client.post(
+            url,
+            headers={
+                "Authorization": f"Key {secret_key}",
+                "Content-Type": "application/json",
+            },
+            json={"pidx": pidx},
+            idempotent=True,
+        )
+    except RequestException:
         return None, "network"
-    except Exception:
+    if response.status_code >= 400:
         return None, "verification_failed"
 
     try:
-        payload = json.loads(raw_body)
-    except json.JSONDecodeError:
+        payload = response.json()
+    except ValueError:
         return None, "invalid_response"
 
     if not isinstance(payload, dict):
@@ -154,25 +148,22 @@ def initiate_khalti_payment(
     }
 
     # Make initiation request to Khalti
-    request_obj = Request(
-        khalti_initiate_url,
-        method="POST",
-        headers={
-            "Authorization": f"Key {secret_key}",
-            "Content-Type": "application/json",
-        },
-        data=json.dumps(initiation_payload).encode("utf-8"),
-    )
-
     try:
-        with urlopen(request_obj, timeout=15) as response:
-            response_body = response.read().decode("utf-8")
-        response_data = json.loads(response_body)
-    except HTTPError:
-        return None, "verification_failed"
-    except URLError:
+        response = khalti_client.post(
+            khalti_initiate_url,
+            headers={
+                "Authorization": f"Key {secret_key}",
+                "Content-Type": "application/json",
+            },
+            json=initiation_payload,
+        )
+    except RequestException:
         return None, "network"
-    except Exception:
+    if response.status_code >= 400:
+        return None, "verification_failed"
+    try:
+        response_data = response.json()
+    except ValueError:
         return None, "verification_failed"
 
     # Extract payment URL from Khalti response
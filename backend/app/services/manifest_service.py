@@ -0,0 +1,204 @@
+"""Passenger manifests per trip (schedule + journey date) for conductors and vendors.
+
+One ordered query reads every live booking of the requested trips (archived rows
+too for old dates), joined to its schedule, bus and route, ordered by departure and
+trip. Rows are streamed from the database and grouped one trip at a time: CSV goes
+out trip by trip as it is read, so only one bus worth of passengers is ever held.
+A PDF cannot be laid out incrementally, so its (small) per-seat rows are collected
+and the document, one trip per page, renders in the PDF process pool.
+"""
+
+import csv
+import io
+import re
+from datetime import date, time
+
+from sqlalchemy import func, select
+
+from app.model.models import Bus, BusSchedule, Route
+from app.services.archive_service import booking_history_entity
+from app.services.booking_service import _parse_seat_labels, _seat_occupancy_status
+from app.services.pdf_render_service import render_pdf_async
+
+MANIFEST_FETCH_SIZE = 500
+
+CSV_COLUMNS = [
+    "schedule_id",
+    "departure_time",
+    "route",
+    "bus_number",
+    "seat",
+    "seat_status",
+    "passenger_name",
+    "passenger_phone",
+    "passenger_email",
+    "pickup_point",
+    "drop_point",
+    "booking_reference",
+    "seats_in_booking",
+    "booking_status",
+    "payment_status",
+    "payment_method",
+    "counter_booking",
+]
+
+_PHONE = re.compile(r"[+\-]?[\d\s\-]+")
+
+
+def _manifest_query(
+    journey_date: date,
+    schedule_ids: list[int] | None = None,
+    origin: str | None = None,
+    vendor_id: int | None = None,
+    departs_after: time | None = None,
+    departs_before: time | None = None,
+):
+    entity = booking_history_entity(journey_date)
+    query = (
+        select(
+            BusSchedule.schedule_id,
+            BusSchedule.departure_time,
+            BusSchedule.arrival_time,
+            Bus.bus_number,
+            Route.origin,
+            Route.destination,
+            entity.booking_reference,
+            entity.passenger_name,
+            entity.passenger_phone,
+            entity.passenger_email,
+            entity.pickup_point,
+            entity.drop_point,
+            entity.special_requests,
+            entity.number_of_seats,
+            entity.booking_status,
+            entity.payment_status,
+            entity.payment_method,
+            entity.is_counter_booking,
+        )
+        .join(BusSchedule, BusSchedule.schedule_id == entity.schedule_id)
+        .outerjoin(Bus, Bus.bus_id == BusSchedule.bus_id)
+        .outerjoin(Route, Route.route_id == BusSchedule.route_id)
+        .where(
+            entity.journey_date == journey_date,
+            # Same rule as the seat map: cancelled bookings hold no seats.
+            func.coalesce(entity.booking_status, "") != "cancelled",
+        )
+        .order_by(BusSchedule.departure_time, BusSchedule.schedule_id, entity.booking_id)
+    )
+    if schedule_ids:
+        query = query.where(entity.schedule_id.in_(schedule_ids))
+    if origin:
+        query = query.where(func.lower(Route.origin) == origin.strip().lower())
+    if vendor_id is not None:
+        query = query.where(Bus.vendor_id == vendor_id)
+    if departs_after is not None:
+        query = query.where(BusSchedule.departure_time >= departs_after)
+    if departs_before is not None:
+        query = query.where(BusSchedule.departure_time <= departs_before)
+    return query
+
+
+def _seat_sort_key(label: str) -> tuple:
+    # Natural order (A2 before A10); bookings without seat labels go last.
+    if not label:
+        return ((2, ""),)
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in re.findall(r"\d+|\D+", label))
+
+
+def _trip_header(row) -> dict:
+    route = f"{row.origin or 'N/A'} - {row.destination or 'N/A'}"
+    return {
+        "schedule_id": row.schedule_id,
+        "bus_number": row.bus_number or "N/A",
+        "route": route,
+        "departure_time": row.departure_time.strftime("%H:%M"),
+        "arrival_time": row.arrival_time.strftime("%H:%M"),
+    }
+
+
+def _trip_seats(rows) -> list[tuple[str, object]]:
+    """(seat label, booking row) per booked seat of one trip, in seat order."""
+    seats = []
+    for row in rows:
+        labels = _parse_seat_labels(row.special_requests)
+        seats.extend((label, row) for label in labels or [""])
+    seats.sort(key=lambda item: _seat_sort_key(item[0]))
+    return seats
+
+
+async def _manifest_trips(db, **filters):
+    """Yield (trip header, seats) one trip at a time from a single streamed query."""
+    result = await db.stream(_manifest_query(**filters).execution_options(yield_per=MANIFEST_FETCH_SIZE))
+    trip_rows = []
+    async for row in result:
+        if trip_rows and row.schedule_id != trip_rows[0].schedule_id:
+            yield _trip_header(trip_rows[0]), _trip_seats(trip_rows)
+            trip_rows = []
+        trip_rows.append(row)
+    if trip_rows:
+        yield _trip_header(trip_rows[0]), _trip_seats(trip_rows)
+
+
+def _csv_safe(value) -> str:
+    # Passenger-entered text must not run as a spreadsheet formula; phone numbers stay as typed.
+    text = "" if value is None else str(value)
+    if text[:1] in ("=", "+", "-", "@") and not _PHONE.fullmatch(text):
+        return f"'{text}"
+    return text
+
+
+async def stream_manifest_csv(db, journey_date: date, **filters):
+    """Yield the manifest as UTF-8 CSV (with BOM, for Excel), one chunk per trip."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    async for trip, seats in _manifest_trips(db, journey_date=journey_date, **filters):
+        buffer.seek(0)
+        buffer.truncate()
+        for label, row in seats:
+            writer.writerow(
+                [
+                    trip["schedule_id"],
+                    trip["departure_time"],
+                    trip["route"],
+                    trip["bus_number"],
+                    label,
+                    _seat_occupancy_status(row),
+                    _csv_safe(row.passenger_name),
+                    _csv_safe(row.passenger_phone),
+                    _csv_safe(row.passenger_email),
+                    _csv_safe(row.pickup_point),
+                    _csv_safe(row.drop_point),
+                    row.booking_reference,
+                    row.number_of_seats,
+                    row.booking_status or "pending",
+                    row.payment_status or "unpaid",
+                    row.payment_method or "",
+                    "yes" if row.is_counter_booking else "no",
+                ]
+            )
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def render_manifest_pdf(db, journey_date: date, **filters) -> bytes:
+    """Render the manifest PDF (one trip per page) in the PDF pool. Raises PdfRenderBusy when it is full."""
+    trips = []
+    async for trip, seats in _manifest_trips(db, journey_date=journey_date, **filters):
+        trip["seat_count"] = sum(1 if label else row.number_of_seats for label, row in seats)
+        trip["passengers"] = [
+            [
+                label or "-",
+                row.passenger_name,
+                row.passenger_phone,
+                row.pickup_point or "",
+                row.drop_point or "",
+                row.booking_reference,
+                row.payment_status or "unpaid",
+            ]
+            for label, row in seats
+        ]
+        trips.append(trip)
+    return await render_pdf_async("manifest_pdf", {"journey_date": str(journey_date), "trips": trips})
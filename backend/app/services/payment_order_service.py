@@ -6,20 +6,21 @@ import hashlib
 import hmac
 import logging
 from datetime import date, datetime, timedelta, timezone
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode, quote
-from urllib.request import Request, urlopen
-import requests
 from requests import RequestException
 
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
 
 from app.config.database import get_session
 from app.model.models import Booking, Bus, BusSchedule
 from app.model.payment_order import PaymentOrder
-from app.services.booking_service import confirm_booking_payment, create_booking
+from app.services.booking_service import create_paid_booking
+from app.services.gateway_client import esewa_client, khalti_client
 
 PAYMENT_ORDER_TTL_MINUTES = int(os.getenv("PAYMENT_ORDER_TTL_MINUTES", "20"))
+# Orders that reached a gateway are left to reconciliation; the sweeper only expires
+# them once they are this far past expires_at (e.g. while the gateway is unreachable).
+PAYMENT_RECONCILE_WINDOW_HOURS = float(os.getenv("PAYMENT_RECONCILE_WINDOW_HOURS", "24"))
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
 KHALTI_BASE_URL = os.getenv("KHALTI_VERIFY_BASE_URL", "https://dev.khalti.com/api/v2").rstrip("/")
 KHALTI_SECRET_KEY = os.getenv("KHALTI_SECRET_KEY", "").strip()
@@ -153,21 +154,37 @@ def _ensure_seats_available(db, bus_id: int, trip_id: int, journey_date: date, s
     return None
 
 
-def _expire_stale_pending_orders(db, user_id: int | None = None):
-    now = _now_utc()
-    query = select(PaymentOrder).where(
-        PaymentOrder.status == "pending",
-        PaymentOrder.expires_at.is_not(None),
-        PaymentOrder.expires_at < now,
+def _order_expired(order: PaymentOrder, now: datetime | None = None) -> bool:
+    # Read-time check; the sweeper job writes the "failed/expired" state later.
+    return order.status == "pending" and order.expires_at is not None and order.expires_at < (now or _now_utc())
+
+
+def _expire_stale_orders_statement(now: datetime):
+    return (
+        update(PaymentOrder)
+        .where(
+            PaymentOrder.status == "pending",
+            PaymentOrder.expires_at.is_not(None),
+            PaymentOrder.expires_at < now,
+            or_(
+                PaymentOrder.pidx.is_(None),
+                PaymentOrder.expires_at < now - timedelta(hours=PAYMENT_RECONCILE_WINDOW_HOURS),
+            ),
+        )
+        .values(status="failed", failure_reason="expired", updated_at=now)
     )
-    if user_id is not None:
-        query = query.where(PaymentOrder.user_id == user_id)
 
-    stale = db.execute(query).scalars().all()
-    for item in stale:
-        item.status = "failed"
-        item.failure_reason = "expired"
-        item.updated_at = now
+
+def expire_stale_payment_orders() -> int:
+    """Mark pending orders past expires_at as failed/expired in one UPDATE (ix_payment_orders_status_expires).
+
+    Orders with a gateway reference may have been paid after all; reconciliation checks
+    those with the gateway first and they only fall through to here after the window.
+    """
+    with get_session() as db:
+        expired = db.execute(_expire_stale_orders_statement(_now_utc())).rowcount
+        db.commit()
+        return expired
 
 
 def create_payment_order(
@@ -186,8 +203,6 @@ def create_payment_order(
     normalized_labels = _seat_list(seats_text)
 
     with get_session() as db:
-        _expire_stale_pending_orders(db, user_id=user_id)
-
         schedule, calculated_amount, err = _validate_trip_and_amount(db, trip_id, normalized_labels, amount)
         if err:
             return None, err
@@ -229,28 +244,32 @@ def create_payment_order(
         }, None
 
 
+def _pending_order_for_user(db, order_id: int, user_id: int):
+    order = db.execute(
+        select(PaymentOrder).where(PaymentOrder.id == order_id, PaymentOrder.user_id == user_id)
+    ).scalar_one_or_none()
+    if order is None:
+        return None, "order"
+
+    if order.status != "pending":
+        return None, "status"
+
+    if _order_expired(order):
+        return None, "expired"
+    return order, None
+
+
 def initiate_khalti_for_order(order_id: int, user_id: int):
-    if not KHALTI_SECRET_KEY:
+    if not KHALTI_SECRET_KEY and not PAYMENT_MOCK_MODE:
         return None, "config"
 
     try:
+        # The gateway call runs between two short sessions, so no transaction (or
+        # SQLite writer lock) is held while waiting on Khalti.
         with get_session() as db:
-            order = db.execute(
-                select(PaymentOrder).where(PaymentOrder.id == order_id, PaymentOrder.user_id == user_id)
-            ).scalar_one_or_none()
-            if order is None:
-                return None, "order"
-
-            if order.status != "pending":
-                return None, "status"
-
-            now = _now_utc()
-            if order.expires_at and order.expires_at < now:
-                order.status = "failed"
-                order.failure_reason = "expired"
-                order.updated_at = now
-                db.commit()
-                return None, "expired"
+            order, error_key = _pending_order_for_user(db, order_id, user_id)
+            if error_key:
+                return None, error_key
 
             purchase_order_id = f"TN-ORDER-{order.id}"
             return_url = f"{FRONTEND_URL}/khalti-success?order_id={order.id}"
@@ -268,34 +287,55 @@ def initiate_khalti_for_order(order_id: int, user_id: int):
                 },
             }
 
-            try:
-                response = requests.post(
-                    f"{KHALTI_BASE_URL}/epayment/initiate/",
-                    headers={
-                        "Authorization": f"Key {KHALTI_SECRET_KEY}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                    timeout=20,
-                )
-                status_code = int(response.status_code)
-                response_data = response.json() if response.text else {}
-            except RequestException:
-                return None, "network"
-            except ValueError:
-                return None, "invalid_response"
-
-            if status_code in {401, 403}:
-                    return None, "auth"
-            if status_code == 400:
-                    return None, "invalid_request"
-            if status_code >= 500:
-                return None, "gateway"
-
-            payment_url = response_data.get("payment_url")
-            pidx = response_data.get("pidx")
-            if not payment_url or not pidx:
-                return None, "invalid_response"
+            if PAYMENT_MOCK_MODE:
+                # Skip the gateway: "pay" instantly and land on the normal return page.
+                order.pidx = f"MOCK-{order.id}-{int(_now_utc().timestamp())}"
+                order.updated_at = _now_utc()
+                db.commit()
+                return {
+                    "order_id": order.id,
+                    "status": order.status,
+                    "pidx": order.pidx,
+                    "payment_url": f"{return_url}&pidx={order.pidx}&status=Completed",
+                }, None
+
+        try:
+            response = khalti_client.post(
+                f"{KHALTI_BASE_URL}/epayment/initiate/",
+                headers={
+                    "Authorization": f"Key {KHALTI_SECRET_KEY}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+            )
+            status_code = int(response.status_code)
+            response_data = response.json() if response.text else {}
+        except RequestException:
+            return None, "network"
+        except ValueError:
+            return None, "invalid_response"
+
+        if status_code in {401, 403}:
+                return None, "auth"
+        if status_code == 400:
+                return None, "invalid_request"
+        if status_code >= 500:
+            return None, "gateway"
+
+        payment_url = response_data.get("payment_url")
+        pidx = response_data.get("pidx")
+        if not payment_url or not pidx:
+            return None, "invalid_response"
+
+        with get_session() as db:
+            # Re-read under the write lock: the order may have expired or been paid meanwhile.
+            order = db.execute(
+                select(PaymentOrder).where(PaymentOrder.id == order_id).with_for_update()
+            ).scalar_one_or_none()
+            if order is None:
+                return None, "order"
+            if order.status != "pending":
+                return None, "status"
 
             order.pidx = str(pidx)
             order.updated_at = _now_utc()
@@ -346,11 +386,7 @@ def initiate_esewa_for_order(order_id: int, user_id: int):
                 return None, "status"
 
             now = _now_utc()
-            if order.expires_at and order.expires_at < now:
-                order.status = "failed"
-                order.failure_reason = "expired"
-                order.updated_at = now
-                db.commit()
+            if _order_expired(order, now):
                 return None, "expired"
 
             transaction_uuid = f"TN-{order.id}-{int(now.timestamp())}"
@@ -430,15 +466,15 @@ def _fetch_esewa_status(transaction_uuid: str, amount: float):
     )
     url = f"{ESEWA_STATUS_CHECK_BASE_URL}/api/epay/transaction/status/?{query}"
 
-    request_obj = Request(url, method="GET")
     try:
-        with urlopen(request_obj, timeout=20) as response:
-            return json.loads(response.read().decode("utf-8")), None
-    except HTTPError:
-        return None, "gateway"
-    except URLError:
+        response = esewa_client.get(url, idempotent=True)
+    except RequestException:
         return None, "network"
-    except Exception:
+    if response.status_code >= 400:
+        return None, "gateway"
+    try:
+        return response.json(), None
+    except ValueError:
         return None, "gateway"
 
 
@@ -449,6 +485,81 @@ def _mark_order_failed(db, order: PaymentOrder, failure_reason: str):
     db.commit()
 
 
+def _fail_unpaid_order(order_id: int, failure_reason: str) -> None:
+    # Guarded so a stale verdict never overwrites an order a concurrent verify already paid.
+    with get_session() as db:
+        db.execute(
+            update(PaymentOrder)
+            .where(PaymentOrder.id == order_id, PaymentOrder.status != "paid")
+            .values(status="failed", failure_reason=failure_reason[:200], updated_at=_now_utc())
+        )
+        db.commit()
+
+
+def _lock_order_for_finalize(db, order_id: int):
+    # FOR UPDATE on Postgres/MySQL. SQLite drops it from the SQL; in performance mode
+    # this select opens the session's BEGIN IMMEDIATE and takes the single writer lock.
+    return db.execute(
+        select(PaymentOrder).where(PaymentOrder.id == order_id).with_for_update()
+    ).scalar_one_or_none()
+
+
+def finalize_paid_order(order_id: int, payment_method: str, reference: str):
+    """Turn a gateway-verified order into a confirmed booking in one transaction.
+
+    The order row is locked first, so concurrent verifies of the same order queue up
+    and the later ones just see it paid. The trip's schedule row is locked too, which
+    serializes finalizations per trip so two orders cannot both take the same seat.
+    The booking, its payment confirmation, the paid order and the queued ticket email
+    commit together; the outbox worker sends the email after that.
+    """
+    with get_session() as db:
+        order = _lock_order_for_finalize(db, order_id)
+        if order is None:
+            return None, "order"
+
+        paid_response = _get_paid_order_response(db, order)
+        if paid_response is not None:
+            return paid_response, None
+
+        if order.status == "failed":
+            return None, "failed"
+
+        schedule = db.execute(
+            select(BusSchedule).where(BusSchedule.schedule_id == order.trip_id).with_for_update()
+        ).scalar_one_or_none()
+        if schedule is None:
+            _mark_order_failed(db, order, "trip_not_found")
+            return None, "trip"
+
+        seat_labels = _seat_list(order.seats)
+        seat_err = _ensure_seats_available(db, schedule.bus_id, order.trip_id, order.journey_date, seat_labels)
+        if seat_err:
+            _mark_order_failed(db, order, seat_err)
+            return None, seat_err
+
+        booking, booking_err = create_paid_booking(
+            db, order.user_id, schedule.bus_id, order.journey_date, seat_labels, payment_method
+        )
+        if booking_err:
+            _mark_order_failed(db, order, f"booking_error:{booking_err}")
+            return None, booking_err
+
+        order.status = "paid"
+        order.pidx = reference
+        order.booking_id = booking.booking_id
+        order.failure_reason = None
+        order.updated_at = _now_utc()
+        result = {
+            "status": "paid",
+            "order_id": order.id,
+            "booking_id": booking.booking_id,
+            "booking_reference": booking.booking_reference,
+        }
+        db.commit()
+    return result, None
+
+
 def _get_paid_order_response(db, order: PaymentOrder):
     if order.status != "paid" or not order.booking_id:
         return None
@@ -465,12 +576,12 @@ def _get_paid_order_response(db, order: PaymentOrder):
     }
 
 
-def _validate_esewa_payload(db, order: PaymentOrder, transaction_uuid: str, verify_payload: dict):
+def _validate_esewa_payload(order: PaymentOrder, transaction_uuid: str, verify_payload: dict):
     message = _esewa_signed_message_from_payload(verify_payload)
     sent_signature = str(verify_payload.get("signature") or "")
     generated_signature = _esewa_signature(message, ESEWA_MERCHANT_SECRET)
     if not sent_signature or not hmac.compare_digest(sent_signature, generated_signature):
-        _mark_order_failed(db, order, "signature_mismatch")
+        _fail_unpaid_order(order.id, "signature_mismatch")
         return "signature"
 
     status_value = str(verify_payload.get("status") or "").upper()
@@ -479,60 +590,43 @@ def _validate_esewa_payload(db, order: PaymentOrder, transaction_uuid: str, veri
     payload_amount = round(float(verify_payload.get("total_amount") or 0), 2)
 
     if payload_uuid and payload_uuid != transaction_uuid:
-        _mark_order_failed(db, order, "uuid_mismatch")
+        _fail_unpaid_order(order.id, "uuid_mismatch")
         return "transaction_uuid"
 
     if payload_code and payload_code != ESEWA_MERCHANT_ID:
-        _mark_order_failed(db, order, "product_code_mismatch")
+        _fail_unpaid_order(order.id, "product_code_mismatch")
         return "product_code"
 
     if payload_amount != round(float(order.amount), 2):
-        _mark_order_failed(db, order, "amount_mismatch")
+        _fail_unpaid_order(order.id, "amount_mismatch")
         return "amount"
 
     if status_value != "COMPLETE":
-        _mark_order_failed(db, order, f"esewa_status:{status_value or 'UNKNOWN'}")
+        _fail_unpaid_order(order.id, f"esewa_status:{status_value or 'UNKNOWN'}")
         return "not_complete"
 
     return None
 
 
-def _verify_esewa_order_completion(db, order: PaymentOrder, transaction_uuid: str, data: str | None):
+def _verify_esewa_order_completion(order: PaymentOrder, transaction_uuid: str, data: str | None):
     if data:
         verify_payload, parse_error = _decode_esewa_data(data)
         if parse_error:
             return parse_error
-        return _validate_esewa_payload(db, order, transaction_uuid, verify_payload)
+        return _validate_esewa_payload(order, transaction_uuid, verify_payload)
 
-    status_payload, status_err = _fetch_esewa_status(transaction_uuid, float(order.amount))
+    status_payload, status_err = _esewa_status(transaction_uuid, float(order.amount))
     if status_err:
         return status_err
 
     status_value = str(status_payload.get("status") or "").upper()
     if status_value != "COMPLETE":
-        _mark_order_failed(db, order, f"esewa_status:{status_value or 'UNKNOWN'}")
+        _fail_unpaid_order(order.id, f"esewa_status:{status_value or 'UNKNOWN'}")
         return "not_complete"
 
     return None
 
 
-def _validate_esewa_seat_readiness(db, order: PaymentOrder):
-    seat_labels = _seat_list(order.seats)
-    schedule = db.execute(
-        select(BusSchedule).where(BusSchedule.schedule_id == order.trip_id)
-    ).scalar_one_or_none()
-    if schedule is None:
-        _mark_order_failed(db, order, "trip_not_found")
-        return None, None, "trip"
-
-    seat_err = _ensure_seats_available(db, schedule.bus_id, order.trip_id, order.journey_date, seat_labels)
-    if seat_err:
-        _mark_order_failed(db, order, seat_err)
-        return None, None, seat_err
-
-    return schedule, seat_labels, None
-
-
 def _prepare_esewa_order_context(db, order_id: int):
     order = db.execute(select(PaymentOrder).where(PaymentOrder.id == order_id)).scalar_one_or_none()
     if order is None:
@@ -545,11 +639,6 @@ def _prepare_esewa_order_context(db, order_id: int):
     if order.status == "failed":
         return None, None, None, "failed"
 
-    now = _now_utc()
-    if order.expires_at and order.expires_at < now:
-        _mark_order_failed(db, order, "expired")
-        return None, None, None, "expired"
-
     transaction_uuid = str(order.pidx or "").strip()
     if not transaction_uuid:
         return None, None, None, "transaction_uuid"
@@ -557,35 +646,6 @@ def _prepare_esewa_order_context(db, order_id: int):
     return order, transaction_uuid, None, None
 
 
-def _create_and_confirm_esewa_booking(order_id: int, user_id: int, bus_id: int, journey_date: date, seat_labels: list[str]):
-    booking, booking_err = create_booking(
-        user_id=user_id,
-        bus_id=bus_id,
-        journey_date=str(journey_date),
-        seats=len(seat_labels),
-        seat_labels=seat_labels,
-        payment_method="esewa",
-        is_counter_booking=False,
-    )
-    if booking_err:
-        with get_session() as db:
-            order = db.execute(select(PaymentOrder).where(PaymentOrder.id == order_id)).scalar_one_or_none()
-            if order is not None:
-                _mark_order_failed(db, order, f"booking_error:{booking_err}")
-        return None, booking_err
-
-    confirmed_booking, payment_err = confirm_booking_payment(
-        booking_id=booking["booking_id"],
-        user_id=user_id,
-        payment_method="esewa",
-        pay_later=False,
-    )
-    if payment_err:
-        return None, payment_err
-
-    return confirmed_booking, None
-
-
 def verify_esewa_and_create_booking(order_id: int, data: str | None = None, status: str | None = None):
     if not ESEWA_MERCHANT_ID or not ESEWA_MERCHANT_SECRET:
         return None, "config"
@@ -593,61 +653,38 @@ def verify_esewa_and_create_booking(order_id: int, data: str | None = None, stat
     if (status or "").strip().lower() == "failure":
         return None, "not_complete"
 
-    with get_session() as db:
+    # Read-only: the gateway check below must not hold a write transaction open.
+    with get_session(readonly=True) as db:
         order, transaction_uuid, paid_response, context_err = _prepare_esewa_order_context(db, order_id)
         if paid_response is not None:
             return paid_response, None
         if context_err:
             return None, context_err
 
-        verify_err = _verify_esewa_order_completion(db, order, transaction_uuid, data)
-        if verify_err:
-            return None, verify_err
+    expired = _order_expired(order)
+    verify_err = _verify_esewa_order_completion(order, transaction_uuid, data)
+    if verify_err:
+        # Gateway trouble stays retryable; a declined/unfinished payment after the hold is "expired".
+        return None, "expired" if expired and verify_err not in {"network", "gateway"} else verify_err
 
-        schedule, seat_labels, seat_readiness_err = _validate_esewa_seat_readiness(db, order)
-        if seat_readiness_err:
-            return None, seat_readiness_err
-
-    confirmed_booking, payment_flow_err = _create_and_confirm_esewa_booking(
-        order_id=order_id,
-        user_id=order.user_id,
-        bus_id=schedule.bus_id,
-        journey_date=order.journey_date,
-        seat_labels=seat_labels,
-    )
-    if payment_flow_err:
-        return None, payment_flow_err
-
-    with get_session() as db:
-        order = db.execute(select(PaymentOrder).where(PaymentOrder.id == order_id)).scalar_one_or_none()
-        if order is not None:
-            order.status = "paid"
-            order.booking_id = confirmed_booking["booking_id"]
-            order.failure_reason = None
-            order.updated_at = _now_utc()
-            db.commit()
+    result, finalize_err = finalize_paid_order(order_id, "esewa", transaction_uuid)
+    if finalize_err:
+        return None, finalize_err
 
-    return {
-        "status": "paid",
-        "order_id": order_id,
-        "booking_id": confirmed_booking["booking_id"],
-        "booking_reference": confirmed_booking["booking_reference"],
-        "esewa": {
-            "transaction_uuid": transaction_uuid,
-        },
-    }, None
+    result["esewa"] = {"transaction_uuid": transaction_uuid}
+    return result, None
 
 
 def _lookup_khalti(pidx: str):
     try:
-        response = requests.post(
+        response = khalti_client.post(
             f"{KHALTI_BASE_URL}/epayment/lookup/",
             headers={
                 "Authorization": f"Key {KHALTI_SECRET_KEY}",
                 "Content-Type": "application/json",
             },
             json={"pidx": pidx},
-            timeout=20,
+            idempotent=True,
         )
         status_code = int(response.status_code)
         body = response.json() if response.text else {}
@@ -666,10 +703,15 @@ def _lookup_khalti(pidx: str):
     return body, None
 
 
-def _lookup_khalti_mock(pidx: str, expected_amount: float) -> tuple[dict, None]:
-    status = "Completed"
-    if "FAIL" in pidx.upper():
-        status = "Expired"
+def _mock_payment_completed(reference: str, mock_status: str | None = None) -> bool:
+    if "FAIL" in reference.upper():
+        return False
+    status = (mock_status or PAYMENT_MOCK_DEFAULT_STATUS).strip().lower()
+    return status in {"success", "completed", "complete"}
+
+
+def _lookup_khalti_mock(pidx: str, expected_amount: float, mock_status: str | None = None) -> tuple[dict, None]:
+    status = "Completed" if _mock_payment_completed(pidx, mock_status) else "Expired"
 
     return {
         "status": status,
@@ -679,150 +721,71 @@ def _lookup_khalti_mock(pidx: str, expected_amount: float) -> tuple[dict, None]:
     }, None
 
 
-def verify_khalti_by_pidx_and_create_booking(pidx: str):
-    try:
-        pidx_value = str(pidx or "").strip()
-        if not pidx_value:
-            return None, "pidx"
+def _khalti_lookup(pidx: str, expected_amount: float, mock_status: str | None = None):
+    # PAYMENT_MOCK_MODE: answer in-process, no gateway at all (a local simulator exercises the HTTP path).
+    if PAYMENT_MOCK_MODE:
+        return _lookup_khalti_mock(pidx, expected_amount, mock_status)
+    return _lookup_khalti(pidx)
 
-        with get_session() as db:
-            order = db.execute(select(PaymentOrder).where(PaymentOrder.pidx == pidx_value)).scalar_one_or_none()
-            if order is None:
-                return None, "order"
-            order_id = int(order.id)
 
-        return verify_khalti_and_create_booking(order_id=order_id, pidx=pidx_value)
-    except Exception:
-        logger.exception("Unexpected error during Khalti verify-by-pidx for pidx=%s", pidx)
-        return None, "gateway"
+def _esewa_status(transaction_uuid: str, amount: float):
+    if PAYMENT_MOCK_MODE:
+        status = "COMPLETE" if _mock_payment_completed(transaction_uuid) else "CANCELED"
+        return {"status": status, "transaction_uuid": transaction_uuid, "total_amount": amount, "ref_id": None}, None
+    return _fetch_esewa_status(transaction_uuid, amount)
 
 
-def verify_khalti_and_create_booking(order_id: int, pidx: str | None = None, mock_status: str | None = None):  # NOSONAR - payment verification orchestrator
-    if not KHALTI_SECRET_KEY:
+def verify_khalti_and_create_booking(order_id: int, pidx: str | None = None, mock_status: str | None = None):
+    if not KHALTI_SECRET_KEY and not PAYMENT_MOCK_MODE:
         return None, "config"
 
-    with get_session() as db:
+    # Read-only: the gateway lookup below must not hold a write transaction open.
+    with get_session(readonly=True) as db:
         order = db.execute(select(PaymentOrder).where(PaymentOrder.id == order_id)).scalar_one_or_none()
         if order is None:
             return None, "order"
 
-        if order.status == "paid" and order.booking_id:
-            existing_booking = db.execute(select(Booking).where(Booking.booking_id == order.booking_id)).scalar_one_or_none()
-            if existing_booking is not None:
-                return {
-                    "status": "paid",
-                    "order_id": order.id,
-                    "booking_id": existing_booking.booking_id,
-                    "booking_reference": existing_booking.booking_reference,
-                }, None
+        paid_response = _get_paid_order_response(db, order)
+        if paid_response is not None:
+            return paid_response, None
 
         if order.status == "failed":
             return None, "failed"
 
-        now = _now_utc()
-        if order.expires_at and order.expires_at < now:
-            order.status = "failed"
-            order.failure_reason = "expired"
-            order.updated_at = now
-            db.commit()
-            return None, "expired"
-
-        pidx_value = str(pidx or order.pidx or "").strip()
-        if not pidx_value:
-            return None, "pidx"
+    pidx_value = str(pidx or order.pidx or "").strip()
+    if not pidx_value:
+        return None, "pidx"
 
-        lookup_data, lookup_err = _lookup_khalti(pidx_value)
-        if lookup_err:
-            return None, lookup_err
+    lookup_data, lookup_err = _khalti_lookup(pidx_value, order.amount, mock_status)
+    if lookup_err:
+        return None, lookup_err
 
-        status = str(lookup_data.get("status", "")).lower()
-        total_amount = lookup_data.get("total_amount")
+    status = str(lookup_data.get("status", "")).lower()
+    total_amount = lookup_data.get("total_amount")
 
-        if status != "completed":
-            order.status = "failed"
-            order.failure_reason = f"khalti_status:{status or 'unknown'}"
-            order.updated_at = _now_utc()
-            db.commit()
-            return None, "not_complete"
-
-        expected_paisa = int(round(float(order.amount) * 100))
-        if isinstance(total_amount, (int, float)) and int(total_amount) != expected_paisa:
-            order.status = "failed"
-            order.failure_reason = "amount_mismatch"
-            order.updated_at = _now_utc()
-            db.commit()
-            return None, "amount"
-
-        seat_labels = _seat_list(order.seats)
-        schedule = db.execute(
-            select(BusSchedule).where(BusSchedule.schedule_id == order.trip_id)
-        ).scalar_one_or_none()
-        if schedule is None:
-            order.status = "failed"
-            order.failure_reason = "trip_not_found"
-            order.updated_at = _now_utc()
-            db.commit()
-            return None, "trip"
+    if status != "completed":
+        # A confirmed payment is honoured past the hold; anything else after it is just expired.
+        if _order_expired(order):
+            return None, "expired"
+        _fail_unpaid_order(order_id, f"khalti_status:{status or 'unknown'}")
+        return None, "not_complete"
 
-        seat_err = _ensure_seats_available(db, schedule.bus_id, order.trip_id, order.journey_date, seat_labels)
-        if seat_err:
-            order.status = "failed"
-            order.failure_reason = seat_err
-            order.updated_at = _now_utc()
-            db.commit()
-            return None, seat_err
+    expected_paisa = int(round(float(order.amount) * 100))
+    if isinstance(total_amount, (int, float)) and int(total_amount) != expected_paisa:
+        _fail_unpaid_order(order_id, "amount_mismatch")
+        return None, "amount"
 
     # Create booking only after successful verification (payment-first)
-    booking, booking_err = create_booking(
-        user_id=order.user_id,
-        bus_id=schedule.bus_id,
-        journey_date=str(order.journey_date),
-        seats=len(seat_labels),
-        seat_labels=seat_labels,
-        payment_method="khalti",
-        is_counter_booking=False,
-    )
-    if booking_err:
-        with get_session() as db:
-            order = db.execute(select(PaymentOrder).where(PaymentOrder.id == order_id)).scalar_one_or_none()
-            if order is not None:
-                order.status = "failed"
-                order.failure_reason = f"booking_error:{booking_err}"
-                order.updated_at = _now_utc()
-                db.commit()
-        return None, booking_err
-
-    # Confirm as paid + send email receipt/ticket
-    confirmed_booking, payment_err = confirm_booking_payment(
-        booking_id=booking["booking_id"],
-        user_id=order.user_id,
-        payment_method="khalti",
-        pay_later=False,
-    )
-    if payment_err:
-        return None, payment_err
+    result, finalize_err = finalize_paid_order(order_id, "khalti", pidx_value)
+    if finalize_err:
+        return None, finalize_err
 
-    with get_session() as db:
-        order = db.execute(select(PaymentOrder).where(PaymentOrder.id == order_id)).scalar_one_or_none()
-        if order is not None:
-            order.status = "paid"
-            order.pidx = pidx_value
-            order.booking_id = confirmed_booking["booking_id"]
-            order.failure_reason = None
-            order.updated_at = _now_utc()
-            db.commit()
-
-    return {
-        "status": "paid",
-        "order_id": order_id,
-        "booking_id": confirmed_booking["booking_id"],
-        "booking_reference": confirmed_booking["booking_reference"],
-        "khalti": {
-            "pidx": pidx_value,
-            "status": status,
-            "transaction_id": lookup_data.get("transaction_id"),
-        },
-    }, None
+    result["khalti"] = {
+        "pidx": pidx_value,
+        "status": status,
+        "transaction_id": lookup_data.get("transaction_id"),
+    }
+    return result, None
 
 
 def simulate_refund(order_id: int, user_id: int, reason: str | None = None):
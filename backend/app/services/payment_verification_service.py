@@ -0,0 +1,301 @@
+"""Queue of gateway callbacks, verified off the request path.
+
+The callback endpoint only records the callback (``enqueue_verification``) and
+redirects; worker threads (app.jobs.verification_workers) claim rows, run the slow
+part (gateway lookup, booking) and retry transient failures with
+backoff. The frontend polls ``get_order_verification`` for the outcome.
+
+Rows are claimed with a compare-and-set UPDATE plus a lock expiry, so several
+workers and processes can share the queue on SQLite and Postgres alike, and a row
+held by a worker that died is picked up again once its lock runs out.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config.database import get_session
+from app.model.models import Booking, PaymentOrder, PaymentVerification
+from app.services.payment_order_service import verify_esewa_and_create_booking, verify_khalti_and_create_booking
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_VERIFY_MAX_ATTEMPTS = int(os.getenv("PAYMENT_VERIFY_MAX_ATTEMPTS", "6"))
+PAYMENT_VERIFY_BACKOFF_SECONDS = float(os.getenv("PAYMENT_VERIFY_BACKOFF_SECONDS", "5"))
+PAYMENT_VERIFY_MAX_BACKOFF_SECONDS = float(os.getenv("PAYMENT_VERIFY_MAX_BACKOFF_SECONDS", "300"))
+PAYMENT_VERIFY_LOCK_SECONDS = float(os.getenv("PAYMENT_VERIFY_LOCK_SECONDS", "120"))
+PAYMENT_VERIFICATION_RETENTION_DAYS = int(os.getenv("PAYMENT_VERIFICATION_RETENTION_DAYS", "30"))
+
+# Gateway/network trouble: the payment may well be fine, so try again later.
+RETRYABLE_ERRORS = {"config", "network", "gateway", "invalid_response", "auth"}
+FINISHED_STATES = ("succeeded", "failed")
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def callback_key(gateway: str, params: dict) -> str:
+    if gateway == "khalti" and params.get("pidx"):
+        return str(params["pidx"])[:120]
+    raw = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _verification_output(row: PaymentVerification) -> dict:
+    return {
+        "verification_id": row.id,
+        "order_id": row.order_id,
+        "gateway": row.gateway,
+        "state": row.state,
+        "attempts": row.attempts,
+        "error_key": row.error_key,
+        "result": json.loads(row.result) if row.result else None,
+        "next_attempt_at": row.next_attempt_at.isoformat() if row.state == "queued" else None,
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
+def _paid_result(db, order: PaymentOrder) -> dict | None:
+    if order.status != "paid" or not order.booking_id:
+        return None
+    reference = db.execute(
+        select(Booking.booking_reference).where(Booking.booking_id == order.booking_id)
+    ).scalar_one_or_none()
+    if reference is None:
+        return None
+    return {"status": "paid", "order_id": order.id, "booking_id": order.booking_id, "booking_reference": reference}
+
+
+def enqueue_verification(order_id: int, gateway: str, params: dict):
+    """Record a callback for the workers. Repeats of the same callback return the existing row."""
+    now = _now_utc()
+    key = callback_key(gateway, params)
+    with get_session() as db:
+        order = db.get(PaymentOrder, order_id)
+        if order is None:
+            return None, "order"
+
+        row = PaymentVerification(
+            order_id=order_id,
+            gateway=gateway,
+            callback_key=key,
+            params=json.dumps(params, default=str),
+            state="queued",
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        paid = _paid_result(db, order)
+        if paid is not None:
+            # Already settled (e.g. by another callback); nothing left to verify.
+            row.state = "succeeded"
+            row.result = json.dumps(paid)
+
+        db.add(row)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            row = db.execute(
+                select(PaymentVerification).where(
+                    PaymentVerification.order_id == order_id,
+                    PaymentVerification.callback_key == key,
+                )
+            ).scalar_one()
+        return _verification_output(row), None
+
+
+def enqueue_verifications(items: list[tuple[int, str, dict]]) -> int:
+    """Queue many (order_id, gateway, params) at once; callbacks already queued are skipped."""
+    if not items:
+        return 0
+    now = _now_utc()
+    keyed = {(order_id, callback_key(gateway, params)): (gateway, params) for order_id, gateway, params in items}
+    with get_session() as db:
+        existing = set(
+            db.execute(
+                select(PaymentVerification.order_id, PaymentVerification.callback_key).where(
+                    PaymentVerification.order_id.in_({order_id for order_id, _ in keyed})
+                )
+            ).all()
+        )
+        rows = [
+            {
+                "order_id": order_id,
+                "gateway": gateway,
+                "callback_key": key,
+                "params": json.dumps(params, default=str),
+                "state": "queued",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (order_id, key), (gateway, params) in keyed.items()
+            if (order_id, key) not in existing
+        ]
+        if not rows:
+            return 0
+        try:
+            db.execute(insert(PaymentVerification), rows)
+            db.commit()
+            return len(rows)
+        except IntegrityError:
+            # A callback raced us for some of them; fall back to one at a time.
+            db.rollback()
+    return sum(1 for row in rows if enqueue_verification(row["order_id"], row["gateway"], json.loads(row["params"]))[0])
+
+
+def enqueue_khalti_verification_by_pidx(pidx: str):
+    pidx_value = str(pidx or "").strip()
+    if not pidx_value:
+        return None, "pidx"
+    with get_session(readonly=True) as db:
+        order_id = db.execute(select(PaymentOrder.id).where(PaymentOrder.pidx == pidx_value)).scalar_one_or_none()
+    if order_id is None:
+        return None, "order"
+    return enqueue_verification(order_id, "khalti", {"pidx": pidx_value, "mock_status": None})
+
+
+def get_order_verification(order_id: int, user_id: int, verification_id: int | None = None):
+    """Latest verification for the user's order (or a specific one), for client polling."""
+    with get_session(readonly=True) as db:
+        owner_id = db.execute(select(PaymentOrder.user_id).where(PaymentOrder.id == order_id)).scalar_one_or_none()
+        if owner_id is None or owner_id != user_id:
+            # Someone else's order looks the same as a missing one.
+            return None, "verification"
+
+        query = select(PaymentVerification).where(PaymentVerification.order_id == order_id)
+        if verification_id is not None:
+            query = query.where(PaymentVerification.id == verification_id)
+        row = db.execute(query.order_by(PaymentVerification.id.desc()).limit(1)).scalar_one_or_none()
+        if row is None:
+            return None, "verification"
+        return _verification_output(row), None
+
+
+def claim_due_verifications(worker_id: str, limit: int) -> list[int]:
+    """Lock up to ``limit`` due rows for ``worker_id``; returns their ids."""
+    if limit <= 0:
+        return []
+    now = _now_utc()
+    claimed = []
+    with get_session() as db:
+        candidates = db.execute(
+            select(PaymentVerification.id)
+            .where(
+                or_(
+                    (PaymentVerification.state == "queued") & (PaymentVerification.next_attempt_at <= now),
+                    (PaymentVerification.state == "processing") & (PaymentVerification.locked_until < now),
+                )
+            )
+            .order_by(PaymentVerification.next_attempt_at)
+            .limit(limit * 2)
+        ).scalars().all()
+        for verification_id in candidates:
+            if len(claimed) >= limit:
+                break
+            # Compare-and-set: only one worker flips a given row to processing.
+            taken = db.execute(
+                update(PaymentVerification)
+                .where(
+                    PaymentVerification.id == verification_id,
+                    or_(
+                        PaymentVerification.state == "queued",
+                        (PaymentVerification.state == "processing") & (PaymentVerification.locked_until < now),
+                    ),
+                )
+                .values(
+                    state="processing",
+                    locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=PAYMENT_VERIFY_LOCK_SECONDS),
+                    attempts=PaymentVerification.attempts + 1,
+                    updated_at=now,
+                )
+            ).rowcount
+            if taken:
+                claimed.append(verification_id)
+        db.commit()
+    return claimed
+
+
+def _run_gateway_verification(row: PaymentVerification):
+    params = json.loads(row.params)
+    if row.gateway == "khalti":
+        return verify_khalti_and_create_booking(
+            order_id=row.order_id, pidx=params.get("pidx"), mock_status=params.get("mock_status")
+        )
+    if row.gateway == "esewa":
+        return verify_esewa_and_create_booking(order_id=row.order_id, data=params.get("data"), status=params.get("status"))
+    return None, "gateway_unknown"
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(PAYMENT_VERIFY_MAX_BACKOFF_SECONDS, PAYMENT_VERIFY_BACKOFF_SECONDS * (2 ** max(0, attempts - 1)))
+
+
+def process_verification(verification_id: int, worker_id: str) -> str:
+    """Run one claimed verification and record the outcome. Returns the new state."""
+    with get_session(readonly=True) as db:
+        row = db.get(PaymentVerification, verification_id)
+        if row is None or row.state != "processing" or row.locked_by != worker_id:
+            return "skipped"
+        db.expunge(row)
+
+    try:
+        result, error_key = _run_gateway_verification(row)
+    except Exception:
+        logger.exception("Payment verification %s crashed", verification_id)
+        result, error_key = None, "exception"
+
+    now = _now_utc()
+    values = {"locked_by": None, "locked_until": None, "updated_at": now, "error_key": error_key}
+    if error_key is None:
+        values.update(state="succeeded", result=json.dumps(result, default=str))
+    elif (error_key in RETRYABLE_ERRORS or error_key == "exception") and row.attempts < PAYMENT_VERIFY_MAX_ATTEMPTS:
+        values.update(state="queued", next_attempt_at=now + timedelta(seconds=_retry_delay(row.attempts)))
+    else:
+        values.update(state="failed")
+
+    with get_session() as db:
+        db.execute(
+            update(PaymentVerification)
+            .where(PaymentVerification.id == verification_id, PaymentVerification.locked_by == worker_id)
+            .values(**values)
+        )
+        db.commit()
+    if values["state"] == "queued":
+        logger.warning(
+            "Payment verification %s attempt %s failed (%s); retrying", verification_id, row.attempts, error_key
+        )
+    return values["state"]
+
+
+def verification_queue_depth() -> dict:
+    with get_session(readonly=True) as db:
+        rows = db.execute(
+            select(PaymentVerification.state, func.count())
+            .where(PaymentVerification.state.in_(("queued", "processing")))
+            .group_by(PaymentVerification.state)
+        ).all()
+    return {"queued": 0, "processing": 0, **{state: count for state, count in rows}}
+
+
+def purge_finished_verifications() -> int:
+    cutoff = _now_utc() - timedelta(days=PAYMENT_VERIFICATION_RETENTION_DAYS)
+    with get_session() as db:
+        purged = db.execute(
+            delete(PaymentVerification).where(
+                PaymentVerification.state.in_(FINISHED_STATES),
+                PaymentVerification.updated_at < cutoff,
+            )
+        ).rowcount
+        db.commit()
+        return purged
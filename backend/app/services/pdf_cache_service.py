@@ -0,0 +1,172 @@
+"""Content-addressed cache of generated PDFs (tickets, refund receipts).
+
+A document's key is the SHA-256 of its kind, PDF_TEMPLATE_VERSION, its render
+params and any extra ``key_fields`` (e.g. booking status) that should invalidate it.
+A booking whose seats or status change therefore gets a new key and a fresh render;
+nothing has to be deleted. The key doubles as the HTTP ETag.
+
+Misses render in the PDF process pool (pdf_render_service). Files live under
+PDF_CACHE_DIR/<kind>/<key[:2]>/<key>.pdf and are written atomically, so concurrent
+renders of one key are harmless. A cache hit bumps the file's mtime;
+prune_pdf_cache (a maintenance job) removes files unused for PDF_CACHE_MAX_AGE_DAYS.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import event
+
+from app.config.database import SessionLocal
+from app.services.pdf_render_service import PdfRenderBusy, render_pdf, render_pdf_async, render_pdfs, submit_render
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", str(Path(__file__).resolve().parents[2] / "pdf_cache")))
+PDF_CACHE_MAX_AGE_DAYS = float(os.getenv("PDF_CACHE_MAX_AGE_DAYS", "30"))
+# Bump when pdf_service output changes so old renders are not served again.
+PDF_TEMPLATE_VERSION = "1"
+
+_PRERENDER_KEY = "pdf_prerender"
+
+
+@dataclass(frozen=True)
+class CachedPdf:
+    key: str
+    path: Path
+    size: int
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}"'
+
+
+def document_key(kind: str, params: dict, key_fields: dict | None = None) -> str:
+    material = json.dumps(
+        {"kind": kind, "version": PDF_TEMPLATE_VERSION, "params": params, "key_fields": key_fields or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cache_path(kind: str, key: str) -> Path:
+    return PDF_CACHE_DIR / kind / key[:2] / f"{key}.pdf"
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _cached(kind: str, key: str) -> CachedPdf | None:
+    path = _cache_path(kind, key)
+    try:
+        stat = path.stat()
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return CachedPdf(key, path, stat.st_size)
+
+
+def _store(kind: str, key: str, content: bytes) -> CachedPdf:
+    path = _cache_path(kind, key)
+    _write_atomic(path, content)
+    return CachedPdf(key, path, len(content))
+
+
+def get_or_render_pdf(kind: str, params: dict, key_fields: dict | None = None) -> CachedPdf:
+    """Return the cached file for this document, rendering it in the PDF pool first on a miss."""
+    key = document_key(kind, params, key_fields)
+    return _cached(kind, key) or _store(kind, key, render_pdf(kind, params))
+
+
+async def get_or_render_pdf_async(kind: str, params: dict, key_fields: dict | None = None) -> CachedPdf:
+    key = document_key(kind, params, key_fields)
+    cached = _cached(kind, key)
+    if cached is not None:
+        return cached
+    content = await render_pdf_async(kind, params)
+    return await asyncio.to_thread(_store, kind, key, content)
+
+
+def get_or_render_pdfs(documents: list[tuple[str, dict, dict | None]]) -> list[CachedPdf]:
+    """Batch form of get_or_render_pdf: all misses render concurrently across the pool."""
+    keys = [document_key(kind, params, key_fields) for kind, params, key_fields in documents]
+    results = [_cached(kind, key) for (kind, _, _), key in zip(documents, keys)]
+    misses = [index for index, cached in enumerate(results) if cached is None]
+    rendered = render_pdfs([(documents[index][0], documents[index][1]) for index in misses])
+    for index, content in zip(misses, rendered):
+        results[index] = _store(documents[index][0], keys[index], content)
+    return results
+
+
+def get_or_render_pdf_bytes(kind: str, params: dict, key_fields: dict | None = None) -> bytes:
+    return get_or_render_pdf(kind, params, key_fields).path.read_bytes()
+
+
+def prerender_after_commit(db, kind: str, params: dict, key_fields: dict | None = None) -> None:
+    """Render this document in the background once the caller's transaction commits."""
+    db.info.setdefault(_PRERENDER_KEY, []).append((kind, params, key_fields))
+
+
+def _prerender(kind: str, params: dict, key_fields: dict | None) -> None:
+    key = document_key(kind, params, key_fields)
+    if _cached(kind, key) is not None:
+        return
+    try:
+        future = submit_render(kind, params, timeout=0)
+    except PdfRenderBusy:
+        # Pool saturated: skip; the download or the email renders it on demand.
+        logger.info("PDF pool busy; not pre-rendering %s", kind)
+        return
+
+    def _store_result(done: Future) -> None:
+        try:
+            _store(kind, key, done.result())
+        except Exception:
+            logger.exception("Pre-rendering %s failed", kind)
+
+    future.add_done_callback(_store_result)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _prerender_committed(session):
+    for kind, params, key_fields in session.info.pop(_PRERENDER_KEY, ()):
+        _prerender(kind, params, key_fields)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_prerender(session):
+    session.info.pop(_PRERENDER_KEY, None)
+
+
+def prune_pdf_cache(max_age_days: float = PDF_CACHE_MAX_AGE_DAYS) -> int:
+    """Delete cached PDFs not used for ``max_age_days``; returns how many were removed."""
+    if not PDF_CACHE_DIR.exists():
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for path in PDF_CACHE_DIR.glob("*/*/*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
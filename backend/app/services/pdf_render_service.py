@@ -0,0 +1,207 @@
+"""Render PDFs in a dedicated process pool instead of the request thread.
+
+ReportLab layout is pure-Python CPU work and holds the GIL for the whole render, so
+rendering in a request or worker thread stalls every other thread in the process.
+Here renders run in PDF_RENDER_PROCESSES child processes (forked from a forkserver
+that has pdf_service preloaded, so a worker never inherits our threads or DB pools).
+
+At most PDF_RENDER_QUEUE_SIZE renders may be queued or running; a caller that cannot
+get a slot within PDF_RENDER_QUEUE_TIMEOUT_SECONDS gets PdfRenderBusy (downloads turn
+that into a 503). ``render_pdf`` blocks the calling thread without holding the GIL,
+``render_pdf_async`` awaits, ``submit_render`` returns the future and ``render_pdfs``
+renders a batch concurrently. PDF_RENDER_PROCESSES=0 renders inline.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.pdf_service import render_document, warm_pdf_resources
+
+logger = logging.getLogger(__name__)
+
+PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+PDF_RENDER_QUEUE_SIZE = int(os.getenv("PDF_RENDER_QUEUE_SIZE", "64"))
+PDF_RENDER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_QUEUE_TIMEOUT_SECONDS", "5"))
+
+_slots = threading.BoundedSemaphore(max(1, PDF_RENDER_QUEUE_SIZE))
+_pool_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_stats_lock = threading.Lock()
+_stats = {"submitted": 0, "rendered": 0, "failed": 0, "rejected": 0, "pool_restarts": 0, "in_queue": 0}
+# Recent samples for percentiles: (queue wait ms, render ms).
+_samples: deque[tuple[float, float]] = deque(maxlen=1000)
+
+
+class PdfRenderBusy(RuntimeError):
+    """The render queue stayed full for PDF_RENDER_QUEUE_TIMEOUT_SECONDS."""
+
+
+def _render_in_worker(kind: str, params: dict, submitted_at: float) -> tuple[bytes, float, float]:
+    # Runs in the child: wall-clock start (for queue wait) and CPU-side render time.
+    started_at = time.time()
+    started = time.perf_counter()
+    content = render_document(kind, params)
+    return content, (started_at - submitted_at) * 1000, (time.perf_counter() - started) * 1000
+
+
+def _mp_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["app.services.pdf_service"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_PROCESSES, mp_context=_mp_context(), initializer=warm_pdf_resources
+            )
+        return _pool
+
+
+def _discard_broken_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+            with _stats_lock:
+                _stats["pool_restarts"] += 1
+            logger.warning("PDF render pool broke (a worker process died); starting a new one")
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _record(future: Future) -> None:
+    _slots.release()
+    with _stats_lock:
+        _stats["in_queue"] -= 1
+        if future.cancelled() or future.exception() is not None:
+            _stats["failed"] += 1
+            return
+        _, wait_ms, render_ms = future.result()
+        _stats["rendered"] += 1
+        _samples.append((wait_ms, render_ms))
+
+
+def _take_slot(timeout: float) -> None:
+    if not _slots.acquire(timeout=timeout):
+        if timeout > 0:
+            # A zero-timeout probe (render_pdf_async) retries with a wait; not a rejection yet.
+            with _stats_lock:
+                _stats["rejected"] += 1
+        raise PdfRenderBusy("PDF render queue is full")
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _stats["in_queue"] += 1
+
+
+def _release_failed_slot() -> None:
+    _slots.release()
+    with _stats_lock:
+        _stats["in_queue"] -= 1
+        _stats["failed"] += 1
+
+
+def _submit_with_slot(kind: str, params: dict) -> Future:
+    """Submit once a slot is held; resolves to (bytes, queue wait ms, render ms)."""
+    pool = _get_pool()
+    try:
+        try:
+            future = pool.submit(_render_in_worker, kind, params, time.time())
+        except BrokenProcessPool:
+            # A child died (OOM, segfault); start a fresh pool and try once more.
+            _discard_broken_pool(pool)
+            future = _get_pool().submit(_render_in_worker, kind, params, time.time())
+    except Exception:
+        _release_failed_slot()
+        raise
+    future.add_done_callback(_record)
+    return future
+
+
+def submit_render(kind: str, params: dict, timeout: float = PDF_RENDER_QUEUE_TIMEOUT_SECONDS) -> Future:
+    """Queue a render; the future resolves to the PDF bytes. Raises PdfRenderBusy when the queue is full."""
+    result: Future = Future()
+    if PDF_RENDER_PROCESSES <= 0:
+        try:
+            result.set_result(render_document(kind, params))
+        except Exception as exc:
+            result.set_exception(exc)
+        return result
+
+    _take_slot(timeout)
+    inner = _submit_with_slot(kind, params)
+
+    def _unwrap(done: Future) -> None:
+        if done.cancelled():
+            result.cancel()
+        elif done.exception() is not None:
+            result.set_exception(done.exception())
+        else:
+            result.set_result(done.result()[0])
+
+    inner.add_done_callback(_unwrap)
+    return result
+
+
+def render_pdf(kind: str, params: dict) -> bytes:
+    """Render in the pool and wait (the calling thread releases the GIL while it waits)."""
+    return submit_render(kind, params).result()
+
+
+def render_pdfs(jobs: list[tuple[str, dict]]) -> list[bytes]:
+    """Render many documents concurrently across the pool; results in input order."""
+    futures = [submit_render(kind, params) for kind, params in jobs]
+    return [future.result() for future in futures]
+
+
+async def render_pdf_async(kind: str, params: dict) -> bytes:
+    """Await a pooled render without blocking the event loop, even while waiting for a queue slot."""
+    if PDF_RENDER_PROCESSES <= 0:
+        return await asyncio.to_thread(render_document, kind, params)
+    try:
+        future = submit_render(kind, params, timeout=0)
+    except PdfRenderBusy:
+        future = await asyncio.to_thread(submit_render, kind, params)
+    return await asyncio.wrap_future(future)
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 2)
+
+
+def get_pdf_render_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+        samples = list(_samples)
+    waits = [wait for wait, _ in samples]
+    renders = [render for _, render in samples]
+    stats.update(
+        processes=PDF_RENDER_PROCESSES,
+        queue_size=PDF_RENDER_QUEUE_SIZE,
+        pool_started=_pool is not None,
+        queue_wait_ms={"p50": _percentile(waits, 50), "p95": _percentile(waits, 95), "max": max(waits, default=None)},
+        render_ms={"p50": _percentile(renders, 50), "p95": _percentile(renders, 95), "max": max(renders, default=None)},
+        samples=len(samples),
+    )
+    return stats
+
+
+def shutdown_pdf_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,15 +1,233 @@
+import copy
+import hashlib
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from xml.sax.saxutils import escape
 
-from reportlab.lib.pagesizes import letter
+from reportlab.lib.pagesizes import landscape, letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor, white
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage
+from reportlab.pdfbase.pdfdoc import PDFImageXObject
+from reportlab.platypus import Flowable, PageBreak, SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
 
 LOGO_PATH = Path(__file__).resolve().parents[3] / "frontend" / "src" / "assets" / "logo.png"
+LOGO_WIDTH = 1.35 * inch
+LOGO_HEIGHT = 0.52 * inch
+
+# Static resources below are built once per process (in the PDF render workers: once
+# per worker) and shared by every render. Renders only ever read them.
+
+
+def _data_table_style(row_padding: int, stripe: str, grid: str) -> TableStyle:
+    return TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 10),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+        ("TOPPADDING", (0, 0), (-1, -1), row_padding),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), row_padding),
+        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [white, HexColor(stripe)]),
+        ("GRID", (0, 0), (-1, -1), 1, HexColor(grid)),
+    ])
+
+
+TICKET_TABLE_STYLE = _data_table_style(5, "#f9f9f9", "#e0e0e0")
+REFUND_TABLE_STYLE = _data_table_style(6, "#f9fafb", "#d1d5db")
+MANIFEST_TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("TEXTCOLOR", (0, 0), (-1, 0), white),
+    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#0f766e")),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("TOPPADDING", (0, 0), (-1, -1), 3),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [white, HexColor("#f9f9f9")]),
+    ("GRID", (0, 0), (-1, -1), 0.5, HexColor("#e0e0e0")),
+])
+MANIFEST_COLUMNS = ["Seat", "Passenger", "Phone", "Pickup", "Drop", "Reference", "Payment"]
+MANIFEST_COLUMN_WIDTHS = [0.6 * inch, 2.1 * inch, 1.3 * inch, 1.6 * inch, 1.6 * inch, 1.5 * inch, 1.3 * inch]
+
+
+@lru_cache(maxsize=None)
+def _styles() -> dict[str, ParagraphStyle]:
+    base = getSampleStyleSheet()
+    # Fonts are the built-in Helvetica faces; their metrics load once with the first style.
+    return {
+        # Ticket
+        "title": ParagraphStyle(
+            "title",
+            parent=base["Heading1"],
+            fontSize=18,
+            textColor=white,
+            spaceAfter=4,
+            alignment=1,
+            background=HexColor("#0f766e"),
+            padding=8,
+        ),
+        "subtitle": ParagraphStyle(
+            "subtitle",
+            parent=base["Normal"],
+            fontSize=10,
+            textColor=HexColor("#d1fae5"),
+            alignment=1,
+            spaceAfter=10,
+            backColor=HexColor("#0f766e"),
+        ),
+        "heading": ParagraphStyle(
+            "heading",
+            parent=base["Heading2"],
+            fontSize=12,
+            textColor=HexColor("#0f766e"),
+            spaceAfter=8,
+            spaceBefore=12,
+        ),
+        "label": ParagraphStyle(
+            "label",
+            parent=base["Normal"],
+            fontSize=10,
+            textColor=HexColor("#333333"),
+            fontName="Helvetica-Bold",
+        ),
+        "amount": ParagraphStyle(
+            "amount",
+            parent=base["Normal"],
+            fontSize=14,
+            textColor=HexColor("#0f766e"),
+            fontName="Helvetica-Bold",
+            alignment=2,
+        ),
+        "footer": ParagraphStyle(
+            "footer",
+            parent=base["Normal"],
+            fontSize=9,
+            textColor=HexColor("#666666"),
+            alignment=1,
+        ),
+        # Refund receipt
+        "refund_title": ParagraphStyle(
+            "refund_title",
+            parent=base["Heading1"],
+            fontSize=18,
+            textColor=white,
+            spaceAfter=6,
+            alignment=1,
+            background=HexColor("#1d4ed8"),
+            padding=8,
+        ),
+        "refund_heading": ParagraphStyle(
+            "refund_heading",
+            parent=base["Heading2"],
+            fontSize=12,
+            textColor=HexColor("#1d4ed8"),
+            spaceAfter=8,
+            spaceBefore=10,
+        ),
+        "refund_label": ParagraphStyle(
+            "refund_label",
+            parent=base["Normal"],
+            fontSize=10,
+            textColor=HexColor("#333333"),
+            fontName="Helvetica-Bold",
+        ),
+        "refund_footer": ParagraphStyle(
+            "refund_footer",
+            parent=base["Normal"],
+            fontSize=9,
+            textColor=HexColor("#666666"),
+            alignment=1,
+        ),
+        # Passenger manifest
+        "manifest_heading": ParagraphStyle(
+            "manifest_heading",
+            parent=base["Heading2"],
+            fontSize=14,
+            textColor=HexColor("#0f766e"),
+            spaceAfter=2,
+        ),
+        "manifest_meta": ParagraphStyle(
+            "manifest_meta",
+            parent=base["Normal"],
+            fontSize=9,
+            textColor=HexColor("#333333"),
+            spaceAfter=8,
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def _logo_xobject() -> PDFImageXObject | None:
+    """The logo decoded, flattened and compressed into a PDF image object, once.
+
+    This used to happen on every render and was most of a ticket's render time.
+    """
+    if not LOGO_PATH.exists():
+        return None
+    name = hashlib.md5(LOGO_PATH.read_bytes()).hexdigest()
+    return PDFImageXObject(name, str(LOGO_PATH), mask="auto")
+
+
+class _Logo(Flowable):
+    """Places the pre-encoded logo; same size and position as the old Image flowable.
+
+    Each PDF gets shallow copies of the image and its soft mask (registering an object
+    with a document tags it), but the encoded image streams are shared.
+
+    draw() uses canvas/document internals (_doc, idToObject, _smask, _code) that
+    ReportLab does not promise to keep, which is why requirements.txt pins the
+    version. tests/test_pdf_service.py checks the output after an upgrade.
+    """
+
+    def __init__(self, xobject: PDFImageXObject):
+        super().__init__()
+        self.xobject = xobject
+        self.hAlign = "CENTER"
+
+    def wrap(self, availWidth, availHeight):
+        return LOGO_WIDTH, LOGO_HEIGHT
+
+    def draw(self):
+        canv = self.canv
+        pdf = canv._doc
+        reg_name = pdf.getXObjectName(self.xobject.name)
+        if pdf.idToObject.get(reg_name) is None:
+            image = copy.copy(self.xobject)
+            smask = image.__dict__.pop("_smask", None)
+            pdf.Reference(image, reg_name)
+            pdf.addForm(image.name, image)
+            if smask is not None:
+                image.smask = pdf.Reference(copy.copy(smask), pdf.getXObjectName(smask.name))
+        canv._currentPageHasImages = 1
+        canv.saveState()
+        canv.scale(LOGO_WIDTH, LOGO_HEIGHT)
+        canv._code.append(f"/{reg_name} Do")
+        canv.restoreState()
+        canv._formsinuse.append(self.xobject.name)
+
+
+def _new_document(buffer: BytesIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.75 * inch,
+        bottomMargin=0.75 * inch,
+    )
+
+
+def warm_pdf_resources() -> None:
+    """Build the shared styles and logo now instead of during the first render."""
+    _styles()
+    _logo_xobject()
+
+
+def _brand_header() -> list:
+    logo = _logo_xobject()
+    return [_Logo(logo), Spacer(1, 0.1 * inch)] if logo is not None else []
 
 
 def generate_ticket_pdf(
@@ -26,67 +244,16 @@ def generate_ticket_pdf(
 ) -> bytes:
     """Generate ticket PDF and return bytes."""
     buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=0.5 * inch,
-        leftMargin=0.5 * inch,
-        topMargin=0.75 * inch,
-        bottomMargin=0.75 * inch,
-    )
+    doc = _new_document(buffer)
 
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Header with title
-    title_style = ParagraphStyle(
-        "title",
-        parent=styles["Heading1"],
-        fontSize=18,
-        textColor=white,
-        spaceAfter=4,
-        alignment=1,
-        background=HexColor("#0f766e"),
-        padding=8,
-    )
-
-    subtitle_style = ParagraphStyle(
-        "subtitle",
-        parent=styles["Normal"],
-        fontSize=10,
-        textColor=HexColor("#d1fae5"),
-        alignment=1,
-        spaceAfter=10,
-        backColor=HexColor("#0f766e"),
-    )
-
-    # Custom styles
-    heading_style = ParagraphStyle(
-        "heading",
-        parent=styles["Heading2"],
-        fontSize=12,
-        textColor=HexColor("#0f766e"),
-        spaceAfter=8,
-        spaceBefore=12,
-    )
-
-    label_style = ParagraphStyle(
-        "label",
-        parent=styles["Normal"],
-        fontSize=10,
-        textColor=HexColor("#333333"),
-        fontName="Helvetica-Bold",
-    )
+    styles = _styles()
+    heading_style = styles["heading"]
+    label_style = styles["label"]
 
     # Brand header
-    if LOGO_PATH.exists():
-        logo = RLImage(str(LOGO_PATH), width=1.35 * inch, height=0.52 * inch)
-        logo.hAlign = "CENTER"
-        story.append(logo)
-        story.append(Spacer(1, 0.1 * inch))
-
-    story.append(Paragraph("Ticket Nepal", title_style))
-    story.append(Paragraph("Official Bus Ticket Receipt", subtitle_style))
+    story = _brand_header()
+    story.append(Paragraph("Ticket Nepal", styles["title"]))
+    story.append(Paragraph("Official Bus Ticket Receipt", styles["subtitle"]))
     story.append(Spacer(1, 0.2 * inch))
 
     # Booking Information Section
@@ -99,17 +266,7 @@ def generate_ticket_pdf(
     ]
 
     booking_table = Table(booking_data, colWidths=[2 * inch, 3.5 * inch])
-    booking_table.setStyle(
-        TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 10),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-            ("TOPPADDING", (0, 0), (-1, -1), 5),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [white, HexColor("#f9f9f9")]),
-            ("GRID", (0, 0), (-1, -1), 1, HexColor("#e0e0e0")),
-        ])
-    )
+    booking_table.setStyle(TICKET_TABLE_STYLE)
     story.append(booking_table)
     story.append(Spacer(1, 0.2 * inch))
 
@@ -126,40 +283,16 @@ def generate_ticket_pdf(
     ]
 
     journey_table = Table(journey_data, colWidths=[2 * inch, 3.5 * inch])
-    journey_table.setStyle(
-        TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 10),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-            ("TOPPADDING", (0, 0), (-1, -1), 5),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [white, HexColor("#f9f9f9")]),
-            ("GRID", (0, 0), (-1, -1), 1, HexColor("#e0e0e0")),
-        ])
-    )
+    journey_table.setStyle(TICKET_TABLE_STYLE)
     story.append(journey_table)
     story.append(Spacer(1, 0.3 * inch))
 
     # Total Amount (highlighted)
-    amount_style = ParagraphStyle(
-        "amount",
-        parent=styles["Normal"],
-        fontSize=14,
-        textColor=HexColor("#0f766e"),
-        fontName="Helvetica-Bold",
-        alignment=2,
-    )
-    story.append(Paragraph(f"Total Amount: Rs. {total_amount:.2f}", amount_style))
+    story.append(Paragraph(f"Total Amount: Rs. {total_amount:.2f}", styles["amount"]))
     story.append(Spacer(1, 0.2 * inch))
 
     # Footer
-    footer_style = ParagraphStyle(
-        "footer",
-        parent=styles["Normal"],
-        fontSize=9,
-        textColor=HexColor("#666666"),
-        alignment=1,
-    )
+    footer_style = styles["footer"]
     story.append(Spacer(1, 0.2 * inch))
     story.append(Paragraph(f"Receipt generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", footer_style))
     story.append(Paragraph("Thank you for booking with Ticket Nepal.", footer_style))
@@ -187,53 +320,13 @@ def generate_refund_receipt_pdf(
 ) -> bytes:
     """Generate refund receipt PDF and return bytes."""
     buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=0.5 * inch,
-        leftMargin=0.5 * inch,
-        topMargin=0.75 * inch,
-        bottomMargin=0.75 * inch,
-    )
-
-    styles = getSampleStyleSheet()
-    story = []
-
-    title_style = ParagraphStyle(
-        "refund_title",
-        parent=styles["Heading1"],
-        fontSize=18,
-        textColor=white,
-        spaceAfter=6,
-        alignment=1,
-        background=HexColor("#1d4ed8"),
-        padding=8,
-    )
+    doc = _new_document(buffer)
 
-    heading_style = ParagraphStyle(
-        "refund_heading",
-        parent=styles["Heading2"],
-        fontSize=12,
-        textColor=HexColor("#1d4ed8"),
-        spaceAfter=8,
-        spaceBefore=10,
-    )
-
-    label_style = ParagraphStyle(
-        "refund_label",
-        parent=styles["Normal"],
-        fontSize=10,
-        textColor=HexColor("#333333"),
-        fontName="Helvetica-Bold",
-    )
+    styles = _styles()
+    label_style = styles["refund_label"]
 
-    if LOGO_PATH.exists():
-        logo = RLImage(str(LOGO_PATH), width=1.35 * inch, height=0.52 * inch)
-        logo.hAlign = "CENTER"
-        story.append(logo)
-        story.append(Spacer(1, 0.1 * inch))
-
-    story.append(Paragraph("Ticket Nepal - Refund Receipt", title_style))
+    story = _brand_header()
+    story.append(Paragraph("Ticket Nepal - Refund Receipt", styles["refund_title"]))
     story.append(Spacer(1, 0.15 * inch))
 
     seats_display = ", ".join(refunded_seats) if refunded_seats else "N/A"
@@ -250,32 +343,91 @@ def generate_refund_receipt_pdf(
         [Paragraph("Refund Amount:", label_style), f"Rs. {refund_amount:.2f}"],
     ]
 
-    story.append(Paragraph("REFUND DETAILS", heading_style))
+    story.append(Paragraph("REFUND DETAILS", styles["refund_heading"]))
     table = Table(data, colWidths=[2.1 * inch, 3.4 * inch])
-    table.setStyle(
-        TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 10),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-            ("TOPPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [white, HexColor("#f9fafb")]),
-            ("GRID", (0, 0), (-1, -1), 1, HexColor("#d1d5db")),
-        ])
-    )
+    table.setStyle(REFUND_TABLE_STYLE)
     story.append(table)
     story.append(Spacer(1, 0.25 * inch))
 
-    footer_style = ParagraphStyle(
-        "refund_footer",
-        parent=styles["Normal"],
-        fontSize=9,
-        textColor=HexColor("#666666"),
-        alignment=1,
-    )
+    footer_style = styles["refund_footer"]
     story.append(Paragraph(f"Receipt generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", footer_style))
     story.append(Paragraph("This receipt confirms refund processing in Ticket Nepal.", footer_style))
 
     doc.build(story)
     buffer.seek(0)
     return buffer.getvalue()
+
+
+def _clip(value, width: int) -> str:
+    text = "" if value is None else str(value)
+    return text if len(text) <= width else f"{text[:width - 1]}…"
+
+
+def generate_manifest_pdf(journey_date: str, trips: list[dict]) -> bytes:
+    """Generate a passenger manifest, one trip per page (long trips continue with the header repeated).
+
+    ``trips`` items: schedule_id, bus_number, route, departure_time, arrival_time, seat_count
+    and ``passengers`` rows in MANIFEST_COLUMNS order.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(letter),
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.6 * inch,
+        title=f"Passenger manifest {journey_date}",
+    )
+    styles = _styles()
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    def _page_footer(canv, page_doc):
+        canv.saveState()
+        canv.setFont("Helvetica", 8)
+        canv.setFillColor(HexColor("#666666"))
+        canv.drawString(0.5 * inch, 0.35 * inch, f"Ticket Nepal passenger manifest - {journey_date} - generated {generated}")
+        canv.drawRightString(page_doc.pagesize[0] - 0.5 * inch, 0.35 * inch, f"Page {page_doc.page}")
+        canv.restoreState()
+
+    story = []
+    for index, trip in enumerate(trips):
+        if index:
+            story.append(PageBreak())
+        story.append(
+            Paragraph(
+                escape(f"{trip['route']} · {trip['departure_time']} · {trip['bus_number']}"), styles["manifest_heading"]
+            )
+        )
+        story.append(
+            Paragraph(
+                escape(
+                    f"Journey date {journey_date} · schedule #{trip['schedule_id']} · "
+                    f"arrives {trip['arrival_time']} · {trip['seat_count']} seat(s) booked"
+                ),
+                styles["manifest_meta"],
+            )
+        )
+        rows = [[_clip(value, 32) for value in passenger] for passenger in trip["passengers"]]
+        table = Table([MANIFEST_COLUMNS, *rows], colWidths=MANIFEST_COLUMN_WIDTHS, repeatRows=1, hAlign="LEFT")
+        table.setStyle(MANIFEST_TABLE_STYLE)
+        story.append(table)
+
+    if not story:
+        story.append(Paragraph(f"No passengers booked for {journey_date}.", styles["manifest_heading"]))
+
+    doc.build(story, onFirstPage=_page_footer, onLaterPages=_page_footer)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+DOCUMENT_RENDERERS = {
+    "ticket_pdf": generate_ticket_pdf,
+    "refund_receipt_pdf": generate_refund_receipt_pdf,
+    "manifest_pdf": generate_manifest_pdf,
+}
+
+
+def render_document(kind: str, params: dict) -> bytes:
+    """Render a document by kind (see DOCUMENT_RENDERERS) from its keyword params."""
+    return DOCUMENT_RENDERERS[kind](**params)
@@ -0,0 +1,194 @@
+"""Re-check pending payment orders with the gateway when the browser never came back.
+
+A pending order with a ``pidx`` (Khalti) or transaction UUID (eSewa) reached the
+gateway, so the customer may have paid. Candidates are read in id-ordered batches and
+looked up concurrently (at most PAYMENT_RECONCILE_CONCURRENCY calls in flight) through
+the same pooled, circuit-broken gateway clients as checkout. Then per batch:
+
+- paid at the gateway: queued for the verification workers, which create the booking
+  exactly as a late browser callback would. A Khalti row shares the callback's dedup
+  key (the pidx); an eSewa row does not (the callback key hashes the signed ``data``),
+  so both may run, and finalize_paid_order's order lock makes the second a no-op;
+- declined/cancelled at the gateway, or still unpaid well after the order expired:
+  failed in one UPDATE per reason, guarded on ``status = 'pending'``;
+- anything else (in progress, lookup error): left for the next run.
+
+Run it offline against app.simulator.gateway (point KHALTI_VERIFY_BASE_URL /
+ESEWA_STATUS_CHECK_BASE_URL at it), or with PAYMENT_MOCK_MODE for in-process answers.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from app.config.database import get_session
+from app.model.models import PaymentOrder
+from app.services.payment_order_service import _esewa_status, _khalti_lookup
+from app.services.payment_verification_service import enqueue_verifications
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_RECONCILE_BATCH_SIZE = int(os.getenv("PAYMENT_RECONCILE_BATCH_SIZE", "100"))
+PAYMENT_RECONCILE_CONCURRENCY = int(os.getenv("PAYMENT_RECONCILE_CONCURRENCY", "8"))
+# Fresh checkouts are left to the browser callback.
+PAYMENT_RECONCILE_MIN_AGE_MINUTES = float(os.getenv("PAYMENT_RECONCILE_MIN_AGE_MINUTES", "5"))
+# Still unpaid this long after expires_at: the gateway session is dead, fail the order.
+PAYMENT_RECONCILE_GRACE_MINUTES = float(os.getenv("PAYMENT_RECONCILE_GRACE_MINUTES", "60"))
+
+KHALTI_FAILED_STATUSES = {"expired", "user canceled", "canceled", "failed", "refunded"}
+ESEWA_FAILED_STATUSES = {"NOT_FOUND", "CANCELED", "FULL_REFUND"}
+
+
+@dataclass
+class Candidate:
+    order_id: int
+    reference: str
+    amount: float
+    expires_at: datetime | None
+
+    @property
+    def gateway(self) -> str:
+        # eSewa transaction UUIDs are ours (see initiate_esewa_for_order); everything else is a Khalti pidx.
+        return "esewa" if self.reference.startswith(f"TN-{self.order_id}-") else "khalti"
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _candidates_query(after_id: int, updated_before: datetime, limit: int):
+    return (
+        select(PaymentOrder.id, PaymentOrder.pidx, PaymentOrder.amount, PaymentOrder.expires_at)
+        .where(
+            PaymentOrder.status == "pending",
+            PaymentOrder.pidx.is_not(None),
+            PaymentOrder.updated_at < updated_before,
+            PaymentOrder.id > after_id,
+        )
+        .order_by(PaymentOrder.id)
+        .limit(limit)
+    )
+
+
+def _lookup(candidate: Candidate) -> tuple[str, str]:
+    """Return (outcome, gateway status); outcome is completed, failed, pending or error."""
+    try:
+        if candidate.gateway == "khalti":
+            data, error_key = _khalti_lookup(candidate.reference, candidate.amount)
+            status = str((data or {}).get("status") or "").strip().lower()
+            completed, failed = status == "completed", status in KHALTI_FAILED_STATUSES
+        else:
+            data, error_key = _esewa_status(candidate.reference, candidate.amount)
+            status = str((data or {}).get("status") or "").strip().upper()
+            completed, failed = status == "COMPLETE", status in ESEWA_FAILED_STATUSES
+    except Exception:
+        logger.exception("Reconciliation lookup crashed for order %s", candidate.order_id)
+        return "error", "exception"
+
+    if error_key:
+        return "error", error_key
+    if completed:
+        return "completed", status
+    if failed:
+        return "failed", status
+    return "pending", status or "unknown"
+
+
+def _fail_orders(db, order_ids: list[int], reason: str, now: datetime) -> int:
+    if not order_ids:
+        return 0
+    return db.execute(
+        update(PaymentOrder)
+        .where(PaymentOrder.id.in_(order_ids), PaymentOrder.status == "pending")
+        .values(status="failed", failure_reason=reason[:200], updated_at=now)
+    ).rowcount
+
+
+def _settle_batch(candidates: list[Candidate], results: list[tuple[str, str]], now: datetime, dry_run: bool) -> dict:
+    stale_before = now - timedelta(minutes=PAYMENT_RECONCILE_GRACE_MINUTES)
+    to_verify, to_fail = [], {}
+    counts = Counter()
+    for candidate, (outcome, status) in zip(candidates, results):
+        if outcome == "completed":
+            to_verify.append((candidate.order_id, candidate.gateway, _verification_params(candidate)))
+        elif outcome == "failed":
+            to_fail.setdefault(f"reconciled:{candidate.gateway}_status:{status}", []).append(candidate.order_id)
+        elif outcome == "pending" and candidate.expires_at is not None and candidate.expires_at < stale_before:
+            to_fail.setdefault("expired", []).append(candidate.order_id)
+        else:
+            counts["errors" if outcome == "error" else "still_pending"] += 1
+
+    if dry_run:
+        counts["queued_for_verification"] += len(to_verify)
+        counts["failed"] += sum(len(ids) for ids in to_fail.values())
+        return counts
+
+    counts["queued_for_verification"] += enqueue_verifications(to_verify)
+    with get_session() as db:
+        for reason, order_ids in to_fail.items():
+            counts["failed"] += _fail_orders(db, order_ids, reason, now)
+        db.commit()
+    return counts
+
+
+def _verification_params(candidate: Candidate) -> dict:
+    # Khalti: same params as the browser callback, so both land on one queue row (keyed on pidx).
+    # eSewa: no signed data here, so this is a separate row that re-checks the status API; a
+    # callback row for the same order just finds it already paid.
+    if candidate.gateway == "khalti":
+        return {"pidx": candidate.reference, "mock_status": None}
+    return {"data": None, "status": None}
+
+
+def reconcile_pending_orders(
+    batch_size: int = PAYMENT_RECONCILE_BATCH_SIZE,
+    concurrency: int = PAYMENT_RECONCILE_CONCURRENCY,
+    max_batches: int | None = None,
+    min_age_minutes: float = PAYMENT_RECONCILE_MIN_AGE_MINUTES,
+    time_budget_seconds: float | None = None,
+    dry_run: bool = False,
+) -> dict:
+    """Look up stuck pending orders with their gateway and settle them; returns a summary report.
+
+    ``time_budget_seconds`` stops starting new batches once used up (the next run resumes).
+    """
+    started = time.perf_counter()
+    now = _now_utc()
+    updated_before = now - timedelta(minutes=min_age_minutes)
+    report = Counter()
+    statuses = Counter()
+    last_id = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="payment-reconcile") as pool:
+        while max_batches is None or report["batches"] < max_batches:
+            if time_budget_seconds is not None and time.perf_counter() - started >= time_budget_seconds:
+                break
+            with get_session(readonly=True) as db:
+                rows = db.execute(_candidates_query(last_id, updated_before, batch_size)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            candidates = [Candidate(row.id, str(row.pidx), float(row.amount), row.expires_at) for row in rows]
+            results = list(pool.map(_lookup, candidates))
+            statuses.update(f"{candidate.gateway}:{status}" for candidate, (_, status) in zip(candidates, results))
+            report.update(_settle_batch(candidates, results, now, dry_run))
+            report["scanned"] += len(candidates)
+            report["batches"] += 1
+
+    return {
+        "dry_run": dry_run,
+        "scanned": report["scanned"],
+        "queued_for_verification": report["queued_for_verification"],
+        "failed": report["failed"],
+        "still_pending": report["still_pending"],
+        "errors": report["errors"],
+        "batches": report["batches"],
+        "gateway_statuses": dict(statuses),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -1,8 +1,9 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
 from sqlalchemy import select
 
 from app.config.database import get_session
+from app.constants import BOOKING_STATUS_COMPLETED
 from app.model.models import Booking, Bus, BusSchedule, Review, Route
 
 
@@ -34,40 +35,42 @@ def _review_output(
     }
 
 
-def list_reviews_by_user(user_id: int):
-    with get_session() as db:
+def _rows_by_id(db, column, ids) -> dict:
+    ids = {item for item in ids if item is not None}
+    if not ids:
+        return {}
+    rows = db.execute(select(column.class_).where(column.in_(ids))).scalars().all()
+    return {getattr(row, column.key): row for row in rows}
+
+
+def list_reviews_by_user(user_id: int, db=None):
+    # Booking, schedule, bus ra route ek-ek IN query ma; review jati bhaye pani query sankhya fixed.
+    with get_session(db, readonly=True) as db:
         reviews = db.execute(
             select(Review)
             .where(Review.user_id == user_id)
             .order_by(Review.created_at.desc(), Review.review_id.desc())
         ).scalars().all()
 
-        results = []
+        bookings = _rows_by_id(db, Booking.booking_id, (review.booking_id for review in reviews))
+        schedules = _rows_by_id(db, BusSchedule.schedule_id, (booking.schedule_id for booking in bookings.values()))
+
+        def schedule_for(review: Review) -> BusSchedule | None:
+            booking = bookings.get(review.booking_id)
+            return schedules.get(booking.schedule_id) if booking is not None else None
+
+        bus_ids = []
         for review in reviews:
-            booking = None
-            schedule = None
-            bus = None
-            route = None
-
-            if review.booking_id is not None:
-                booking = db.execute(
-                    select(Booking).where(Booking.booking_id == review.booking_id)
-                ).scalar_one_or_none()
-
-            if booking is not None and booking.schedule_id is not None:
-                schedule = db.execute(
-                    select(BusSchedule).where(BusSchedule.schedule_id == booking.schedule_id)
-                ).scalar_one_or_none()
-
-            if review.bus_id is not None:
-                bus = db.execute(select(Bus).where(Bus.bus_id == review.bus_id)).scalar_one_or_none()
-            elif schedule is not None and schedule.bus_id is not None:
-                bus = db.execute(select(Bus).where(Bus.bus_id == schedule.bus_id)).scalar_one_or_none()
-
-            if schedule is not None and schedule.route_id is not None:
-                route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
+            schedule = schedule_for(review)
+            bus_ids.append(review.bus_id if review.bus_id is not None else schedule.bus_id if schedule else None)
+        buses = _rows_by_id(db, Bus.bus_id, bus_ids)
+        routes = _rows_by_id(db, Route.route_id, (schedule.route_id for schedule in schedules.values()))
 
-            results.append(_review_output(review, booking, bus, route))
+        results = []
+        for review, bus_id in zip(reviews, bus_ids):
+            schedule = schedule_for(review)
+            route = routes.get(schedule.route_id) if schedule is not None else None
+            results.append(_review_output(review, bookings.get(review.booking_id), buses.get(bus_id), route))
 
         return results
 
@@ -104,12 +107,8 @@ def create_review(user_id: int, booking_id: int, rating: int, review_text: str |
             if schedule.route_id is not None:
                 route = db.execute(select(Route).where(Route.route_id == schedule.route_id)).scalar_one_or_none()
 
-        journey_start = datetime.combine(
-            booking.journey_date,
-            schedule.departure_time if schedule is not None else datetime.min.time(),
-        )
-        eligible_at = journey_start + timedelta(hours=24)
-        if datetime.now() < eligible_at:
+        # Lifecycle job le arrival pachhi "completed" banaucha; yaha time calculate gardaina.
+        if booking.booking_status != BOOKING_STATUS_COMPLETED:
             return None, "too_early"
 
         if bus_id is not None:
@@ -20,25 +20,25 @@ def _estimate_duration_minutes(distance_km: float) -> int:
     return int(distance_km * 3)
 
 
-def list_routes():
-    with get_session() as db:
+def list_routes(db=None):
+    with get_session(db, readonly=True) as db:
         routes = db.execute(
             select(Route).where(Route.is_active.is_(True)).order_by(Route.route_id)
         ).scalars().all()
         return [_to_route_output(route) for route in routes]
 
 
-def list_all_routes():
-    with get_session() as db:
+def list_all_routes(db=None):
+    with get_session(db, readonly=True) as db:
         routes = db.execute(
             select(Route).order_by(Route.route_id)
         ).scalars().all()
         return [_to_route_output(route) for route in routes]
 
 
-def find_route(route_id: int):
-    with get_session() as db:
-        route = db.execute(select(Route).where(Route.route_id == route_id)).scalar_one_or_none()
+def find_route(route_id: int, db=None):
+    with get_session(db) as db:
+        route = db.get(Route, route_id)
         if route is None:
             return None
         return _to_route_output(route)
@@ -35,8 +35,8 @@ def _to_schedule_output(schedule: BusSchedule) -> dict:
     }
 
 
-def list_schedules():
-    with get_session() as db:
+def list_schedules(db=None):
+    with get_session(db, readonly=True) as db:
         schedules = db.execute(
             select(BusSchedule)
             .where(BusSchedule.is_active.is_(True))
@@ -45,8 +45,8 @@ def list_schedules():
         return [_to_schedule_output(schedule) for schedule in schedules]
 
 
-def list_all_schedules():
-    with get_session() as db:
+def list_all_schedules(db=None):
+    with get_session(db, readonly=True) as db:
         schedules = db.execute(
             select(BusSchedule)
             .order_by(BusSchedule.schedule_id)
@@ -54,11 +54,9 @@ def list_all_schedules():
         return [_to_schedule_output(schedule) for schedule in schedules]
 
 
-def find_schedule(schedule_id: int):
-    with get_session() as db:
-        schedule = db.execute(
-            select(BusSchedule).where(BusSchedule.schedule_id == schedule_id)
-        ).scalar_one_or_none()
+def find_schedule(schedule_id: int, db=None):
+    with get_session(db) as db:
+        schedule = db.get(BusSchedule, schedule_id)
         if schedule is None:
             return None
         return _to_schedule_output(schedule)
@@ -129,6 +127,7 @@ def set_schedule_status(schedule_id: int, is_active: bool):
         if schedule is None:
             return None
         schedule.is_active = is_active
+        schedule.inactive_reason = None
         db.commit()
         db.refresh(schedule)
         return _to_schedule_output(schedule)
@@ -142,5 +141,6 @@ def delete_schedule(schedule_id: int):
         if schedule is None:
             return False
         schedule.is_active = False
+        schedule.inactive_reason = None
         db.commit()
         return True
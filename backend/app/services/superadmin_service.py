@@ -4,8 +4,8 @@ from sqlalchemy import func, select
 
 from app.config.database import get_session
 from app.model.models import Bus, BusSchedule, Route, User, VendorDocument
-from app.services.booking_service import list_bookings
-from app.services.bus_service import list_buses
+from app.services.booking_service import booking_totals
+from app.services.bus_service import apply_vendor_fleet_status, list_buses
 from app.services.password_service import hash_password
 from app.services.route_service import list_routes
 from app.services.schedule_service import list_schedules
@@ -41,7 +41,7 @@ def _to_vendor_output(vendor: User, document: VendorDocument | None = None) -> d
 
 
 def list_vendors() -> list[dict]:
-    with get_session() as db:
+    with get_session(readonly=True) as db:
         vendors = db.execute(
             select(User)
             .where(User.role == "vendor")
@@ -111,8 +111,9 @@ def update_vendor(vendor_id: int, name: str | None = None, email: str | None = N
         if name is not None and name.strip():
             vendor.name = name.strip()
 
-        if is_active is not None:
+        if is_active is not None and is_active != bool(vendor.is_active):
             vendor.is_active = is_active
+            apply_vendor_fleet_status(db, vendor_id, is_active)
 
         db.commit()
         db.refresh(vendor)
@@ -161,13 +162,27 @@ def delete_vendor(vendor_id: int):
         # Archive deleted vendors by role so they no longer appear in superadmin vendor listings.
         vendor.is_active = False
         vendor.role = "vendor_deleted"
+        apply_vendor_fleet_status(db, vendor_id, False)
         db.commit()
         return True
 
 
+def set_vendor_fleet_status(vendor_id: int, is_active: bool):
+    with get_session() as db:
+        vendor = db.execute(
+            select(User).where(User.user_id == vendor_id, User.role == "vendor")
+        ).scalar_one_or_none()
+        if vendor is None:
+            return None, "vendor"
+
+        result = apply_vendor_fleet_status(db, vendor_id, is_active)
+        db.commit()
+        return result, None
+
+
 def get_superadmin_analytics() -> dict:
     vendors = list_vendors()
-    bookings = list_bookings()
+    totals = booking_totals()
     buses = list_buses()
     routes = list_routes()
     schedules = list_schedules()
@@ -175,9 +190,6 @@ def get_superadmin_analytics() -> dict:
     verified_vendors = [item for item in vendors if item.get("is_verified")]
     pending_vendors = [item for item in vendors if not item.get("is_verified")]
 
-    total_revenue = round(sum(float(item.get("total_amount", 0)) for item in bookings), 2)
-    total_booked_seats = sum(int(item.get("seats", 0)) for item in bookings)
-
     with get_session() as db:
         total_users = db.execute(select(func.count(User.user_id))).scalar_one() or 0
         total_vendor_accounts = db.execute(
@@ -193,12 +205,12 @@ def get_superadmin_analytics() -> dict:
         "total_buses": total_bus_records,
         "total_routes": total_route_records,
         "total_schedules": total_schedule_records,
-        "total_bookings": len(bookings),
+        "total_bookings": totals["total_bookings"],
         "verified_vendors": len(verified_vendors),
         "pending_vendors": len(pending_vendors),
         "active_buses": len([item for item in buses if item.get("is_active", True)]),
         "active_routes": len([item for item in routes if item.get("is_active", True)]),
         "active_schedules": len([item for item in schedules if item.get("is_active", True)]),
-        "total_booked_seats": total_booked_seats,
-        "total_revenue": total_revenue,
+        "total_booked_seats": totals["booked_seats"],
+        "total_revenue": round(totals["total_revenue"], 2),
     }
@@ -14,22 +14,22 @@ def _to_user_output(user: User) -> dict:
     }
 
 
-def list_users_output():
-    with get_session() as db:
+def list_users_output(db=None):
+    with get_session(db, readonly=True) as db:
         users = db.execute(select(User).order_by(User.user_id)).scalars().all()
         return [_to_user_output(user) for user in users]
 
 
-def find_user(user_id: int):
-    with get_session() as db:
-        user = db.execute(select(User).where(User.user_id == user_id)).scalar_one_or_none()
+def find_user(user_id: int, db=None):
+    with get_session(db) as db:
+        user = db.get(User, user_id)
         if user is None:
             return None
         return _to_user_output(user)
 
 
-def get_user_output(user_id: int):
-    return find_user(user_id)
+def get_user_output(user_id: int, db=None):
+    return find_user(user_id, db=db)
 
 
 def update_user_profile(user_id: int, name: str, phone: str | None = None) -> dict | None:
@@ -0,0 +1,415 @@
+"""Local Khalti/eSewa stand-in for offline end-to-end and load testing.
+
+Run (from backend/):
+    python -m app.simulator.gateway --port 9000 --latency lognormal:120,0.5 --error-rate 0.02
+
+Then start the API against it:
+    KHALTI_VERIFY_BASE_URL=http://127.0.0.1:9000/api/v2 KHALTI_SECRET_KEY=sim-khalti-key \\
+    ESEWA_EPAY_BASE_URL=http://127.0.0.1:9000 ESEWA_STATUS_CHECK_BASE_URL=http://127.0.0.1:9000 \\
+    ESEWA_MERCHANT_ID=EPAYTEST ESEWA_MERCHANT_SECRET=sim-esewa-secret \\
+    uvicorn app.main:app
+
+Implements Khalti ``epayment/initiate`` + ``epayment/lookup`` with a pay page that
+redirects to ``return_url``, and the eSewa v2 form post (HMAC-SHA256 signature
+checked, signed ``data`` on success) + transaction status API. Every gateway call
+goes through the configured behaviour:
+
+- ``latency``: ``fixed:MS``, ``uniform:MIN-MAX``, ``normal:MEAN,SD``,
+  ``lognormal:MEDIAN,SIGMA`` or ``exp:MEAN`` (milliseconds);
+- ``error_rate``: answer 503; ``hang_rate``: sleep ``hang_seconds`` (client timeouts);
+- ``decline_rate``: the customer cancels on the pay page;
+- ``pending_rate``: lookups say the payment is still in progress;
+- ``amount_mismatch_rate``: lookups report a different amount.
+
+GET/PUT ``/__sim/config`` changes behaviour at runtime, GET ``/__sim/stats`` returns
+per-endpoint counts and latencies, POST ``/__sim/reset`` clears state.
+Everything lives in memory; this is not meant to run anywhere near production.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+
+
+@dataclass
+class SimulatorConfig:
+    latency: str = os.getenv("SIM_LATENCY", "fixed:0")
+    error_rate: float = float(os.getenv("SIM_ERROR_RATE", "0"))
+    hang_rate: float = float(os.getenv("SIM_HANG_RATE", "0"))
+    hang_seconds: float = float(os.getenv("SIM_HANG_SECONDS", "30"))
+    decline_rate: float = float(os.getenv("SIM_DECLINE_RATE", "0"))
+    pending_rate: float = float(os.getenv("SIM_PENDING_RATE", "0"))
+    amount_mismatch_rate: float = float(os.getenv("SIM_AMOUNT_MISMATCH_RATE", "0"))
+    khalti_secret_key: str = os.getenv("SIM_KHALTI_SECRET_KEY", "sim-khalti-key")
+    esewa_product_code: str = os.getenv("SIM_ESEWA_PRODUCT_CODE", "EPAYTEST")
+    esewa_secret_key: str = os.getenv("SIM_ESEWA_SECRET_KEY", "sim-esewa-secret")
+    public_url: str = os.getenv("SIM_PUBLIC_URL", "http://127.0.0.1:9000")
+    seed: int | None = None
+
+
+def parse_latency(spec: str):
+    """Return a zero-arg sampler (seconds) for a latency spec like ``lognormal:120,0.5``."""
+    kind, _, args = spec.partition(":")
+    kind = kind.strip().lower()
+    try:
+        if kind == "fixed":
+            value = float(args or 0)
+            return lambda rng: value / 1000
+        if kind == "uniform":
+            low, high = (float(part) for part in args.split("-"))
+            return lambda rng: rng.uniform(low, high) / 1000
+        if kind == "normal":
+            mean, sd = (float(part) for part in args.split(","))
+            return lambda rng: max(0.0, rng.gauss(mean, sd)) / 1000
+        if kind == "lognormal":
+            median, sigma = (float(part) for part in args.split(","))
+            return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+        if kind == "exp":
+            mean = float(args)
+            return lambda rng: rng.expovariate(1 / mean) / 1000 if mean > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"Bad latency spec {spec!r}; use fixed:MS, uniform:MIN-MAX, normal:MEAN,SD, lognormal:MEDIAN,SIGMA or exp:MEAN")
+
+
+@dataclass
+class EndpointStats:
+    calls: int = 0
+    errors: int = 0
+    hangs: int = 0
+    total_delay_ms: float = 0.0
+    max_delay_ms: float = 0.0
+
+    def snapshot(self) -> dict:
+        data = asdict(self)
+        data["avg_delay_ms"] = round(self.total_delay_ms / self.calls, 3) if self.calls else 0.0
+        data["total_delay_ms"] = round(self.total_delay_ms, 3)
+        data["max_delay_ms"] = round(self.max_delay_ms, 3)
+        return data
+
+
+@dataclass
+class SimulatorState:
+    config: SimulatorConfig
+    rng: random.Random = field(default_factory=random.Random)
+    khalti: dict[str, dict] = field(default_factory=dict)
+    esewa: dict[str, dict] = field(default_factory=dict)
+    stats: dict[str, EndpointStats] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.apply(self.config)
+
+    def apply(self, config: SimulatorConfig) -> None:
+        self.sample_latency = parse_latency(config.latency)
+        self.config = config
+        if config.seed is not None:
+            self.rng.seed(config.seed)
+
+    def chance(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _esewa_signature(message: str, secret_key: str) -> str:
+    digest = hmac.new(secret_key.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode("utf-8")
+
+
+def _signed_message(payload: dict) -> str:
+    names = [name.strip() for name in str(payload.get("signed_field_names") or "").split(",") if name.strip()]
+    return ",".join(f"{name}={payload.get(name, '')}" for name in names)
+
+
+def _with_query(url: str, params: dict) -> str:
+    parts = urlsplit(url)
+    query = "&".join(filter(None, [parts.query, urlencode(params)]))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+
+
+def create_app(config: SimulatorConfig | None = None) -> FastAPI:
+    state = SimulatorState(config or SimulatorConfig())
+    sim = FastAPI(title="Ticket Nepal gateway simulator", docs_url="/__sim/docs", openapi_url="/__sim/openapi.json")
+    sim.state.simulator = state
+
+    async def behave(name: str) -> JSONResponse | None:
+        """Apply latency/hang/error for one call; returns an error response to send instead, if any."""
+        with state.lock:
+            delay = state.sample_latency(state.rng)
+            stats = state.stats.setdefault(name, EndpointStats())
+            stats.calls += 1
+        hang = state.chance(state.config.hang_rate)
+        if hang:
+            delay = state.config.hang_seconds
+        await asyncio.sleep(delay)
+        with state.lock:
+            stats.total_delay_ms += delay * 1000
+            stats.max_delay_ms = max(stats.max_delay_ms, delay * 1000)
+            stats.hangs += int(hang)
+        if state.chance(state.config.error_rate):
+            with state.lock:
+                stats.errors += 1
+            return JSONResponse({"detail": "Service temporarily unavailable (simulated)"}, status_code=503)
+        return None
+
+    def khalti_unauthorized(request: Request) -> JSONResponse | None:
+        expected = state.config.khalti_secret_key
+        if expected and request.headers.get("authorization") != f"Key {expected}":
+            return JSONResponse({"detail": "Invalid token.", "status_code": 401}, status_code=401)
+        return None
+
+    # ------------------------------------------------------------------ Khalti
+
+    @sim.post("/api/v2/epayment/initiate/")
+    async def khalti_initiate(request: Request):
+        if (failure := await behave("khalti.initiate")) is not None:
+            return failure
+        if (failure := khalti_unauthorized(request)) is not None:
+            return failure
+        body = await request.json()
+        amount = body.get("amount")
+        if not isinstance(amount, int) or amount < 1000:
+            return JSONResponse({"amount": ["Amount should be greater than Rs. 10, that is 1000 paisa."]}, status_code=400)
+        if not body.get("return_url") or not body.get("purchase_order_id"):
+            return JSONResponse({"detail": "return_url and purchase_order_id are required"}, status_code=400)
+
+        pidx = uuid.uuid4().hex[:22]
+        expires_at = _now() + timedelta(minutes=30)
+        with state.lock:
+            state.khalti[pidx] = {
+                "pidx": pidx,
+                "total_amount": amount,
+                "return_url": body["return_url"],
+                "purchase_order_id": body["purchase_order_id"],
+                "purchase_order_name": body.get("purchase_order_name", ""),
+                "status": "Initiated",
+                "transaction_id": None,
+                "expires_at": expires_at,
+            }
+        return {
+            "pidx": pidx,
+            "payment_url": f"{state.config.public_url}/khalti/pay/{pidx}",
+            "expires_at": expires_at.isoformat(),
+            "expires_in": 1800,
+        }
+
+    @sim.get("/khalti/pay/{pidx}")
+    async def khalti_pay(pidx: str):
+        """The customer's trip through the Khalti page: pay (or cancel) and bounce back."""
+        with state.lock:
+            payment = state.khalti.get(pidx)
+        if payment is None:
+            return JSONResponse({"detail": "Not found."}, status_code=404)
+        if payment["expires_at"] < _now():
+            payment["status"] = "Expired"
+        elif payment["status"] == "Initiated":
+            if state.chance(state.config.decline_rate):
+                payment["status"] = "User canceled"
+            else:
+                payment["status"] = "Completed"
+                payment["transaction_id"] = uuid.uuid4().hex[:22].upper()
+        params = {
+            "pidx": pidx,
+            "status": payment["status"],
+            "transaction_id": payment["transaction_id"] or "",
+            "tidx": payment["transaction_id"] or "",
+            "amount": payment["total_amount"],
+            "total_amount": payment["total_amount"],
+            "mobile": "98XXXXX000",
+            "purchase_order_id": payment["purchase_order_id"],
+            "purchase_order_name": payment["purchase_order_name"],
+        }
+        return RedirectResponse(_with_query(payment["return_url"], params), status_code=302)
+
+    @sim.post("/api/v2/epayment/lookup/")
+    async def khalti_lookup(request: Request):
+        if (failure := await behave("khalti.lookup")) is not None:
+            return failure
+        if (failure := khalti_unauthorized(request)) is not None:
+            return failure
+        body = await request.json()
+        with state.lock:
+            payment = state.khalti.get(str(body.get("pidx") or ""))
+        if payment is None:
+            return JSONResponse({"detail": "Not found.", "error_key": "validation_error"}, status_code=404)
+        if payment["status"] == "Initiated" and payment["expires_at"] < _now():
+            payment["status"] = "Expired"
+
+        status = payment["status"]
+        if status == "Completed" and state.chance(state.config.pending_rate):
+            status = "Pending"
+        total_amount = payment["total_amount"]
+        if state.chance(state.config.amount_mismatch_rate):
+            total_amount += 100
+        return {
+            "pidx": payment["pidx"],
+            "total_amount": total_amount,
+            "status": status,
+            "transaction_id": payment["transaction_id"],
+            "fee": 0,
+            "refunded": False,
+        }
+
+    # ------------------------------------------------------------------- eSewa
+
+    @sim.post("/api/epay/main/v2/form")
+    async def esewa_form(request: Request):
+        if (failure := await behave("esewa.form")) is not None:
+            return failure
+        # Browser form post; parsed by hand so the simulator needs no multipart dependency.
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode("utf-8")).items()}
+        required = ("total_amount", "transaction_uuid", "product_code", "success_url", "failure_url", "signature")
+        if any(not form.get(name) for name in required):
+            return JSONResponse({"detail": f"Missing fields; required: {', '.join(required)}"}, status_code=400)
+        if form["product_code"] != state.config.esewa_product_code:
+            return JSONResponse({"detail": "Invalid product code"}, status_code=400)
+        expected = _esewa_signature(_signed_message(form), state.config.esewa_secret_key)
+        if not hmac.compare_digest(form["signature"], expected):
+            return JSONResponse({"detail": "Invalid payload signature"}, status_code=400)
+
+        transaction_uuid = form["transaction_uuid"]
+        if state.chance(state.config.decline_rate):
+            with state.lock:
+                state.esewa[transaction_uuid] = {"status": "CANCELED", "total_amount": form["total_amount"], "ref_id": None}
+            return RedirectResponse(form["failure_url"], status_code=302)
+
+        ref_id = uuid.uuid4().hex[:10].upper()
+        with state.lock:
+            state.esewa[transaction_uuid] = {"status": "COMPLETE", "total_amount": form["total_amount"], "ref_id": ref_id}
+        total_amount = form["total_amount"]
+        if state.chance(state.config.amount_mismatch_rate):
+            total_amount = f"{float(total_amount) + 1:.2f}"
+        response = {
+            "transaction_code": ref_id,
+            "status": "COMPLETE",
+            "total_amount": total_amount,
+            "transaction_uuid": transaction_uuid,
+            "product_code": form["product_code"],
+            "signed_field_names": "transaction_code,status,total_amount,transaction_uuid,product_code,signed_field_names",
+        }
+        response["signature"] = _esewa_signature(_signed_message(response), state.config.esewa_secret_key)
+        data = base64.b64encode(json.dumps(response).encode("utf-8")).decode("utf-8")
+        return RedirectResponse(_with_query(form["success_url"], {"data": data}), status_code=302)
+
+    @sim.get("/api/epay/transaction/status/")
+    async def esewa_status(product_code: str, total_amount: str, transaction_uuid: str):
+        if (failure := await behave("esewa.status")) is not None:
+            return failure
+        with state.lock:
+            payment = state.esewa.get(transaction_uuid)
+        not_found = {
+            "product_code": product_code,
+            "transaction_uuid": transaction_uuid,
+            "total_amount": total_amount,
+            "status": "NOT_FOUND",
+            "ref_id": None,
+        }
+        if payment is None or product_code != state.config.esewa_product_code:
+            return not_found
+        if f"{float(payment['total_amount']):.2f}" != f"{float(total_amount):.2f}":
+            return not_found
+
+        status = payment["status"]
+        if status == "COMPLETE" and state.chance(state.config.pending_rate):
+            status = "PENDING"
+        return {**not_found, "status": status, "ref_id": payment["ref_id"]}
+
+    # ----------------------------------------------------------------- control
+
+    @sim.get("/__sim/config")
+    def get_config():
+        return asdict(state.config)
+
+    @sim.put("/__sim/config")
+    async def update_config(request: Request):
+        changes = await request.json()
+        known = {item.name for item in fields(SimulatorConfig)}
+        unknown = sorted(set(changes) - known)
+        if unknown:
+            return JSONResponse({"detail": f"Unknown setting(s): {', '.join(unknown)}"}, status_code=400)
+        try:
+            state.apply(SimulatorConfig(**{**asdict(state.config), **changes}))
+        except ValueError as exc:
+            return JSONResponse({"detail": str(exc)}, status_code=400)
+        return asdict(state.config)
+
+    @sim.get("/__sim/stats")
+    def get_stats():
+        with state.lock:
+            khalti_statuses, esewa_statuses = {}, {}
+            for payment in state.khalti.values():
+                khalti_statuses[payment["status"]] = khalti_statuses.get(payment["status"], 0) + 1
+            for payment in state.esewa.values():
+                esewa_statuses[payment["status"]] = esewa_statuses.get(payment["status"], 0) + 1
+            return {
+                "endpoints": {name: stats.snapshot() for name, stats in state.stats.items()},
+                "khalti_payments": khalti_statuses,
+                "esewa_payments": esewa_statuses,
+            }
+
+    @sim.post("/__sim/reset")
+    def reset():
+        with state.lock:
+            state.khalti.clear()
+            state.esewa.clear()
+            state.stats.clear()
+        return {"reset": True}
+
+    return sim
+
+
+app = create_app()
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="python -m app.simulator.gateway", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default=SimulatorConfig.latency, help="e.g. fixed:50, uniform:20-200, lognormal:120,0.5")
+    parser.add_argument("--error-rate", type=float, default=SimulatorConfig.error_rate)
+    parser.add_argument("--hang-rate", type=float, default=SimulatorConfig.hang_rate)
+    parser.add_argument("--hang-seconds", type=float, default=SimulatorConfig.hang_seconds)
+    parser.add_argument("--decline-rate", type=float, default=SimulatorConfig.decline_rate)
+    parser.add_argument("--pending-rate", type=float, default=SimulatorConfig.pending_rate)
+    parser.add_argument("--amount-mismatch-rate", type=float, default=SimulatorConfig.amount_mismatch_rate)
+    parser.add_argument("--seed", type=int, help="seed the RNG for repeatable runs")
+    args = parser.parse_args(argv)
+
+    parse_latency(args.latency)
+    config = SimulatorConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        decline_rate=args.decline_rate,
+        pending_rate=args.pending_rate,
+        amount_mismatch_rate=args.amount_mismatch_rate,
+        public_url=os.getenv("SIM_PUBLIC_URL", f"http://{args.host}:{args.port}"),
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""Test setup: a throwaway SQLite primary plus two SQLite files acting as read replicas.
+
+Settings are read from the environment at import time, so they are set here before
+anything under ``app`` is imported. Background workers are off; tests drive them.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_TMP = Path(tempfile.mkdtemp(prefix="ticket_nepal_tests_"))
+PRIMARY_PATH = _TMP / "primary.db"
+REPLICA_PATHS = [_TMP / "replica_a.db", _TMP / "replica_b.db"]
+
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{PRIMARY_PATH}",
+    DATABASE_READ_URLS=",".join(f"sqlite:///{path}" for path in REPLICA_PATHS),
+    SQLITE_PERF_MODE="true",
+    BACKGROUND_JOBS_ENABLED="false",
+    PAYMENT_VERIFY_WORKERS="0",
+    EMAIL_WORKER_ENABLED="false",
+    PDF_RENDER_PROCESSES="0",
+    PDF_CACHE_DIR=str(_TMP / "pdf_cache"),
+)
+
+
+def sync_replicas() -> None:
+    """Copy the primary into every replica file, like replication catching up."""
+    with sqlite3.connect(PRIMARY_PATH) as source:
+        for path in REPLICA_PATHS:
+            with sqlite3.connect(path) as target:
+                source.backup(target)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        sync_replicas()
+        yield test_client
+    shutil.rmtree(_TMP, ignore_errors=True)
@@ -0,0 +1,50 @@
+from datetime import date, datetime
+
+from app.config.database import get_session
+from app.model.models import Booking
+from app.services.admin_service import get_admin_analytics, list_admin_bookings
+from app.services.archive_service import archive_old_bookings
+from app.services.superadmin_service import get_superadmin_analytics
+from tests.conftest import sync_replicas
+
+OLD_JOURNEY = date(2001, 3, 4)
+
+
+def _analytics() -> tuple[dict, dict]:
+    sync_replicas()
+    return get_admin_analytics(), get_superadmin_analytics()
+
+
+def test_analytics_totals_survive_archiving(client):
+    with get_session() as db:
+        db.add(
+            Booking(
+                user_id=1,
+                schedule_id=1,
+                booking_reference="BK-ARCHIVE-1",
+                journey_date=OLD_JOURNEY,
+                number_of_seats=3,
+                total_amount=4500,
+                booking_status="completed",
+                payment_status="paid",
+                passenger_name="Archived Passenger",
+                passenger_phone="9800000001",
+                created_at=datetime(2001, 3, 1),
+            )
+        )
+        db.commit()
+    admin_before, superadmin_before = _analytics()
+
+    archived = archive_old_bookings(cutoff=date(2001, 12, 31))
+    assert archived["bookings"] == 1
+    admin_after, superadmin_after = _analytics()
+
+    for key in ("total_bookings", "completed_bookings", "total_revenue", "booked_seats", "occupancy_rate"):
+        assert admin_after[key] == admin_before[key], key
+    for key in ("total_bookings", "total_booked_seats", "total_revenue"):
+        assert superadmin_after[key] == superadmin_before[key], key
+
+    # The booking list is explicitly live-only unless the range reaches into the archive.
+    assert "BK-ARCHIVE-1" not in {item["booking_reference"] for item in list_admin_bookings()}
+    history = list_admin_bookings(journey_from=OLD_JOURNEY, journey_to=OLD_JOURNEY)
+    assert [item["booking_reference"] for item in history] == ["BK-ARCHIVE-1"]
@@ -0,0 +1,87 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.config.database import get_session
+from app.constants import BOOKING_STATUS_CONFIRMED
+from app.model.models import Booking, Bus, BusSchedule
+from app.services.booking_service import complete_finished_bookings
+
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+# Local wall-clock "now" for the job: early morning, after some overnight trips got in.
+NOW = datetime.combine(TODAY, time(6, 0))
+
+SCHEDULES = {
+    "overnight": (time(22, 0), time(5, 0)),
+    "late_overnight": (time(22, 0), time(7, 0)),
+    "daytime": (time(8, 0), time(12, 0)),
+}
+
+
+def _schedules(db) -> dict[str, int]:
+    bus = Bus(bus_number="COMPLETE-1", bus_type="Deluxe", total_seats=4, is_active=True)
+    db.add(bus)
+    db.flush()
+    schedules = {
+        name: BusSchedule(bus_id=bus.bus_id, departure_time=departure, arrival_time=arrival, price=700, is_active=True)
+        for name, (departure, arrival) in SCHEDULES.items()
+    }
+    db.add_all(schedules.values())
+    db.flush()
+    return {name: schedule.schedule_id for name, schedule in schedules.items()}
+
+
+def _booking(db, schedule_id: int, journey_date: date, reference: str) -> int:
+    booking = Booking(
+        user_id=1,
+        schedule_id=schedule_id,
+        booking_reference=reference,
+        journey_date=journey_date,
+        number_of_seats=1,
+        total_amount=700,
+        booking_status=BOOKING_STATUS_CONFIRMED,
+        payment_status="paid",
+        passenger_name="Completion Passenger",
+        passenger_phone="9800000003",
+        created_at=NOW - timedelta(days=3),
+    )
+    db.add(booking)
+    db.flush()
+    return booking.booking_id
+
+
+def test_completion_follows_arrival_across_midnight(client):
+    with get_session() as db:
+        schedules = _schedules(db)
+        bookings = {
+            "overnight_yesterday": _booking(db, schedules["overnight"], YESTERDAY, "BK-DONE-1"),
+            "overnight_today": _booking(db, schedules["overnight"], TODAY, "BK-DONE-2"),
+            "late_overnight_yesterday": _booking(db, schedules["late_overnight"], YESTERDAY, "BK-DONE-3"),
+            "daytime_yesterday": _booking(db, schedules["daytime"], YESTERDAY, "BK-DONE-4"),
+            "daytime_today": _booking(db, schedules["daytime"], TODAY, "BK-DONE-5"),
+            "daytime_two_days_ago": _booking(db, schedules["daytime"], TODAY - timedelta(days=2), "BK-DONE-6"),
+        }
+        db.commit()
+
+    complete_finished_bookings(now=NOW)
+
+    with get_session() as db:
+        rows = {
+            booking_id: (status, updated_at)
+            for booking_id, status, updated_at in db.execute(
+                select(Booking.booking_id, Booking.booking_status, Booking.updated_at).where(
+                    Booking.booking_id.in_(bookings.values())
+                )
+            )
+        }
+    completed = {name for name, booking_id in bookings.items() if rows[booking_id][0] == "completed"}
+    assert completed == {"overnight_yesterday", "daytime_yesterday", "daytime_two_days_ago"}
+
+    # updated_at is the real UTC write time, not the local "now" used for the arrival check.
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for name in completed:
+        updated_at = rows[bookings[name]][1].replace(tzinfo=None)
+        assert abs((utc_now - updated_at).total_seconds()) < 60, name
+    for name in set(bookings) - completed:
+        assert rows[bookings[name]][1] is None, name
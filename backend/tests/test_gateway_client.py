@@ -0,0 +1,126 @@
+import time
+
+import pytest
+import requests
+
+from app.services import gateway_client
+from app.services.gateway_client import GatewayClient, GatewayTimeout, GatewayUnavailable
+
+COOLDOWN_SECONDS = 0.05
+
+
+class _Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class _Session:
+    """Stands in for requests.Session; plays back the queued outcomes in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if callable(outcome):
+            return outcome(timeout)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return _Response(outcome)
+
+
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch):
+    monkeypatch.setattr(gateway_client, "GATEWAY_BACKOFF_SECONDS", 0.001)
+    monkeypatch.setattr(gateway_client, "GATEWAY_RETRIES", 2)
+
+
+def _client(*outcomes, budget_seconds: float = 2.0, failure_threshold: int = 2) -> GatewayClient:
+    client = GatewayClient("test", budget_seconds)
+    client.breaker.failure_threshold = failure_threshold
+    client.breaker.cooldown_seconds = COOLDOWN_SECONDS
+    client._session = _Session(*outcomes)
+    return client
+
+
+def _open(client: GatewayClient) -> None:
+    for _ in range(client.breaker.failure_threshold):
+        client.get("https://gateway.test/lookup")
+    assert client.breaker.state == "open"
+
+
+def test_breaker_opens_then_fails_fast():
+    client = _client(500)
+    _open(client)
+
+    calls = client._session.calls
+    with pytest.raises(GatewayUnavailable):
+        client.get("https://gateway.test/lookup")
+    assert client._session.calls == calls
+    assert client.breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    client = _client(500)
+    _open(client)
+    time.sleep(COOLDOWN_SECONDS)
+    assert client.breaker.state == "half_open"
+
+    client.get("https://gateway.test/lookup")
+    assert client.breaker.state == "open"
+
+    time.sleep(COOLDOWN_SECONDS)
+    client._session.outcomes = [200]
+    assert client.get("https://gateway.test/lookup").status_code == 200
+    assert client.breaker.snapshot()["state"] == "closed"
+    assert client.breaker.snapshot()["consecutive_failures"] == 0
+
+
+@pytest.mark.parametrize("error", [KeyboardInterrupt(), ValueError("bad body")])
+def test_trial_ending_in_an_unexpected_exception_still_settles_the_breaker(error):
+    client = _client(500)
+    _open(client)
+    time.sleep(COOLDOWN_SECONDS)
+
+    client._session.outcomes = [error]
+    with pytest.raises(type(error)):
+        client.get("https://gateway.test/lookup")
+    assert client.breaker.state == "open"
+
+    time.sleep(COOLDOWN_SECONDS)
+    client._session.outcomes = [200]
+    client.get("https://gateway.test/lookup")
+    assert client.breaker.state == "closed"
+
+
+def test_only_idempotent_calls_retry_gateway_errors():
+    initiate = _client(503, 200, failure_threshold=10)
+    assert initiate.post("https://gateway.test/initiate").status_code == 503
+    assert initiate._session.calls == 1
+
+    lookup = _client(503, 200, failure_threshold=10)
+    assert lookup.post("https://gateway.test/lookup", idempotent=True).status_code == 200
+    assert lookup._session.calls == 2
+    assert lookup.snapshot()["retries"] == 1
+
+
+def test_unsent_requests_retry_even_when_not_idempotent():
+    client = _client(requests.ConnectionError("refused"), 200, failure_threshold=10)
+    assert client.post("https://gateway.test/initiate").status_code == 200
+    assert client._session.calls == 2
+
+
+def test_budget_caps_the_whole_call():
+    def slow(timeout):
+        time.sleep(timeout[1])
+        raise requests.Timeout("read timed out")
+
+    client = _client(slow, budget_seconds=0.3, failure_threshold=10)
+    started = time.monotonic()
+    with pytest.raises((GatewayTimeout, requests.Timeout)):
+        client.get("https://gateway.test/lookup", idempotent=True)
+
+    assert time.monotonic() - started < 0.3 + 0.1
+    assert client.snapshot()["failures"] == 1
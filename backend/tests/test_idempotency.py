@@ -0,0 +1,59 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from app.api.idempotency import REPLAY_HEADER
+from app.config.database import get_session
+from app.model.models import Bus, BusSchedule, BusSeat
+
+TRIP_PRICE = 1000.0
+
+
+@pytest.fixture(scope="module")
+def trip_id(client) -> int:
+    with get_session() as db:
+        bus = Bus(bus_number="IDEM-1", bus_type="Deluxe", total_seats=3, is_active=True)
+        db.add(bus)
+        db.flush()
+        db.add_all(
+            BusSeat(bus_id=bus.bus_id, seat_label=f"G{col + 1}", row_index=0, col_index=col, is_active=True)
+            for col in range(3)
+        )
+        schedule = BusSchedule(
+            bus_id=bus.bus_id, departure_time=time(6, 0), arrival_time=time(12, 0), price=TRIP_PRICE, is_active=True
+        )
+        db.add(schedule)
+        db.commit()
+        return schedule.schedule_id
+
+
+def _order_payload(trip_id: int, seat: str) -> dict:
+    journey_date = date.today() + timedelta(days=9)
+    return {
+        "user_id": 1,
+        "trip_id": trip_id,
+        "journey_date": journey_date.isoformat(),
+        "seat_labels": [seat],
+        "amount": TRIP_PRICE,
+    }
+
+
+def test_repeated_key_replays_the_first_response(client, trip_id):
+    headers = {"Idempotency-Key": "order-G1"}
+    first = client.post("/api/payments/create-order", json=_order_payload(trip_id, "G1"), headers=headers)
+    repeat = client.post("/api/payments/create-order", json=_order_payload(trip_id, "G1"), headers=headers)
+
+    assert first.status_code == 200, first.text
+    assert REPLAY_HEADER not in first.headers
+    assert repeat.status_code == 200
+    assert repeat.headers[REPLAY_HEADER] == "true"
+    assert repeat.json() == first.json()
+
+
+def test_key_reused_for_a_different_request_is_rejected(client, trip_id):
+    headers = {"Idempotency-Key": "order-G2"}
+    first = client.post("/api/payments/create-order", json=_order_payload(trip_id, "G2"), headers=headers)
+    assert first.status_code == 200, first.text
+
+    response = client.post("/api/payments/create-order", json=_order_payload(trip_id, "G3"), headers=headers)
+    assert response.status_code == 422
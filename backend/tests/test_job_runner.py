@@ -0,0 +1,106 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.config.database import get_session
+from app.jobs import runner
+from app.jobs.runner import Job, release_lease, try_acquire_lease
+from app.model.models import JobLease
+
+
+def _lease(name: str) -> JobLease:
+    with get_session() as db:
+        lease = db.get(JobLease, name)
+        db.expunge(lease)
+        return lease
+
+
+def test_only_one_owner_holds_a_lease(client):
+    assert try_acquire_lease("test-compete", owner="worker-a", ttl_seconds=60)
+    assert not try_acquire_lease("test-compete", owner="worker-b", ttl_seconds=60)
+    assert _lease("test-compete").owner == "worker-a"
+
+
+def test_current_owner_renews_its_lease(client):
+    assert try_acquire_lease("test-renew", owner="worker-a", ttl_seconds=5)
+    first_expiry = _lease("test-renew").expires_at
+
+    assert try_acquire_lease("test-renew", owner="worker-a", ttl_seconds=60)
+    assert _lease("test-renew").expires_at > first_expiry + timedelta(seconds=50)
+
+
+def test_expired_lease_is_taken_over(client):
+    assert try_acquire_lease("test-expiry", owner="worker-a", ttl_seconds=60)
+    with get_session() as db:
+        db.execute(
+            update(JobLease)
+            .where(JobLease.name == "test-expiry")
+            .values(expires_at=runner._utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+
+    assert try_acquire_lease("test-expiry", owner="worker-b", ttl_seconds=60)
+    assert not try_acquire_lease("test-expiry", owner="worker-a", ttl_seconds=60)
+
+
+def test_release_hands_the_lease_over(client):
+    assert try_acquire_lease("test-release", owner="worker-a", ttl_seconds=60)
+    release_lease("test-release", owner="worker-b")
+    assert not try_acquire_lease("test-release", owner="worker-b", ttl_seconds=60)
+
+    release_lease("test-release", owner="worker-a")
+    assert try_acquire_lease("test-release", owner="worker-b", ttl_seconds=60)
+
+
+def test_failing_job_records_failures_and_last_error():
+    outcomes = [ValueError("sweep broke"), {"swept": 3}]
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    job = Job(name="flaky", func=flaky, interval_seconds=30)
+    runner._run_job(job)
+    snapshot = job.snapshot()
+    assert (snapshot["runs"], snapshot["failures"]) == (1, 1)
+    assert snapshot["last_error"] == "ValueError: sweep broke"
+    assert snapshot["running"] is False and snapshot["next_run_in_seconds"] > 0
+
+    runner._run_job(job)
+    snapshot = job.snapshot()
+    assert (snapshot["runs"], snapshot["failures"]) == (2, 1)
+    assert snapshot["last_error"] is None and snapshot["last_result"] == {"swept": 3}
+
+
+def test_stop_keeps_the_lease_until_the_running_job_returns(client, monkeypatch):
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_job():
+        started.set()
+        finish.wait(5)
+
+    job = Job(name="slow", func=slow_job, interval_seconds=3600)
+    monkeypatch.setattr(runner, "BACKGROUND_JOBS_ENABLED", True)
+    monkeypatch.setattr(runner, "JOB_TICK_SECONDS", 0.01)
+    monkeypatch.setattr(runner, "_jobs", {"slow": job})
+    runner.start_jobs()
+    thread = runner._thread
+    try:
+        assert started.wait(5)
+
+        runner.stop_jobs(timeout=0.1)
+        assert thread.is_alive()
+        assert _lease(runner.LEASE_NAME).owner == runner.WORKER_ID
+        assert runner.get_job_stats()["running"] is True
+    finally:
+        finish.set()
+        thread.join(5)
+
+    assert not thread.is_alive()
+    assert _lease(runner.LEASE_NAME).owner is None
+    runner.stop_jobs()
+    assert runner._thread is None
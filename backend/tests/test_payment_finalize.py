@@ -0,0 +1,101 @@
+import threading
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config.database import get_session
+from app.model.models import Booking, Bus, BusSchedule, BusSeat, PaymentOrder
+from app.services import payment_order_service
+from tests.conftest import sync_replicas
+
+JOURNEY_DATE = date.today() + timedelta(days=15)
+VERIFIERS = 6
+
+
+@pytest.fixture(scope="module")
+def trip_id(client) -> int:
+    with get_session() as db:
+        bus = Bus(bus_number="FINAL-1", bus_type="Deluxe", total_seats=2, is_active=True)
+        db.add(bus)
+        db.flush()
+        db.add_all(
+            BusSeat(bus_id=bus.bus_id, seat_label=f"F{col + 1}", row_index=1, col_index=col + 1, is_active=True)
+            for col in range(2)
+        )
+        schedule = BusSchedule(bus_id=bus.bus_id, departure_time=time(8, 0), arrival_time=time(14, 0), price=900, is_active=True)
+        db.add(schedule)
+        db.commit()
+        return schedule.schedule_id
+
+
+def _order(trip_id: int, seat: str, pidx: str) -> int:
+    now = payment_order_service._now_utc()
+    with get_session() as db:
+        order = PaymentOrder(
+            user_id=1,
+            trip_id=trip_id,
+            journey_date=JOURNEY_DATE,
+            seats=seat,
+            amount=900,
+            status="pending",
+            pidx=pidx,
+            expires_at=now + timedelta(minutes=20),
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(order)
+        db.commit()
+        return order.id
+
+
+def _run_together(calls) -> list:
+    results = [None] * len(calls)
+    barrier = threading.Barrier(len(calls))
+
+    def run(index, call):
+        barrier.wait()
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(index, call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _bookings_for_seat_day(trip_id: int) -> int:
+    with get_session() as db:
+        return db.execute(
+            select(func.count(Booking.booking_id)).where(Booking.schedule_id == trip_id, Booking.journey_date == JOURNEY_DATE)
+        ).scalar_one()
+
+
+def test_concurrent_verifies_of_one_order_book_it_once(client, trip_id, monkeypatch):
+    monkeypatch.setattr(payment_order_service, "PAYMENT_MOCK_MODE", True)
+    order_id = _order(trip_id, "F1", "PIDX-FINAL-SAME")
+    sync_replicas()
+
+    results = _run_together(
+        [lambda: payment_order_service.verify_khalti_and_create_booking(order_id, "PIDX-FINAL-SAME", "Completed")]
+        * VERIFIERS
+    )
+
+    assert all(error_key is None for _, error_key in results), results
+    assert len({result["booking_id"] for result, _ in results}) == 1
+    assert _bookings_for_seat_day(trip_id) == 1
+
+
+def test_two_orders_for_one_seat_end_paid_and_seat_booked(client, trip_id):
+    order_ids = [_order(trip_id, "F2", f"PIDX-FINAL-RACE-{index}") for index in range(2)]
+
+    results = _run_together(
+        [lambda order_id=order_id: payment_order_service.finalize_paid_order(order_id, "khalti", f"REF-{order_id}") for order_id in order_ids]
+    )
+
+    assert sorted(error_key or "paid" for _, error_key in results) == ["paid", "seat_booked"]
+    with get_session() as db:
+        orders = db.execute(select(PaymentOrder.status, PaymentOrder.failure_reason).where(PaymentOrder.id.in_(order_ids))).all()
+    assert sorted(map(tuple, orders)) == [("failed", "seat_booked"), ("paid", None)]
+    assert _bookings_for_seat_day(trip_id) == 2
@@ -0,0 +1,158 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.config.database import get_session
+from app.model.models import PaymentOrder, PaymentVerification
+from app.services import payment_verification_service as verifications
+from app.services.payment_verification_service import (
+    PAYMENT_VERIFY_BACKOFF_SECONDS,
+    PAYMENT_VERIFY_MAX_ATTEMPTS,
+    claim_due_verifications,
+    enqueue_verification,
+    process_verification,
+)
+from tests.conftest import sync_replicas
+
+
+@pytest.fixture(autouse=True)
+def _empty_queue(client):
+    with get_session() as db:
+        db.execute(delete(PaymentVerification))
+        db.commit()
+
+
+def _order(user_id: int = 1) -> int:
+    now = verifications._now_utc()
+    with get_session() as db:
+        order = PaymentOrder(
+            user_id=user_id,
+            trip_id=1,
+            journey_date=date.today() + timedelta(days=12),
+            seats="H1",
+            amount=1200,
+            status="pending",
+            expires_at=now + timedelta(minutes=20),
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(order)
+        db.commit()
+        return order.id
+
+
+def _row(verification_id: int) -> PaymentVerification:
+    with get_session() as db:
+        row = db.get(PaymentVerification, verification_id)
+        db.expunge(row)
+        return row
+
+
+def _gateway_says(monkeypatch, result, error_key):
+    monkeypatch.setattr(verifications, "_run_gateway_verification", lambda row: (result, error_key))
+
+
+def test_duplicate_callbacks_share_one_queue_row(client):
+    order_id = _order()
+    first, _ = enqueue_verification(order_id, "khalti", {"pidx": "PIDX-DUP", "mock_status": None})
+    repeat, _ = enqueue_verification(order_id, "khalti", {"pidx": "PIDX-DUP", "mock_status": "Completed"})
+    client.get("/api/payments/khalti/verify", params={"order_id": order_id, "pidx": "PIDX-DUP"}, follow_redirects=False)
+
+    assert repeat["verification_id"] == first["verification_id"]
+    with get_session() as db:
+        assert len(db.execute(select(PaymentVerification.id)).all()) == 1
+
+
+def test_concurrent_workers_never_claim_the_same_row():
+    for index in range(6):
+        enqueue_verification(_order(), "khalti", {"pidx": f"PIDX-CAS-{index}", "mock_status": None})
+
+    claims: dict[str, list[int]] = {}
+    barrier = threading.Barrier(3)
+
+    def worker(name: str):
+        barrier.wait()
+        claims[name] = claim_due_verifications(name, limit=6)
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{index}",)) for index in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [verification_id for ids in claims.values() for verification_id in ids]
+    assert len(claimed) == 6 and len(set(claimed)) == 6
+    # Held rows are not handed out again while their lock is live.
+    assert claim_due_verifications("worker-late", limit=6) == []
+
+
+def test_expired_lock_is_reclaimed():
+    verification, _ = enqueue_verification(_order(), "khalti", {"pidx": "PIDX-STALE", "mock_status": None})
+    assert claim_due_verifications("worker-dead", limit=1) == [verification["verification_id"]]
+    with get_session() as db:
+        db.execute(
+            update(PaymentVerification)
+            .where(PaymentVerification.id == verification["verification_id"])
+            .values(locked_until=verifications._now_utc() - timedelta(seconds=1))
+        )
+        db.commit()
+
+    assert claim_due_verifications("worker-new", limit=1) == [verification["verification_id"]]
+    row = _row(verification["verification_id"])
+    assert (row.locked_by, row.attempts) == ("worker-new", 2)
+    # The dead worker's late result no longer lands.
+    sync_replicas()
+    assert process_verification(verification["verification_id"], "worker-dead") == "skipped"
+
+
+def test_transient_failure_retries_with_backoff_then_gives_up(monkeypatch):
+    verification, _ = enqueue_verification(_order(), "khalti", {"pidx": "PIDX-RETRY", "mock_status": None})
+    verification_id = verification["verification_id"]
+    _gateway_says(monkeypatch, None, "network")
+
+    delays = []
+    for attempt in range(1, PAYMENT_VERIFY_MAX_ATTEMPTS + 1):
+        with get_session() as db:
+            db.execute(
+                update(PaymentVerification)
+                .where(PaymentVerification.id == verification_id)
+                .values(next_attempt_at=verifications._now_utc())
+            )
+            db.commit()
+        assert claim_due_verifications("worker", limit=1) == [verification_id]
+        sync_replicas()
+        state = process_verification(verification_id, "worker")
+        row = _row(verification_id)
+        if attempt < PAYMENT_VERIFY_MAX_ATTEMPTS:
+            assert state == "queued"
+            delays.append((row.next_attempt_at - row.updated_at).total_seconds())
+        else:
+            assert state == "failed"
+    assert row.attempts == PAYMENT_VERIFY_MAX_ATTEMPTS and row.error_key == "network"
+    assert delays[:3] == pytest.approx([PAYMENT_VERIFY_BACKOFF_SECONDS * factor for factor in (1, 2, 4)])
+    assert delays == sorted(delays)
+
+
+def test_definite_failure_is_not_retried(monkeypatch):
+    verification, _ = enqueue_verification(_order(), "khalti", {"pidx": "PIDX-BAD", "mock_status": None})
+    _gateway_says(monkeypatch, None, "seat_booked")
+    claim_due_verifications("worker", limit=1)
+    sync_replicas()
+
+    assert process_verification(verification["verification_id"], "worker") == "failed"
+    assert _row(verification["verification_id"]).attempts == 1
+
+
+def test_verification_status_is_only_visible_to_the_order_owner(client):
+    order_id = _order(user_id=1)
+    verification, _ = enqueue_verification(order_id, "khalti", {"pidx": "PIDX-OWNER", "mock_status": None})
+    sync_replicas()
+    url = f"/api/payments/orders/{order_id}/verification"
+
+    assert client.get(url).status_code == 422
+    assert client.get(url, params={"user_id": 2}).status_code == 404
+    response = client.get(url, params={"user_id": 1, "verification_id": verification["verification_id"]})
+    assert response.status_code == 200
+    assert response.json()["verification"]["verification_id"] == verification["verification_id"]
@@ -0,0 +1,35 @@
+import re
+
+import pytest
+
+from app.cli.pdf_benchmark import SAMPLES
+from app.services.pdf_service import LOGO_PATH, render_document
+
+
+def _objects(pdf: bytes) -> dict[int, bytes]:
+    """Check the xref table points at every object and return the objects by number."""
+    assert pdf.startswith(b"%PDF-")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    startxref = int(re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref")
+
+    objects = {}
+    for number, offset in enumerate(re.findall(rb"^(\d{10}) 00000 n", pdf[startxref:], re.MULTILINE), start=1):
+        header = re.match(rb"(\d+) 0 obj", pdf[int(offset):])
+        assert header is not None and int(header.group(1)) == number
+        objects[number] = pdf[int(offset): pdf.index(b"endobj", int(offset))]
+    return objects
+
+
+@pytest.mark.skipif(not LOGO_PATH.exists(), reason="logo asset not checked out")
+@pytest.mark.parametrize("kind", ["ticket_pdf", "refund_receipt_pdf"])
+def test_documents_render_valid_pdfs_with_the_logo(kind):
+    # Twice: later renders reuse the shared logo object and must still embed it.
+    for _ in range(2):
+        objects = _objects(render_document(kind, SAMPLES[kind]))
+        images = [body for body in objects.values() if b"/Subtype /Image" in body]
+        assert len(images) == 2  # the logo and its alpha mask
+        [logo] = [body for body in images if b"/SMask" in body]
+        mask = int(re.search(rb"/SMask (\d+) 0 R", logo).group(1))
+        assert b"/Subtype /Image" in objects[mask]
+        assert any(re.search(rb"/XObject\s*<<[^>]*/FormXob", body) for body in objects.values())
@@ -0,0 +1,19 @@
+from datetime import date, timedelta
+
+from app.cli.query_plans import check_query_plans, hot_queries
+
+
+def test_hot_queries_use_an_index(client):
+    # init_db() (app startup) seeds routes, buses and schedules; add bookings on top.
+    journey_date = (date.today() + timedelta(days=3)).isoformat()
+    for seat in ("D1", "D2", "D3"):
+        response = client.post(
+            "/api/bookings",
+            json={"user_id": 1, "bus_id": 1, "journey_date": journey_date, "seats": 1, "seat_labels": [seat]},
+        )
+        assert response.status_code == 200, response.text
+
+    failures = check_query_plans()
+
+    assert len(hot_queries()) > 0
+    assert failures == [], "full table scans: " + "; ".join(f"{name}: {scans}" for name, scans in failures)
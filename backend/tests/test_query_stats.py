@@ -0,0 +1,130 @@
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.config.database import get_session
+from app.config.query_stats import DB_N_PLUS_ONE_THRESHOLD, assert_max_queries, warn_repeated_shapes
+from app.model.models import Booking, Bus, BusSchedule, Review, Route, User
+from tests.conftest import sync_replicas
+
+RIDES = 4
+
+
+def test_buffered_response_reports_query_count(client):
+    response = client.get("/api/bookings", params={"user_id": 1})
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Queries"]) > 0
+    assert "Server-Timing" in response.headers
+
+
+def test_streamed_response_logs_final_count_instead_of_headers(client, caplog):
+    journey_date = date.today() + timedelta(days=5)
+    booked = client.post(
+        "/api/bookings",
+        json={"user_id": 1, "bus_id": 1, "journey_date": journey_date.isoformat(), "seats": 1, "seat_labels": ["F1"]},
+    )
+    assert booked.status_code == 200, booked.text
+
+    with caplog.at_level(logging.INFO, logger="app.config.query_stats"):
+        response = client.get("/api/admin/manifests", params={"journey_date": journey_date.isoformat()})
+
+    assert response.status_code == 200
+    assert "F1" in response.text
+    # The CSV rows are queried while the body streams; a header count would miss them.
+    assert "X-DB-Queries" not in response.headers
+    assert "Server-Timing" not in response.headers
+    [message] = [r.getMessage() for r in caplog.records if "GET /api/admin/manifests streamed" in r.getMessage()]
+    assert int(re.search(r"(\d+) queries", message).group(1)) > 0
+
+
+@pytest.fixture(scope="module")
+def reviewer_id(client) -> int:
+    """A user with several completed rides on different buses and routes, each reviewed."""
+    with get_session() as db:
+        user = User(name="Query Budget", email="query.budget@example.com", role="user", is_active=True)
+        db.add(user)
+        db.flush()
+        for index in range(RIDES):
+            route = Route(
+                origin=f"Budget Origin {index}",
+                destination=f"Budget Destination {index}",
+                distance_km=100,
+                estimated_duration_minutes=180,
+                base_price=800,
+                is_active=True,
+            )
+            bus = Bus(bus_number=f"BUDGET-{index}", bus_type="Deluxe", total_seats=2, is_active=True)
+            db.add_all([route, bus])
+            db.flush()
+            schedule = BusSchedule(
+                bus_id=bus.bus_id, route_id=route.route_id, departure_time=time(7, 0), arrival_time=time(10, 0),
+                price=800, is_active=True,
+            )
+            db.add(schedule)
+            db.flush()
+            booking = Booking(
+                user_id=user.user_id,
+                schedule_id=schedule.schedule_id,
+                booking_reference=f"BK-BUDGET-{index}",
+                journey_date=date.today() - timedelta(days=index + 1),
+                number_of_seats=1,
+                total_amount=800,
+                booking_status="completed",
+                payment_status="paid",
+                passenger_name="Query Budget",
+                passenger_phone="9800000002",
+                created_at=datetime.now(),
+            )
+            db.add(booking)
+            db.flush()
+            db.add(Review(booking_id=booking.booking_id, user_id=user.user_id, rating=5, created_at=datetime.now()))
+        db.commit()
+        user_id = user.user_id
+    sync_replicas()
+    return user_id
+
+
+@pytest.mark.parametrize(
+    ("path", "max_queries", "key"),
+    [
+        ("/api/buses", 3, None),
+        ("/api/bookings", 2, None),
+        ("/api/reviews", 6, "reviews"),
+    ],
+)
+def test_list_endpoints_run_a_fixed_number_of_queries(client, reviewer_id, path, max_queries, key):
+    with assert_max_queries(max_queries):
+        response = client.get(path, params={"user_id": reviewer_id})
+
+    assert response.status_code == 200
+    items = response.json()[key] if key else response.json()
+    assert len(items) >= RIDES
+    if key == "reviews":
+        assert {item["ride"]["route"] for item in items} == {
+            f"Budget Origin {index} -> Budget Destination {index}" for index in range(RIDES)
+        }
+
+
+def test_repeated_statement_shape_is_reported(client, caplog):
+    with assert_max_queries(DB_N_PLUS_ONE_THRESHOLD * 2) as stats:
+        with get_session(readonly=True) as db:
+            for route_id in range(DB_N_PLUS_ONE_THRESHOLD + 1):
+                db.execute(select(Route).where(Route.route_id.in_(range(route_id + 1)))).all()
+
+    with caplog.at_level(logging.WARNING, logger="app.config.query_stats"):
+        warn_repeated_shapes(stats, "GET /loop")
+
+    # IN lists of different lengths still count as one shape.
+    [message] = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Possible N+1 in GET /loop")]
+    assert f"ran {DB_N_PLUS_ONE_THRESHOLD + 1} times" in message
+
+
+def test_query_budget_failure_names_the_repeated_statement(client):
+    with pytest.raises(AssertionError, match=r"Expected at most 1 queries, ran \d+:\n  3x SELECT"):
+        with assert_max_queries(1):
+            with get_session(readonly=True) as db:
+                for route_id in range(3):
+                    db.execute(select(Route).where(Route.route_id == route_id)).all()
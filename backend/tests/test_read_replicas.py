@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import database
+from app.config.database import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, get_session
+from app.model.models import Route
+from tests.conftest import REPLICA_PATHS, sync_replicas
+
+JOURNEY_DATE = (date.today() + timedelta(days=40)).isoformat()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_replicas(client):
+    sync_replicas()
+    database._replica_down_until[:] = [0.0] * len(database.read_engines)
+    client.cookies.clear()
+    yield
+    database._replica_down_until[:] = [0.0] * len(database.read_engines)
+
+
+def _tag_replicas():
+    # Give each replica a row only it has, to see which one served a read.
+    for index, read_engine in enumerate(database.read_engines):
+        with read_engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO routes (origin, destination, distance_km, estimated_duration_minutes, base_price, is_active) "
+                    "VALUES (:origin, 'Tag', 1, 1, 1, 1)"
+                ),
+                {"origin": f"replica-{index}"},
+            )
+
+
+def _served_by() -> str:
+    with get_session(readonly=True) as db:
+        origins = db.execute(select(Route.origin).where(Route.destination == "Tag")).scalars().all()
+    return origins[0] if origins else "primary"
+
+
+def _bad_replica():
+    missing = REPLICA_PATHS[0].parent / "missing" / "replica.db"
+    bind = create_engine(f"sqlite:///{missing}").execution_options(**{database.READONLY_OPTION: True})
+    return bind, create_async_engine(f"sqlite+aiosqlite:///{missing}")
+
+
+def _booking_ids(client, **kwargs) -> set[int]:
+    response = client.get("/api/bookings", params={"user_id": 1}, **kwargs)
+    assert response.status_code == 200, response.text
+    return {item["booking_id"] for item in response.json()}
+
+
+def _create_booking(client, seat: str) -> int:
+    response = client.post(
+        "/api/bookings",
+        json={"user_id": 1, "bus_id": 1, "journey_date": JOURNEY_DATE, "seats": 1, "seat_labels": [seat]},
+    )
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_reads_rotate_across_replicas():
+    _tag_replicas()
+    served = [_served_by() for _ in range(4)]
+    assert set(served) == {"replica-0", "replica-1"}
+    assert served[0] != served[1] and served[0] == served[2]
+
+
+def test_write_pins_the_client_to_the_primary(client):
+    response = _create_booking(client, "C1")
+    booking_id = response.json()["booking"]["booking_id"]
+    assert READ_PRIMARY_HEADER in response.headers
+    assert READ_PRIMARY_COOKIE in client.cookies
+
+    # The replicas have not caught up: a client without the marker does not see it yet...
+    assert booking_id not in _booking_ids(client, cookies={READ_PRIMARY_COOKIE: "0"})
+    # ...the writer (cookie kept by the client, whichever worker serves it) does,
+    assert booking_id in _booking_ids(client)
+    # and so does an API client echoing the header instead of keeping cookies.
+    client.cookies.clear()
+    assert booking_id in _booking_ids(client, headers={READ_PRIMARY_HEADER: response.headers[READ_PRIMARY_HEADER]})
+
+
+def test_reads_without_writes_set_no_marker(client):
+    response = client.get("/api/bookings", params={"user_id": 1})
+    assert response.status_code == 200
+    assert READ_PRIMARY_HEADER not in response.headers
+    assert READ_PRIMARY_COOKIE not in client.cookies
+
+
+@pytest.fixture
+def break_replica(monkeypatch):
+    bad_sync, bad_async = _bad_replica()
+
+    def _break(index: int):
+        monkeypatch.setattr(database, "replica_read_binds", list(database.replica_read_binds))
+        monkeypatch.setattr(database, "async_read_engines", list(database.async_read_engines))
+        database.replica_read_binds[index] = bad_sync
+        database.async_read_engines[index] = bad_async
+
+    return _break
+
+
+def test_failed_replica_falls_back(break_replica, client):
+    _tag_replicas()
+    break_replica(0)
+
+    assert {_served_by() for _ in range(4)} == {"replica-1"}
+    assert database._replica_down_until[0] > 0
+
+    # With every replica down, reads go to the primary (sync and async paths).
+    break_replica(1)
+    database._replica_down_until[:] = [0.0, 0.0]
+    assert _served_by() == "primary"
+    database._replica_down_until[:] = [0.0, 0.0]
+    booking_id = _create_booking(client, "C2").json()["booking"]["booking_id"]
+    client.cookies.clear()
+    assert booking_id in _booking_ids(client)
@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.config.database import get_session
+from app.config.sqlite_tuning import writer_queue
+from app.model.models import Route
+from app.model.payment_order import PaymentOrder
+from app.services import payment_order_service
+from app.services.booking_service import create_booking
+
+JOURNEY_DATE = date.today() + timedelta(days=20)
+GATEWAY_DELAY_SECONDS = 1.5
+
+
+class _KhaltiResponse:
+    status_code = 200
+    text = "{}"
+
+    def json(self):
+        return {"payment_url": "https://khalti.test/pay", "pidx": f"PIDX-{time.monotonic_ns()}"}
+
+
+def _pending_order() -> int:
+    now = payment_order_service._now_utc()
+    with get_session() as db:
+        order = PaymentOrder(
+            user_id=1,
+            trip_id=1,
+            journey_date=JOURNEY_DATE,
+            seats="E1",
+            amount=1200,
+            status="pending",
+            expires_at=now + timedelta(minutes=20),
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(order)
+        db.commit()
+        return order.id
+
+
+def test_slow_gateway_call_does_not_block_other_writers(client, monkeypatch):
+    gateway_called = threading.Event()
+
+    def slow_post(*args, **kwargs):
+        gateway_called.set()
+        time.sleep(GATEWAY_DELAY_SECONDS)
+        return _KhaltiResponse()
+
+    monkeypatch.setattr(payment_order_service, "KHALTI_SECRET_KEY", "test-key")
+    monkeypatch.setattr(payment_order_service.khalti_client, "post", slow_post)
+    order_id = _pending_order()
+
+    results = {}
+    initiate = threading.Thread(
+        target=lambda: results.update(initiate=payment_order_service.initiate_khalti_for_order(order_id, 1))
+    )
+    initiate.start()
+    assert gateway_called.wait(5)
+
+    started = time.perf_counter()
+    booking, error_key = create_booking(1, 1, JOURNEY_DATE.isoformat(), 1, ["E2"])
+    elapsed = time.perf_counter() - started
+    initiate.join()
+
+    assert error_key is None and booking is not None
+    assert elapsed < GATEWAY_DELAY_SECONDS / 2
+    result, error_key = results["initiate"]
+    assert error_key is None and result["pidx"].startswith("PIDX-")
+
+
+def test_read_only_use_of_a_session_takes_no_writer_lock(client):
+    with get_session() as db:
+        db.execute(select(Route).limit(1)).all()
+        assert writer_queue.snapshot()["held"] is False
+
+        # A writer on another thread is not held up by the open reading session.
+        done = threading.Event()
+        writer = threading.Thread(target=lambda: (create_booking(1, 1, JOURNEY_DATE.isoformat(), 1, ["E3"]), done.set()))
+        writer.start()
+        assert done.wait(2)
+        writer.join()
+
+
+def test_nested_write_sessions_on_one_thread_fail_fast(client):
+    with get_session() as outer:
+        outer.execute(select(PaymentOrder).limit(1).with_for_update()).all()
+        started = time.perf_counter()
+        with pytest.raises(RuntimeError):
+            create_booking(1, 1, JOURNEY_DATE.isoformat(), 1, ["E4"])
+        assert time.perf_counter() - started < 1
@@ -0,0 +1,82 @@
+from datetime import time
+
+from sqlalchemy import select
+
+from app.config.database import get_session
+from app.model.models import Bus, BusSchedule, BusSeat, User
+from app.services.bus_service import apply_vendor_fleet_status
+
+
+def _vendor_fleet(db) -> dict:
+    vendor = User(name="Fleet Vendor", email="fleet.vendor@example.com", role="vendor", is_active=True)
+    db.add(vendor)
+    db.flush()
+
+    buses = {}
+    for name, active in (("running", True), ("retired", False)):
+        bus = Bus(
+            bus_number=f"FLEET-{name}",
+            bus_type="Deluxe",
+            total_seats=2,
+            is_active=active,
+            vendor_id=vendor.user_id,
+        )
+        db.add(bus)
+        db.flush()
+        buses[name] = bus
+    running = buses["running"].bus_id
+
+    schedules = {
+        name: BusSchedule(
+            bus_id=running, departure_time=time(hour, 0), arrival_time=time(hour + 5, 0), price=900, is_active=active
+        )
+        for name, hour, active in (("daily", 7, True), ("paused", 13, False))
+    }
+    seats = {
+        "free": BusSeat(bus_id=running, seat_label="A1", row_index=0, col_index=0, is_active=True, is_blocked=False),
+        "maintenance": BusSeat(
+            bus_id=running, seat_label="B1", row_index=1, col_index=0, is_active=True, is_blocked=True,
+            block_reason="maintenance",
+        ),
+    }
+    db.add_all([*schedules.values(), *seats.values()])
+    db.commit()
+    return {
+        "vendor_id": vendor.user_id,
+        "buses": {name: bus.bus_id for name, bus in buses.items()},
+        "schedules": {name: schedule.schedule_id for name, schedule in schedules.items()},
+        "seats": {name: seat.bus_seat_id for name, seat in seats.items()},
+    }
+
+
+def _state(db, model, ids: dict, *columns) -> dict:
+    key = model.__mapper__.primary_key[0]
+    rows = {row[0]: tuple(row[1:]) for row in db.execute(select(key, *columns).where(key.in_(ids.values())))}
+    return {name: rows[row_id] for name, row_id in ids.items()}
+
+
+def test_reactivating_a_vendor_restores_only_what_deactivation_turned_off(client):
+    with get_session() as db:
+        fleet = _vendor_fleet(db)
+
+        deactivated = apply_vendor_fleet_status(db, fleet["vendor_id"], False)
+        db.commit()
+        assert (deactivated["buses"], deactivated["schedules"], deactivated["seats"]) == (1, 1, 1)
+        assert _state(db, BusSeat, fleet["seats"], BusSeat.is_blocked, BusSeat.block_reason) == {
+            "free": (True, "vendor_inactive"),
+            "maintenance": (True, "maintenance"),
+        }
+
+        reactivated = apply_vendor_fleet_status(db, fleet["vendor_id"], True)
+        db.commit()
+        assert (reactivated["buses"], reactivated["schedules"], reactivated["seats"]) == (1, 1, 1)
+
+        assert _state(db, Bus, fleet["buses"], Bus.is_active) == {"running": (True,), "retired": (False,)}
+        assert _state(db, BusSchedule, fleet["schedules"], BusSchedule.is_active) == {
+            "daily": (True,),
+            "paused": (False,),
+        }
+        assert _state(db, BusSeat, fleet["seats"], BusSeat.is_blocked, BusSeat.block_reason) == {
+            "free": (False, None),
+            "maintenance": (True, "maintenance"),
+        }
@@ -182,10 +182,16 @@ export const initiateKhaltiPayment = async (bookingId, payload) => {
   return data
 }
 
-export const createPaymentOrder = async (payload) => {
+// Retries of the same checkout step reuse the key, so the server runs it only once.
+const idempotencyHeaders = (idempotencyKey) => ({
+  'Content-Type': 'application/json',
+  ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
+})
+
+export const createPaymentOrder = async (payload, idempotencyKey) => {
   const response = await fetch(`${API_BASE}/api/payments/create-order`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: idempotencyHeaders(idempotencyKey),
     body: JSON.stringify(payload),
   })
   const data = await response.json()
@@ -195,10 +201,10 @@ export const createPaymentOrder = async (payload) => {
   return data.order
 }
 
-export const initiateKhaltiOrder = async (payload) => {
+export const initiateKhaltiOrder = async (payload, idempotencyKey) => {
   const response = await fetch(`${API_BASE}/api/payments/khalti/initiate`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: idempotencyHeaders(idempotencyKey),
     body: JSON.stringify(payload),
   })
   const data = await response.json()
@@ -218,13 +224,42 @@ export const verifyKhaltiOrderByPidx = async (pidx) => {
   if (!response.ok) {
     throw new Error(data.detail || 'Failed to verify Khalti checkout')
   }
-  return data.payment || data
+  // Real orders come back as a queued verification; the demo fallback returns the payment directly.
+  return data.verification || data.payment || data
+}
+
+export const getPaymentVerification = async (orderId, verificationId, userId) => {
+  const params = new URLSearchParams({ user_id: String(userId) })
+  if (verificationId) {
+    params.set('verification_id', String(verificationId))
+  }
+  const response = await fetch(`${API_BASE}/api/payments/orders/${orderId}/verification?${params.toString()}`)
+  const data = await response.json()
+  if (!response.ok) {
+    throw new Error(data.detail || 'Failed to load payment verification')
+  }
+  return data.verification
 }
 
-export const initiateEsewaOrder = async (payload) => {
+// Verification worker pool le kaam sakunjel poll garne (queued/processing -> succeeded/failed)
+export const waitForPaymentVerification = async (orderId, verificationId, userId, { intervalMs = 2000, timeoutMs = 120000 } = {}) => {
+  const deadline = Date.now() + timeoutMs
+  for (;;) {
+    const verification = await getPaymentVerification(orderId, verificationId, userId)
+    if (verification.state === 'succeeded' || verification.state === 'failed') {
+      return verification
+    }
+    if (Date.now() >= deadline) {
+      return verification
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs))
+  }
+}
+
+export const initiateEsewaOrder = async (payload, idempotencyKey) => {
   const response = await fetch(`${API_BASE}/api/payments/esewa/initiate`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: idempotencyHeaders(idempotencyKey),
     body: JSON.stringify(payload),
   })
   const data = await response.json()
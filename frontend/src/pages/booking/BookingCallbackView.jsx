@@ -7,18 +7,80 @@
 // verifies the transaction, and updates booking status accordingly.
 // ============================================================================
 
-import { useMemo } from 'react'
+import { useEffect, useMemo, useState } from 'react'
 import { Link } from 'react-router-dom'
 
+import { waitForPaymentVerification } from '../../api/bookingApi'
+import { useAuth } from '../../context/AuthContext'
+
 export function BookingCallbackView() {
-  const callback = useMemo(() => {
+  const { user } = useAuth()
+  const userId = user?.user_id
+  const initialCallback = useMemo(() => {
     const params = new URLSearchParams(globalThis.location.search)
     return {
       status: params.get('status') || 'failure',
+      orderId: params.get('order_id') || '',
+      verificationId: params.get('verification_id') || '',
       bookingReference: params.get('booking_reference') || '',
       reason: params.get('reason') || '',
     }
   }, [])
+  const [callback, setCallback] = useState(initialCallback)
+
+  // ========================================================================
+  // Pending / Verification queue ma cha, result aaunjel poll garne
+  // ========================================================================
+  useEffect(() => {
+    if (initialCallback.status !== 'pending' || !initialCallback.orderId || !userId) {
+      return undefined
+    }
+    let cancelled = false
+    waitForPaymentVerification(initialCallback.orderId, initialCallback.verificationId, userId)
+      .then((verification) => {
+        if (cancelled) return
+        if (verification.state === 'succeeded') {
+          setCallback({ ...initialCallback, status: 'success', bookingReference: verification.result?.booking_reference || '' })
+        } else if (verification.state === 'failed') {
+          setCallback({ ...initialCallback, status: 'failure', reason: verification.error_key || '' })
+        } else {
+          setCallback({ ...initialCallback, status: 'processing' })
+        }
+      })
+      .catch((err) => {
+        if (!cancelled) setCallback({ ...initialCallback, status: 'failure', reason: err.message || '' })
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [initialCallback, userId])
+
+  if (callback.status === 'pending') {
+    return (
+      <section className="container page-shell">
+        <article className="booking-detail-card">
+          <h1>Verifying Payment</h1>
+          <p>We received your payment and are confirming it with the gateway. This usually takes a few seconds.</p>
+        </article>
+      </section>
+    )
+  }
+
+  if (callback.status === 'processing') {
+    return (
+      <section className="container page-shell">
+        <article className="booking-detail-card">
+          <h1>Payment Still Processing</h1>
+          <p>The payment gateway is slow to respond. Your booking will appear in My Bookings once it is confirmed.</p>
+          <div className="payment-actions">
+            <Link to="/bookings" className="btn-primary">
+              View My Bookings
+            </Link>
+          </div>
+        </article>
+      </section>
+    )
+  }
 
   // ========================================================================
   // Processing State / Verification Chalairaako
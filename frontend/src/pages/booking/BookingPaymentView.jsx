@@ -7,7 +7,7 @@
 // and shows success screen with ticket download option after confirming payment.
 // ============================================================================
 
-import { useMemo, useState } from 'react'
+import { useMemo, useRef, useState } from 'react'
 import { Link, useLocation } from 'react-router-dom'
 
 import { useAuth } from '../../context/AuthContext'
@@ -81,6 +81,8 @@ const BookingPaymentView = () => {
   const [error, setError] = useState('')                                   // Error message display
   const [success, setSuccess] = useState('')
   const [payLaterBooking, setPayLaterBooking] = useState(null)
+  // Ek checkout attempt ko lagi ek Idempotency-Key; double click/retry le duplicate order banaudaina
+  const checkoutKeyRef = useRef(crypto.randomUUID())
   let confirmButtonLabel = 'Confirm Payment'
   if (loading) {
     confirmButtonLabel = 'Processing...'
@@ -136,19 +138,20 @@ const BookingPaymentView = () => {
         throw new Error('Missing trip information. Please select seats again.')
       }
 
+      const checkoutKey = checkoutKeyRef.current
       const order = await createPaymentOrder({
         user_id: user.user_id,
         trip_id: Number(details.tripId),
         journey_date: details.date,
         seat_labels: details.seats,
         amount: details.total,
-      })
+      }, `${checkoutKey}:order`)
 
       if (chosenMethod === 'esewa') {
         const payment = await initiateEsewaOrder({
           order_id: order.id,
           user_id: user.user_id,
-        })
+        }, `${checkoutKey}:esewa`)
 
         if (!payment.form_action || !payment.form_fields) {
           throw new Error('Failed to prepare eSewa checkout form')
@@ -161,7 +164,7 @@ const BookingPaymentView = () => {
       const payment = await initiateKhaltiOrder({
         order_id: order.id,
         user_id: user.user_id,
-      })
+      }, `${checkoutKey}:khalti`)
 
       if (payment.payment_url) {
         globalThis.location.href = payment.payment_url
@@ -169,6 +172,8 @@ const BookingPaymentView = () => {
         throw new Error('Failed to get Khalti payment URL')
       }
     } catch (err) {
+      // Failed attempt pachi naya key, so the next try is a fresh request
+      checkoutKeyRef.current = crypto.randomUUID()
       setError(err.message || 'Payment confirmation failed')
     } finally {
       setLoading(false)
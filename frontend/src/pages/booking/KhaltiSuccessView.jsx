@@ -1,10 +1,12 @@
 import { useEffect, useRef, useState } from 'react'
 import { Link, useSearchParams } from 'react-router-dom'
 
-import { verifyKhaltiOrderByPidx } from '../../api/bookingApi'
+import { verifyKhaltiOrderByPidx, waitForPaymentVerification } from '../../api/bookingApi'
+import { useAuth } from '../../context/AuthContext'
 
 const KhaltiSuccessView = () => {
   const [params] = useSearchParams()
+  const { user } = useAuth()
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [result, setResult] = useState(null)
@@ -32,6 +34,21 @@ const KhaltiSuccessView = () => {
     }
 
     verifyKhaltiOrderByPidx(pidx)
+      .then((accepted) => {
+        // Queued verification: worker ko result aaunjel wait garne
+        if (!accepted.verification_id) {
+          return accepted
+        }
+        return waitForPaymentVerification(accepted.order_id, accepted.verification_id, user?.user_id).then((verification) => {
+          if (verification.state === 'failed') {
+            throw new Error(`Khalti payment verification failed: ${verification.error_key || 'unknown'}`)
+          }
+          if (verification.state !== 'succeeded') {
+            throw new Error('Payment is still being verified. Check My Bookings shortly.')
+          }
+          return verification.result
+        })
+      })
       .then((payment) => {
         setResult(payment)
       })
@@ -41,7 +58,7 @@ const KhaltiSuccessView = () => {
       .finally(() => {
         setLoading(false)
       })
-  }, [params])
+  }, [params, user])
 
   return (
     <section className="container page-shell booking-flow-page">
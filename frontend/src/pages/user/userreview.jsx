@@ -6,13 +6,6 @@ import '../../css/userReview.css'
 
 const API_BASE = import.meta.env.VITE_API_BASE || 'http://localhost:8000'
 
-const toJourneyStart = (booking) => {
-  const date = booking?.journey_date
-  const departure = booking?.departure_time || '00:00'
-  if (!date) return null
-  return new Date(`${date}T${departure}:00`)
-}
-
 const UserReviewView = () => {
   const { user } = useAuth()
   const [loading, setLoading] = useState(false)
@@ -56,8 +49,6 @@ const UserReviewView = () => {
   }, [reviews])
 
   const { eligibleBookings, upcomingBookings } = useMemo(() => {
-    const now = new Date()
-
     const eligible = []
     const upcoming = []
 
@@ -66,14 +57,11 @@ const UserReviewView = () => {
       if (booking.status === 'cancelled') return
       if (reviewedBookingIds.has(booking.booking_id)) return
 
-      const journeyStart = toJourneyStart(booking)
-      if (!journeyStart || Number.isNaN(journeyStart.getTime())) return
-
-      const eligibleAt = new Date(journeyStart.getTime() + 24 * 60 * 60 * 1000)
-      if (now >= eligibleAt) {
-        eligible.push({ ...booking, eligible_at: eligibleAt.toISOString() })
+      // Backend marks a booking completed once the trip has arrived; only those can be reviewed.
+      if (booking.status === 'completed') {
+        eligible.push(booking)
       } else {
-        upcoming.push({ ...booking, eligible_at: eligibleAt.toISOString() })
+        upcoming.push(booking)
       }
     })
 
@@ -128,7 +116,7 @@ const UserReviewView = () => {
     <section className="container page-shell user-review-page">
       <div className="user-review-header">
         <h1>User Reviews</h1>
-        <p>One review per booking. Reviews open 24 hours after journey start time.</p>
+        <p>One review per booking. Reviews open once the journey is completed.</p>
       </div>
 
       <div className="user-review-actions">
@@ -190,7 +178,7 @@ const UserReviewView = () => {
                   <p>Date: {booking.journey_date} | Departure: {booking.departure_time || '--:--'}</p>
                 </div>
                 <p className="user-review-eligible-at">
-                  Available at: {new Date(booking.eligible_at).toLocaleString()}
+                  Available after arrival{booking.arrival_time ? ` (${booking.journey_date} ${booking.arrival_time})` : ''}
                 </p>
               </div>
             ))}